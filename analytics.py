@@ -0,0 +1,134 @@
+"""
+Cálculos analíticos partilhados pelo dashboard
+
+Funções puras em pandas/NumPy (sem Streamlit), para poderem ser cacheadas
+pelo dashboard e reutilizadas por scripts offline.
+"""
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Segmentos de valor por quartil do gasto combinado
+VALUE_SEGMENTS = ['Bronze (Q1)', 'Prata (Q2)', 'Ouro (Q3)', 'Platina (Q4)']
+
+
+def find_date_column(df):
+    """Devolve a primeira coluna de data do dataset (nome com 'data' ou 'date')"""
+    for col in df.columns:
+        if 'data' in col.lower() or 'date' in col.lower():
+            return col
+    return None
+
+
+def _activity_by_client(df, prefix, count_name):
+    """Agrega a atividade de um negócio por cliente numa única passagem groupby"""
+    aggregations = {
+        count_name: ('gasto_total', 'size'),
+        f'gasto_{prefix}': ('gasto_total', 'sum'),
+    }
+    date_col = find_date_column(df)
+    if date_col is not None:
+        aggregations[f'primeira_data_{prefix}'] = (date_col, 'min')
+        aggregations[f'ultima_data_{prefix}'] = (date_col, 'max')
+
+    activity = df.groupby('cliente_id', observed=True).agg(**aggregations)
+    # Normalizar o índice (cliente_id pode ser categórico num dataset e texto noutro)
+    activity.index = activity.index.astype(str)
+    return activity
+
+
+def build_customer_rollup(df_clientes, df_restaurante, df_hotel):
+    """
+    Tabela agregada com uma linha por cliente: visitas, estadias, gastos por
+    negócio, primeiras/últimas datas e segmentos de serviço e de valor.
+    """
+    rest = _activity_by_client(df_restaurante, 'rest', 'num_visitas_rest')
+    hotel = _activity_by_client(df_hotel, 'hotel', 'num_estadias_hotel')
+
+    rollup = df_clientes.set_index(df_clientes['cliente_id'].astype(str))
+    rollup = rollup.drop(columns='cliente_id').join(rest).join(hotel)
+
+    for col in ['num_visitas_rest', 'num_estadias_hotel']:
+        rollup[col] = rollup[col].fillna(0).astype(int)
+    for col in ['gasto_rest', 'gasto_hotel']:
+        rollup[col] = rollup[col].fillna(0.0)
+    rollup['gasto_total_combinado'] = rollup['gasto_rest'] + rollup['gasto_hotel']
+
+    usa_rest = rollup['num_visitas_rest'] > 0
+    usa_hotel = rollup['num_estadias_hotel'] > 0
+    rollup['segmento_servicos'] = np.select(
+        [usa_rest & usa_hotel, usa_rest, usa_hotel],
+        ['Ambos Serviços', 'Só Restaurante', 'Só Hotel'],
+        default='Sem Atividade'
+    )
+
+    # Segmentos de valor (quartis) para clientes que usam ambos os serviços
+    ambos = usa_rest & usa_hotel
+    rollup['segmento'] = pd.Series(pd.NA, index=rollup.index, dtype='object')
+    if ambos.any():
+        gasto = rollup.loc[ambos, 'gasto_total_combinado']
+        q1, q2, q3 = gasto.quantile([0.25, 0.50, 0.75])
+        rollup.loc[ambos, 'segmento'] = np.select(
+            [gasto <= q1, gasto <= q2, gasto <= q3],
+            VALUE_SEGMENTS[:3],
+            default=VALUE_SEGMENTS[3]
+        )
+
+    return rollup.rename_axis('cliente_id').reset_index()
+
+
+@dataclass
+class DatasetProfile:
+    """Perfil estatístico de um dataset, calculado uma única vez por versão dos dados"""
+    fingerprint: str
+    n_rows: int
+    n_cols: int
+    numeric_cols: list
+    corr: pd.DataFrame
+    describe: pd.DataFrame
+    missing_ratio: pd.Series
+
+    @property
+    def missing_pct(self):
+        """Percentagem de células em falta em todo o dataset"""
+        return float(self.missing_ratio.mean() * 100) if self.n_cols else 0.0
+
+
+def dataset_fingerprint(df):
+    """Hash do conteúdo de um DataFrame (valores, índice, colunas e tipos)"""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    return digest.hexdigest()
+
+
+def build_dataset_profile(df, fingerprint=None):
+    """Calcula correlação, estatísticas descritivas e dados em falta de um dataset"""
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    numeric = df[numeric_cols]
+    return DatasetProfile(
+        fingerprint=fingerprint or dataset_fingerprint(df),
+        n_rows=len(df),
+        n_cols=len(df.columns),
+        numeric_cols=numeric_cols,
+        corr=numeric.corr() if len(numeric_cols) > 1 else pd.DataFrame(),
+        describe=numeric.describe() if numeric_cols else pd.DataFrame(),
+        missing_ratio=df.isnull().mean(),
+    )
+
+
+def top_correlated_pairs(corr, k=15):
+    """Pares de variáveis com maior correlação absoluta (sem diagonal nem duplicados)"""
+    if corr.empty:
+        return pd.DataFrame(columns=['variavel_1', 'variavel_2', 'correlacao'])
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices_from(values, k=1)
+    pairs = pd.DataFrame({
+        'variavel_1': corr.index[rows],
+        'variavel_2': corr.columns[cols],
+        'correlacao': values[rows, cols],
+    }).dropna(subset=['correlacao'])
+    order = pairs['correlacao'].abs().sort_values(ascending=False).index
+    return pairs.loc[order].head(k).reset_index(drop=True)
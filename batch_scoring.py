@@ -0,0 +1,151 @@
+"""
+Scoring em lote de reservas
+
+Recebe reservas num DataFrame (uma por linha, com os mesmos campos do
+formulário de previsão), codifica-as com o `FeatureEncoder` e faz uma única
+chamada `predict` sobre todas as linhas. As regras de negócio (preço do
+quarto, probabilidades, categoria e estratégia) são aplicadas em colunas
+NumPy, sem ciclos por linha. A previsão individual do dashboard é um lote de
+uma reserva.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from feature_encoder import (HOTEL_SCHEMA, RESTAURANT_SCHEMA, encode_for_model,
+                             hotel_fields, restaurant_fields)
+
+# Colunas de entrada por negócio (obrigatórias, opcionais → valor por omissão)
+HOTEL_REQUIRED = ["noites", "num_hospedes", "antecedencia_dias", "tipo_quarto", "mes"]
+HOTEL_OPTIONAL = {
+    "fim_semana": False, "feriado": False, "evento_cidade": False,
+    "motivo_viagem": "Lazer", "foi_spa": False, "pediu_room_service": False,
+    "late_checkout": False, "estacionamento": False, "transfer_aeroporto": False,
+    "regime": "Pequeno_Almoco", "canal_reserva": "Direto",
+}
+HOTEL_EXAMPLE = {
+    "noites": 3, "num_hospedes": 2, "antecedencia_dias": 30, "tipo_quarto": "Superior",
+    "mes": "Agosto", "fim_semana": "Sim", "foi_spa": "Não", "motivo_viagem": "Lazer",
+    "regime": "Pequeno_Almoco", "canal_reserva": "Booking",
+}
+RESTAURANT_REQUIRED = ["num_pessoas", "horario", "dia_semana", "mes"]
+RESTAURANT_OPTIONAL = {
+    "mesa_especial": False, "criancas": False, "ocasiao_especial": False,
+    "feriado": False, "evento_local": False, "vinho": False, "sobremesa": False,
+    "menu_degustacao": False, "tipo_cliente": "Novo", "canal_reserva": "Telefone",
+}
+RESTAURANT_EXAMPLE = {
+    "num_pessoas": 4, "horario": "Jantar", "dia_semana": "Sábado", "mes": 12,
+    "ocasiao_especial": "Sim", "vinho": "Sim", "tipo_cliente": "Habitual", "canal_reserva": "App",
+}
+
+# Categorias de valor: (limite inferior exclusivo, categoria, estratégia principal,
+# custo da estratégia, receita adicional esperada) — iguais às da previsão individual
+HOTEL_TIERS = [
+    (500, "💎 PREMIUM", "Upgrade gratuito para suite superior + 50% desconto em SPA", 80, 150),
+    (300, "⭐ ALTO VALOR", "Upgrade gratuito de quarto + pequeno-almoço para o grupo", 50, 100),
+    (150, "📈 MÉDIO POTENCIAL", "Pequeno-almoço gratuito para 1 pessoa + 20% desconto em SPA", 30, 60),
+    (-np.inf, "💰 VALOR BÁSICO", "10% desconto no pequeno-almoço + welcome gift", 15, 25),
+]
+RESTAURANT_TIERS = [
+    (40, "🥂 PREMIUM", "Entrada gratuita + degustação de vinhos com 20% desconto", 15, 35),
+    (25, "⭐ ALTO VALOR", "Entrada com 50% desconto + vinho com 15% desconto", 10, 20),
+    (15, "📈 VALOR MÉDIO", "Entrada oferecida com prato principal + 20% desconto na sobremesa", 5, 12),
+    (-np.inf, "💰 VALOR BÁSICO", "Pão de entrada especial + café oferecido com sobremesa", 3, 6),
+]
+
+
+def _prepare_input(df, required, optional):
+    """Valida as colunas obrigatórias e preenche as opcionais com o valor por omissão"""
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias em falta: {', '.join(missing)}")
+    df = df.copy()
+    for col, default in optional.items():
+        if col not in df.columns:
+            df[col] = default
+    return df
+
+
+def _tiers(values, tiers):
+    """Categoria, estratégia e ROI por linha a partir dos limites de valor"""
+    conditions = [values > limit for limit, *_ in tiers]
+    categoria = np.select(conditions, [t[1] for t in tiers], default=tiers[-1][1])
+    estrategia = np.select(conditions, [t[2] for t in tiers], default=tiers[-1][2])
+    custo = np.select(conditions, [t[3] for t in tiers], default=tiers[-1][3])
+    receita = np.select(conditions, [t[4] for t in tiers], default=tiers[-1][4])
+    roi = (receita - custo) / custo * 100
+    return categoria, estrategia, roi
+
+
+def score_hotel_batch(df, model):
+    """Previsões de gasto, probabilidades e estratégia para um lote de reservas de hotel"""
+    df = _prepare_input(df, HOTEL_REQUIRED, HOTEL_OPTIONAL)
+    fields = hotel_fields(df)
+    extras = np.maximum(0, model.predict(encode_for_model(model, HOTEL_SCHEMA, fields)))
+
+    # Preço do quarto por regras de negócio (tipo de quarto e época)
+    tipo_quarto, epoca = fields["tipo_quarto"], fields["epoca"]
+    room_factor = np.select(
+        [tipo_quarto == "Superior", tipo_quarto == "Suite", tipo_quarto == "Familiar"],
+        [1.3, 1.8, 1.1], default=1.0)
+    season_factor = np.select([epoca == "Alta", epoca == "Baixa"], [1.4, 0.8], default=1.0)
+    gasto_quarto = fields["noites"] * 120 * room_factor * season_factor
+    gasto_total = gasto_quarto + extras
+
+    prob_spa = (0.3 + 0.4 * fields["foi_spa"]
+                + 0.2 * np.isin(tipo_quarto, ["Suite", "Superior"]))
+    prob_retorno = 0.6 + 0.2 * (gasto_total > 300) + 0.1 * (fields["antecedencia_dias"] > 30)
+    categoria, estrategia, roi = _tiers(gasto_total, HOTEL_TIERS)
+
+    scored = df
+    scored["gasto_quarto_previsto"] = gasto_quarto.round(2)
+    scored["gasto_extras_previsto"] = extras.round(2)
+    scored["gasto_total_previsto"] = gasto_total.round(2)
+    scored["valor_diario"] = (gasto_total / fields["noites"]).round(2)
+    scored["prob_spa"] = np.minimum(prob_spa, 0.95)
+    scored["prob_retorno"] = np.minimum(prob_retorno, 0.95)
+    scored["categoria"] = categoria
+    scored["estrategia_recomendada"] = estrategia
+    scored["roi_estimado_pct"] = roi.round(0)
+    return scored
+
+
+def score_restaurant_batch(df, model):
+    """Previsões de gasto, probabilidades e estratégia para um lote de reservas de restaurante"""
+    df = _prepare_input(df, RESTAURANT_REQUIRED, RESTAURANT_OPTIONAL)
+    fields = restaurant_fields(df)
+    gasto_previsto = model.predict(encode_for_model(model, RESTAURANT_SCHEMA, fields))
+    num_pessoas = fields["num_pessoas"]
+    gasto_por_pessoa = gasto_previsto / num_pessoas
+
+    prob_vinho = 0.4 + 0.3 * fields["vinho"] + 0.2 * (fields["periodo"] == "Jantar")
+    prob_sobremesa = 0.5 + 0.3 * fields["sobremesa"] + 0.2 * fields["ocasiao_especial"]
+    prob_retorno = 0.7 + 0.2 * (gasto_por_pessoa > 30) + 0.1 * (fields["tipo_cliente"] == "VIP")
+    categoria, estrategia, roi = _tiers(gasto_por_pessoa, RESTAURANT_TIERS)
+
+    scored = df
+    scored["gasto_total_previsto"] = np.maximum(gasto_previsto, num_pessoas * 15).round(2)
+    scored["gasto_por_pessoa"] = gasto_por_pessoa.round(2)
+    scored["prob_vinho"] = np.minimum(prob_vinho, 0.95)
+    scored["prob_sobremesa"] = np.minimum(prob_sobremesa, 0.95)
+    scored["prob_retorno"] = np.minimum(prob_retorno, 0.95)
+    scored["margem_estimada"] = (gasto_previsto * 0.3).round(2)
+    scored["categoria"] = categoria
+    scored["estrategia_recomendada"] = estrategia
+    scored["roi_estimado_pct"] = roi.round(0)
+    return scored
+
+
+def template_csv(example, optional):
+    """CSV modelo com uma reserva de exemplo e todas as colunas aceites"""
+    row = {**optional, **example}
+    return to_csv_bytes(pd.DataFrame([row], columns=list(example) + [c for c in optional if c not in example]))
+
+
+def to_csv_bytes(df):
+    """Serializa o resultado para download"""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,79 @@
+"""
+Benchmark do arranque a frio do dashboard: início do processo → primeira página (visão geral)
+
+Cada execução corre num processo novo (sem caches do Streamlit em memória) e
+renderiza a página inicial com o `AppTest` do Streamlit, como numa primeira
+visita a um pod acabado de arrancar. Se a mediana ultrapassar o orçamento
+(`--budget-s`, 3 s por defeito) o código de saída é 1, para usar antes do deploy:
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --repeat 5 --budget-s 2.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_PATH = os.path.join(PROJECT_ROOT, "dashboard_streamlit.py")
+DEFAULT_BUDGET_S = 3.0
+
+
+def run_child(spawned_at):
+    """Renderiza a página inicial e devolve os tempos desde o início do processo"""
+    interpreter_s = time.time() - spawned_at
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    harness_s = time.perf_counter() - start
+
+    at = AppTest.from_file(DASHBOARD_PATH, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    render_s = time.perf_counter() - start
+
+    return {
+        "interpreter_s": interpreter_s,
+        "harness_s": harness_s,
+        "render_s": render_s,
+        "total_s": time.time() - spawned_at,
+        "modules": len(sys.modules),
+        "errors": [e.value for e in at.exception],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="arranques a medir (é usada a mediana)")
+    parser.add_argument("--budget-s", type=float, default=DEFAULT_BUDGET_S,
+                        help="tempo máximo até à primeira página; acima dele o código de saída é 1")
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    if args.child:
+        print(json.dumps(run_child(args.child)))
+        return
+
+    print(f"{'arranque':>9}{'python (s)':>12}{'AppTest (s)':>13}{'1ª página (s)':>15}{'total (s)':>11}{'módulos':>9}")
+    runs = []
+    for i in range(args.repeat):
+        out = subprocess.run([sys.executable, __file__, "--child", repr(time.time())],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        if r["errors"]:
+            raise SystemExit(f"A página inicial falhou: {r['errors']}")
+        runs.append(r)
+        print(f"{i + 1:>9}{r['interpreter_s']:>12.2f}{r['harness_s']:>13.2f}{r['render_s']:>15.2f}"
+              f"{r['total_s']:>11.2f}{r['modules']:>9,}")
+
+    median_s = sorted(r["total_s"] for r in runs)[len(runs) // 2]
+    print(f"\nMediana: {median_s:.2f}s (orçamento {args.budget_s:g}s; o AppTest conta ~ o tempo de import do Streamlit)")
+    if median_s > args.budget_s:
+        print(f"❌ Arranque a frio acima do orçamento em {median_s - args.budget_s:.2f}s")
+        sys.exit(1)
+    print("✅ Dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
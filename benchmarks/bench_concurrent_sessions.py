@@ -0,0 +1,335 @@
+"""
+Teste de carga do dashboard: N sessões em simultâneo (p.ex. todos os gestores às 9h)
+
+Arranca o dashboard com `streamlit run`, como num pod (modelos pré-treinados e
+endpoint `/metrics` ligado), e abre N sessões com um cliente websocket sem
+browser que fala o protocolo do Streamlit (BackMsg/ForwardMsg, como o
+frontend). As sessões arrancam ao mesmo tempo (ou escalonadas com `--ramp-s`),
+abrem a primeira página, percorrem as seis secções do `main()` e, nas
+previsões, fazem uma previsão de hotel e outra de restaurante. No fim mostra:
+- latência dos reruns (pedido → script terminado) com p50/p95/p99/máx, por
+  passo e no total;
+- CPU (núcleos em média e no pico) e RSS do processo do servidor;
+- hits/misses das funções com cache (das métricas do servidor), para
+  confirmar que dados e modelos são calculados uma vez e partilhados por
+  todas as sessões.
+
+Para dimensionar pods, `--server-cpus` limita o servidor a N núcleos (Linux):
+    python benchmarks/bench_concurrent_sessions.py
+    python benchmarks/bench_concurrent_sessions.py --sessions 30 --ramp-s 10 --think-s 1
+    python benchmarks/bench_concurrent_sessions.py --sessions 20 --server-cpus 2 --data-dir /tmp/dados_1m
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_PATH = os.path.join(PROJECT_ROOT, "dashboard_streamlit.py")
+
+SECTION_RADIO = "Secção"
+PREDICTION_BUTTON = "🤖 Analisar Potencial da Reserva"
+BUSINESS_SELECTBOX = "🏢 Escolha o negócio:"
+PREDICTION_METRIC = "💰 Gasto Total Previsto"
+CACHED_FUNCTIONS = ("load_data", "load_customer_rollup", "load_ml_models")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class DashboardServer:
+    """Processo `streamlit run` do dashboard, com CPU e RSS lidos de /proc"""
+
+    def __init__(self, data_dir, cpus=None):
+        self.data_dir = data_dir
+        self.cpus = cpus
+        self.port = free_port()
+        self.metrics_port = free_port()
+        self.process = None
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def start(self, timeout_s=120):
+        env = {**os.environ, "METRICS_PORT": str(self.metrics_port)}
+        cpus = self.cpus
+
+        def limit_cpus():
+            if cpus:
+                os.sched_setaffinity(0, range(cpus))
+
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", DASHBOARD_PATH, "--server.headless", "true",
+             "--server.port", str(self.port), "--browser.gatherUsageStats", "false"],
+            cwd=self.data_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            preexec_fn=limit_cpus)
+        deadline = time.time() + timeout_s
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f"O servidor terminou: {self.process.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise SystemExit(f"O servidor não respondeu em {timeout_s}s")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def cpu_s(self):
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss_mb(self):
+        with open(f"/proc/{self.process.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def scrape_metrics(self):
+        """
+        {(métrica, labels ordenados): valor} do endpoint /metrics do servidor
+        (vazio antes do primeiro rerun, que é quando o dashboard liga o endpoint)
+        """
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.metrics_port}/metrics", timeout=5) as r:
+                text = r.read().decode("utf-8")
+        except ConnectionRefusedError:
+            return {}
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, ConnectionRefusedError):
+                return {}
+            raise
+        values = {}
+        for line in text.splitlines():
+            if not line or line.startswith("#"):
+                continue
+            series, value = line.rsplit(" ", 1)
+            name, _, labels = series.partition("{")
+            pairs = tuple(sorted(tuple(pair.split("=", 1)) for pair in labels.rstrip("}").split(",") if pair))
+            values[(name, tuple((k, v.strip('"')) for k, v in pairs))] = float(value)
+        return values
+
+
+async def sample_resources(server, samples, stop, interval_s=0.25):
+    """(núcleos usados, RSS em MB) do servidor a cada intervalo, até `stop`"""
+    last_wall, last_cpu = time.perf_counter(), server.cpu_s()
+    while not stop.is_set():
+        await asyncio.sleep(interval_s)
+        wall, cpu = time.perf_counter(), server.cpu_s()
+        samples.append(((cpu - last_cpu) / (wall - last_wall), server.rss_mb()))
+        last_wall, last_cpu = wall, cpu
+
+
+class Session:
+    """Uma sessão do browser: pede reruns e lê os elementos e widgets devolvidos"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.elements = []
+        self.widgets = {}
+
+    async def rerun(self, *widget_states):
+        """Pede um rerun com os widgets alterados e espera pelo fim do script (segundos)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(widget_states)
+        self.elements, self.widgets = [], {}
+        start = time.perf_counter()
+        await self.websocket.send(msg.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.websocket.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                proto = getattr(element, element_type)
+                self.elements.append((element_type, proto))
+                if "id" in proto.DESCRIPTOR.fields_by_name and "label" in proto.DESCRIPTOR.fields_by_name:
+                    self.widgets[proto.label] = proto
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return time.perf_counter() - start
+
+    def widget_state(self, label, **value):
+        """Estado de um widget (p.ex. string_value=... ou trigger_value=True) pelo rótulo"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        return WidgetState(id=self.widgets[label].id, **value)
+
+    def exceptions(self):
+        return [f"{proto.type}: {proto.message}" for kind, proto in self.elements if kind == "exception"]
+
+    def has_metric(self, label):
+        return any(kind == "metric" and proto.label == label for kind, proto in self.elements)
+
+
+async def run_session(session_id, url, delay_s, args, steps, errors):
+    """Percorre as secções numa sessão e regista (sessão, passo, segundos) de cada rerun"""
+    import websockets
+
+    await asyncio.sleep(delay_s)
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None, ping_interval=None,
+                                  open_timeout=args.timeout) as websocket:
+        session = Session(websocket)
+
+        async def step(name, *widget_states):
+            seconds = await asyncio.wait_for(session.rerun(*widget_states), args.timeout)
+            steps.append((session_id, name, seconds))
+            errors.extend((session_id, name, error) for error in session.exceptions())
+            await asyncio.sleep(args.think_s)
+
+        await step("primeira página")
+        for section in list(session.widgets[SECTION_RADIO].options)[1:]:
+            await step(section.replace("**", ""), session.widget_state(SECTION_RADIO, string_value=section))
+            if args.no_predictions or PREDICTION_BUTTON not in session.widgets:
+                continue
+            await step("previsão hotel", session.widget_state(PREDICTION_BUTTON, trigger_value=True))
+            if not session.has_metric(PREDICTION_METRIC):
+                errors.append((session_id, "previsão hotel", "sem resultado"))
+            await step("escolher restaurante",
+                       session.widget_state(BUSINESS_SELECTBOX, string_value="🍽️ Restaurante"))
+            await step("previsão restaurante", session.widget_state(PREDICTION_BUTTON, trigger_value=True))
+            if not session.has_metric(PREDICTION_METRIC):
+                errors.append((session_id, "previsão restaurante", "sem resultado"))
+
+
+async def run_load(server, args):
+    """Executa as sessões em simultâneo e devolve (reruns, erros, amostras de recursos, segundos)"""
+    steps, errors, samples = [], [], []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(server, samples, stop))
+    delays = np.linspace(0, args.ramp_s, args.sessions) if args.sessions > 1 else [0.0]
+    start = time.perf_counter()
+    results = await asyncio.gather(*[run_session(i, server.url, delays[i], args, steps, errors)
+                                     for i in range(args.sessions)], return_exceptions=True)
+    wall_s = time.perf_counter() - start
+    stop.set()
+    await sampler
+    for session_id, result in enumerate(results):
+        if isinstance(result, BaseException):
+            errors.append((session_id, "sessão", f"{type(result).__name__}: {result}"))
+    return steps, errors, samples, wall_s
+
+
+def percentiles(values):
+    values = np.asarray(values)
+    return {"n": int(len(values)), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "p99": float(np.percentile(values, 99)),
+            "max": float(values.max())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8, help="sessões em simultâneo")
+    parser.add_argument("--ramp-s", type=float, default=0.0,
+                        help="intervalo em que as sessões arrancam (0 = todas ao mesmo tempo)")
+    parser.add_argument("--think-s", type=float, default=0.0, help="pausa entre interações de cada sessão")
+    parser.add_argument("--no-predictions", action="store_true", help="não submeter previsões")
+    parser.add_argument("--server-cpus", type=int, default=None, help="núcleos disponíveis para o servidor")
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de cada rerun (s)")
+    parser.add_argument("--data-dir", default=PROJECT_ROOT,
+                        help="pasta com Datasets_clean/ e Datasets_ML/ (p.ex. gerada por tools/synthetic_data.py)")
+    parser.add_argument("--json", help="guardar os reruns e o resumo neste ficheiro")
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    # Modelos treinados antes do arranque, como no deploy
+    subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, "model_registry.py")], cwd=data_dir,
+                   check=True, stdout=subprocess.DEVNULL)
+
+    server = DashboardServer(data_dir, args.server_cpus)
+    server.start()
+    try:
+        rss_idle_mb = server.rss_mb()
+        metrics_before = server.scrape_metrics()
+        steps, errors, samples, wall_s = asyncio.run(run_load(server, args))
+        metrics_after = server.scrape_metrics()
+    finally:
+        server.stop()
+
+    cpus = f", {args.server_cpus} núcleo(s)" if args.server_cpus else ""
+    print(f"{args.sessions} sessões{cpus}: {len(steps)} reruns em {wall_s:.1f}s "
+          f"({len(steps) / wall_s:.1f} reruns/s)\n")
+    print(f"{'passo':<28}{'n':>5}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}{'máx (s)':>10}")
+    by_step = {}
+    for _, name, seconds in steps:
+        by_step.setdefault(name, []).append(seconds)
+    latency = {name: percentiles(values) for name, values in by_step.items()}
+    if steps:
+        latency["total"] = percentiles([seconds for _, _, seconds in steps])
+    for name, p in latency.items():
+        print(f"{name:<28}{p['n']:>5}{p['p50']:>10.2f}{p['p95']:>10.2f}{p['p99']:>10.2f}{p['max']:>10.2f}")
+
+    by_session = {}
+    for session_id, _, seconds in steps:
+        by_session[session_id] = by_session.get(session_id, 0.0) + seconds
+    if by_session:
+        totals = sorted(by_session.values())
+        print(f"\nTempo de espera por sessão: mín {totals[0]:.1f}s, mediana {totals[len(totals) // 2]:.1f}s, "
+              f"máx {totals[-1]:.1f}s")
+
+    cores = [c for c, _ in samples] or [0.0]
+    rss = [r for _, r in samples] or [rss_idle_mb]
+    resources = {"cores_mean": float(np.mean(cores)), "cores_peak": max(cores),
+                 "rss_idle_mb": rss_idle_mb, "rss_peak_mb": max(rss)}
+    print(f"\nServidor: CPU {resources['cores_mean']:.2f} núcleos em média (pico {resources['cores_peak']:.2f}), "
+          f"RSS {rss_idle_mb:,.0f} MB em repouso, pico {resources['rss_peak_mb']:,.0f} MB")
+
+    def delta(name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return metrics_after.get(key, 0) - metrics_before.get(key, 0)
+
+    print(f"\n{'função com cache':<24}{'hits':>7}{'misses':>8}{'hit rate':>10}")
+    caches = {}
+    for function in CACHED_FUNCTIONS:
+        hits = int(delta("dashboard_cache_requests_total", function=function, result="hit"))
+        misses = int(delta("dashboard_cache_requests_total", function=function, result="miss"))
+        caches[function] = {"hits": hits, "misses": misses}
+        if hits + misses:
+            print(f"{function:<24}{hits:>7}{misses:>8}{hits / (hits + misses):>10.1%}")
+    duplicated = [function for function, c in caches.items() if c["misses"] > 1]
+    if duplicated:
+        print(f"⚠️ Calculadas mais de uma vez entre sessões: {', '.join(duplicated)}")
+    elif any(c["misses"] for c in caches.values()):
+        print(f"✅ Cada função com cache foi calculada uma única vez para as {args.sessions} sessões")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"sessions": args.sessions, "ramp_s": args.ramp_s, "think_s": args.think_s,
+                       "server_cpus": args.server_cpus, "wall_s": wall_s,
+                       "reruns": [{"session": s, "step": name, "seconds": sec} for s, name, sec in steps],
+                       "latency": latency, "resources": resources, "caches": caches, "errors": errors},
+                      f, indent=2, ensure_ascii=False)
+
+    if errors:
+        for session_id, name, error in errors[:10]:
+            print(f"❌ sessão {session_id}, {name}: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
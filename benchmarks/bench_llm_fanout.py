@@ -0,0 +1,73 @@
+"""
+Benchmark do fan-out das secções de insights: sequencial vs. concorrente
+
+Gera as quatro secções (sem cache) uma a uma e depois todas em simultâneo com
+o AsyncGroqClient, e compara o tempo total com a latência da secção mais lenta:
+    python benchmarks/bench_llm_fanout.py --stub
+    python benchmarks/bench_llm_fanout.py --stub --fail-rate 0.3 --jitter 1.5
+    python benchmarks/bench_llm_fanout.py          # Groq real (gasta quota)
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "tools"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stub", action="store_true", help="usar o servidor Groq simulado local")
+    parser.add_argument("--delay", type=float, default=1.0, help="stub: atraso por pedido (s)")
+    parser.add_argument("--jitter", type=float, default=1.0, help="stub: atraso aleatório extra (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="stub: fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="stub: Retry-After das 429 (s)")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    from llm_client import AsyncGroqClient, GroqClient, RateLimiter, groq_settings
+    from llm_insights import INSIGHT_SECTIONS, InsightGenerator
+
+    if args.stub:
+        from groq_stub import start_stub_server
+        _, base_url = start_stub_server(delay_s=args.delay, jitter_s=args.jitter, fail_rate=args.fail_rate,
+                                        retry_after_s=args.retry_after, seed=42)
+        client, model, rpm = GroqClient("stub", base_url, backoff_base_s=0.2), "stub-modelo", 600
+    else:
+        settings = groq_settings()
+        if settings is None:
+            raise SystemExit("Defina GROQ_API_KEY (ou use --stub)")
+        client = GroqClient(settings.api_key, settings.base_url, timeout=settings.timeout_s, backoff_base_s=0.2)
+        model, rpm = settings.default_model, settings.requests_per_minute
+
+    client.rate_limiter = RateLimiter(rpm, burst=len(INSIGHT_SECTIONS))
+    async_client = AsyncGroqClient(client, max_concurrency=len(INSIGHT_SECTIONS))
+    generator = InsightGenerator(cache=None, client=client, async_client=async_client)
+    batch = [generator.messages(section, f"Secção {section}: dados de exemplo") for section in INSIGHT_SECTIONS]
+
+    start = time.perf_counter()
+    sequential = []
+    for messages in batch:
+        sequential.append(asyncio.run(async_client.chat(messages, model, generator.temperature,
+                                                        generator.max_tokens)).latency_s)
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = asyncio.run(async_client.chat_many(batch, model, generator.temperature, generator.max_tokens))
+    concurrent_s = time.perf_counter() - start
+    failures = [r for r in results if isinstance(r, Exception)]
+    latencies = [r.latency_s for r in results if not isinstance(r, Exception)]
+
+    print(f"{'modo':<14}{'total (s)':>11}{'soma latências (s)':>20}{'mais lenta (s)':>16}")
+    print(f"{'sequencial':<14}{sequential_s:>11.2f}{sum(sequential):>20.2f}{max(sequential):>16.2f}")
+    print(f"{'concorrente':<14}{concurrent_s:>11.2f}{sum(latencies):>20.2f}{max(latencies, default=0):>16.2f}")
+    print(f"\nnovas tentativas após 429: {async_client.retries} · falhas: {len(failures)}")
+    for error in failures:
+        print(f"  ❌ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de streaming dos modelos Groq: tempo até ao primeiro token e tokens/s
+
+Envia o mesmo prompt de insight a cada modelo de MODELOS_GROQ (sem cache) e
+compara o TTFT (latência percebida com streaming) com o tempo total (latência
+percebida com uma chamada bloqueante):
+    python benchmarks/bench_llm_streaming.py
+    python benchmarks/bench_llm_streaming.py --repeat 5 --section negocio
+    python benchmarks/bench_llm_streaming.py --stub     # servidor local simulado
+"""
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "tools"))
+
+
+def sample_summary():
+    """Resumo de dados real (gasto_total por dataset disponível)"""
+    from data_store import DATASET_PATHS, read_dataset
+
+    lines = []
+    for name in ("restaurante", "hotel"):
+        path = DATASET_PATHS[name]
+        if os.path.exists(path):
+            stats = read_dataset(path)["gasto_total"].describe().round(2)
+            lines.append(f"{name}: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="pedidos por modelo")
+    parser.add_argument("--section", default="resumo", help="secção de insights usada como prompt")
+    parser.add_argument("--max-tokens", type=int, default=None, help="limite de tokens da resposta")
+    parser.add_argument("--stub", action="store_true", help="usar o servidor Groq simulado local")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    from llm_client import GroqClient, StreamMetrics, groq_settings
+    from llm_insights import InsightGenerator
+
+    if args.stub:
+        from groq_stub import start_stub_server
+        _, base_url = start_stub_server(delay_s=0.2, token_delay_s=0.01)
+        models = {"stub-rapido": "stub-rapido", "stub-grande": "stub-grande"}
+        client, max_tokens = GroqClient("stub", base_url), 2048
+    else:
+        settings = groq_settings()
+        if settings is None:
+            raise SystemExit("Defina GROQ_API_KEY (ou use --stub)")
+        models = settings.models
+        client = GroqClient(settings.api_key, settings.base_url)
+        max_tokens = settings.max_tokens
+
+    generator = InsightGenerator(cache=None, client=client, max_tokens=args.max_tokens or max_tokens)
+    messages = generator.messages(args.section, sample_summary())
+    metrics = StreamMetrics()
+
+    for label, model in models.items():
+        for _ in range(args.repeat):
+            stream = client.stream_chat(messages, model, generator.temperature,
+                                        generator.max_tokens, on_complete=metrics.record)
+            for _ in stream:
+                pass
+        print(f"✅ {label}: {args.repeat} pedidos")
+
+    print(f"\n{'modelo':<28}{'TTFT p50 (s)':>14}{'TTFT p95 (s)':>14}{'tokens/s':>10}{'total p50 (s)':>15}")
+    for row in sorted(metrics.summary(), key=lambda r: r["ttft_p50_s"]):
+        print(f"{row['modelo']:<28}{row['ttft_p50_s']:>14.2f}{row['ttft_p95_s']:>14.2f}"
+              f"{row['tokens_s_p50']:>10.0f}{row['total_p50_s']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark do load_data(): CSV com tipos inferidos vs snapshot colunar tipado
+vs snapshot mapeado em memória (partilhado)
+
+Cada modo corre num processo novo para medir o arranque a frio. A memória
+privada (RssAnon) é a que se multiplica por cada processo do servidor; a
+partilhada (RssFile) são páginas do snapshot na page cache, comuns a todos:
+    python benchmarks/bench_load_data.py
+    python benchmarks/bench_load_data.py --repeat 5
+    python benchmarks/bench_load_data.py --data-dir /tmp/dados_1m
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def current_rss_mb(field="VmRSS"):
+    """RSS atual do processo em MB (Linux: /proc; restantes: pico via resource)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if field != "VmRSS":
+        return float("nan")
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode):
+    """Carrega todos os datasets no modo pedido e devolve as métricas"""
+    import pandas as pd
+    from data_store import DATASET_PATHS, read_dataset, read_shared, snapshot_is_fresh
+
+    paths = [p for p in DATASET_PATHS.values() if os.path.exists(p)]
+    if mode in ("snapshot", "shared"):
+        missing = [p for p in paths if not snapshot_is_fresh(p)]
+        if missing:
+            raise SystemExit(f"Snapshots em falta, correr `python data_store.py`: {missing}")
+        # O custo fixo do import do pyarrow aparece em "RSS total", não no ΔRSS dos dados
+        import pyarrow.feather  # noqa: F401
+
+    rss_before = current_rss_mb()
+    anon_before = current_rss_mb("RssAnon")
+    start = time.perf_counter()
+    if mode == "csv":
+        frames = [pd.read_csv(p) for p in paths]
+    elif mode == "shared":
+        frames = [read_shared(p) for p in paths]
+    else:
+        frames = [read_dataset(p) for p in paths]
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "load_ms": elapsed * 1000,
+        "rss_delta_mb": current_rss_mb() - rss_before,
+        "private_delta_mb": current_rss_mb("RssAnon") - anon_before,
+        "rss_total_mb": current_rss_mb(),
+        "frames_mb": sum(df.memory_usage(deep=True).sum() for df in frames) / 1e6,
+        "rows": sum(len(df) for df in frames),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por modo (é usada a mediana)")
+    parser.add_argument("--data-dir", default=PROJECT_ROOT,
+                        help="pasta com Datasets_clean/ e Datasets_ML/ (p.ex. gerada por tools/synthetic_data.py)")
+    parser.add_argument("--mode", choices=["csv", "snapshot", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(args.data_dir)
+    if args.mode:
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    # Garantir snapshots atualizados antes de medir
+    subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, "data_store.py")], check=True,
+                   stdout=subprocess.DEVNULL)
+
+    print(f"{'modo':<10}{'linhas':>10}{'load (ms)':>12}{'ΔRSS (MB)':>12}{'Δprivada (MB)':>15}"
+          f"{'frames (MB)':>13}{'RSS total (MB)':>16}")
+    for mode in ("csv", "snapshot", "shared"):
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                                  "--data-dir", args.data_dir],
+                                 check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(out))
+        runs.sort(key=lambda r: r["load_ms"])
+        r = runs[len(runs) // 2]
+        print(f"{mode:<10}{r['rows']:>10,}{r['load_ms']:>12.1f}{r['rss_delta_mb']:>12.1f}"
+              f"{r['private_delta_mb']:>15.1f}{r['frames_mb']:>13.1f}{r['rss_total_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
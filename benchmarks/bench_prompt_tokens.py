@@ -0,0 +1,97 @@
+"""
+Benchmark do tamanho dos prompts de insights: `describe()` completo vs. resumo orçamentado
+
+Para cada secção compara os tokens do prompt com os dados enviados em bruto
+(`describe(include="all")` dos datasets, como numa abordagem ingénua) e com o
+resumo de `data_digest`. Com `--send` envia ambos os prompts ao modelo e mede
+os tokens de prompt faturados e a latência:
+    python benchmarks/bench_prompt_tokens.py
+    python benchmarks/bench_prompt_tokens.py --budget 250
+    python benchmarks/bench_prompt_tokens.py --send --stub
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "tools"))
+
+
+def load_frames():
+    from analytics import build_customer_rollup
+    from data_store import DATASET_PATHS, read_dataset
+
+    frames = {name: read_dataset(path) if os.path.exists(path) else None
+              for name, path in DATASET_PATHS.items() if name in ("restaurante", "hotel", "clientes")}
+    missing = [name for name, df in frames.items() if df is None]
+    if missing:
+        raise SystemExit(f"Datasets em falta: {', '.join(missing)}")
+    rollup = build_customer_rollup(frames["clientes"], frames["restaurante"], frames["hotel"])
+    return frames["restaurante"], frames["hotel"], rollup
+
+
+def verbatim_summaries(df_restaurante, df_hotel, df_rollup):
+    """Prompts 'antes': estatísticas completas de todas as colunas"""
+    full = "\n\n".join(f"{name}:\n{df.describe(include='all').to_string()}"
+                       for name, df in (("Restaurante", df_restaurante), ("Hotel", df_hotel)))
+    return {
+        "resumo": full,
+        "negocio": full,
+        "cruzada": df_rollup.describe(include="all").to_string(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=int, default=None, help="orçamento de tokens do resumo")
+    parser.add_argument("--send", action="store_true", help="enviar os prompts e medir latência")
+    parser.add_argument("--stub", action="store_true", help="usar o servidor Groq simulado local")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    from data_digest import DEFAULT_TOKEN_BUDGET, estimate_tokens
+    from llm_client import GroqClient, groq_settings
+    from llm_insights import InsightGenerator, build_section_summaries
+
+    df_restaurante, df_hotel, df_rollup = load_frames()
+    budget = args.budget or DEFAULT_TOKEN_BUDGET
+    start = time.perf_counter()
+    after = build_section_summaries(df_restaurante, df_hotel, df_rollup, None, budget)
+    digest_s = time.perf_counter() - start
+    before = verbatim_summaries(df_restaurante, df_hotel, df_rollup)
+
+    client = model = None
+    if args.send:
+        if args.stub:
+            from groq_stub import start_stub_server
+            _, base_url = start_stub_server()
+            client, model = GroqClient("stub", base_url), "stub-modelo"
+        else:
+            settings = groq_settings()
+            if settings is None:
+                raise SystemExit("Defina GROQ_API_KEY (ou use --stub)")
+            client = GroqClient(settings.api_key, settings.base_url)
+            model = settings.default_model
+    generator = InsightGenerator(cache=None, client=client, max_tokens=512)
+
+    print(f"Resumos calculados em {digest_s * 1000:.0f} ms (orçamento {budget} tokens)\n")
+    header = f"{'secção':<10}{'tokens antes':>14}{'tokens depois':>15}{'redução':>10}"
+    if client is not None:
+        header += f"{'prompt antes':>14}{'prompt depois':>15}{'latência antes (s)':>20}{'depois (s)':>12}"
+    print(header)
+    for section in before:
+        tokens_before = estimate_tokens(generator.messages(section, before[section])[-1]["content"])
+        tokens_after = estimate_tokens(generator.messages(section, after[section])[-1]["content"])
+        line = f"{section:<10}{tokens_before:>14,}{tokens_after:>15,}{1 - tokens_after / tokens_before:>10.0%}"
+        if client is not None:
+            sent = [client.chat(generator.messages(section, summary), model, generator.temperature,
+                                generator.max_tokens) for summary in (before[section], after[section])]
+            line += (f"{sent[0].prompt_tokens:>14,}{sent[1].prompt_tokens:>15,}"
+                     f"{sent[0].latency_s:>20.2f}{sent[1].latency_s:>12.2f}")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
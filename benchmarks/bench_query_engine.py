@@ -0,0 +1,107 @@
+"""
+Benchmark do motor de consultas: tamanho dos prompts e tempo de execução vs. nº de linhas
+
+Usa um LLM simulado que devolve planos pré-definidos (sem rede nem chave) para
+mostrar que os tokens enviados ao modelo não crescem com os dados, quanto custa
+executar cada plano localmente e o ganho da memoização; no fim confirma que
+planos fora da lista de operações permitidas são recusados:
+    python benchmarks/bench_query_engine.py
+    python benchmarks/bench_query_engine.py --scales 1 10 100
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+CANNED_PLANS = {
+    "gasto médio por época no hotel": {
+        "dataset": "hotel", "group_by": ["epoca"],
+        "metrics": [{"column": "gasto_total", "agg": "mean"}, {"column": "*", "agg": "count"}],
+        "sort_by": "gasto_total_mean", "descending": True, "limit": 10},
+    "receita mensal do hotel em época alta": {
+        "dataset": "hotel", "filters": [{"column": "epoca", "op": "==", "value": "Alta"}],
+        "group_by": ["data_checkin"], "metrics": [{"column": "gasto_total", "agg": "sum"}],
+        "sort_by": "data_checkin", "descending": False, "limit": 50},
+    "clientes por tipo e género": {
+        "dataset": "clientes", "group_by": ["tipo_cliente", "genero"],
+        "metrics": [{"column": "*", "agg": "count"}, {"column": "idade", "agg": "mean"}],
+        "sort_by": "registos", "limit": 20},
+}
+
+REJECTED_PLANS = [
+    {"dataset": "hotel", "metrics": [{"column": "gasto_total", "agg": "__import__('os').system"}]},
+    {"dataset": "hotel", "filters": [{"column": "gasto_total", "op": "eval", "value": "1"}]},
+    {"dataset": "hotel; DROP", "metrics": [{"column": "*", "agg": "count"}]},
+    {"dataset": "hotel", "group_by": ["coluna_inexistente"]},
+    {"dataset": "hotel", "metrics": [{"column": "tipo_quarto", "agg": "mean"}]},
+    {"dataset": "hotel", "filters": [{"column": "epoca", "op": ">", "value": "Alta"}]},
+    {"dataset": "hotel", "limit": 100000},
+    {"dataset": "hotel", "code": "df.to_csv('/tmp/x')"},
+]
+
+
+class FakeLLM:
+    """LLM simulado: devolve o plano pré-definido da pergunta e regista o tamanho dos prompts"""
+
+    def __init__(self):
+        self.prompt_chars = []
+
+    def __call__(self, messages, model=None):
+        from llm_client import Completion
+
+        prompt = messages[-1]["content"]
+        self.prompt_chars.append(len(prompt))
+        if prompt.startswith("Converte"):
+            question = prompt.rsplit("Pergunta: ", 1)[1]
+            text = f"```json\n{json.dumps(CANNED_PLANS[question])}\n```"
+        else:
+            text = "- Resposta simulada a partir do resultado da consulta."
+        return Completion(text, "fake", len(prompt) // 4, len(text) // 4, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50],
+                        help="fatores de replicação dos datasets")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    import pandas as pd
+
+    from data_store import DATASET_PATHS, read_dataset
+    from query_engine import QueryEngine, QueryPlanError, describe_schema, validate_plan
+
+    base = {name: read_dataset(DATASET_PATHS[name]) for name in ("hotel", "clientes")}
+
+    print(f"{'linhas hotel':>13}{'pergunta':>42}{'tokens prompt':>15}{'execução (ms)':>15}{'memo (ms)':>11}")
+    for scale in args.scales:
+        frames = {name: pd.concat([df] * scale, ignore_index=True) for name, df in base.items()}
+        llm = FakeLLM()
+        engine = QueryEngine(llm)
+        schema = describe_schema(frames)
+        for question in CANNED_PLANS:
+            llm.prompt_chars.clear()
+            start = time.perf_counter()
+            answer = engine.answer(question, frames, version=scale, schema=schema)
+            first_s = time.perf_counter() - start
+            start = time.perf_counter()
+            engine.run(answer.plan, frames, scale)
+            memo_s = time.perf_counter() - start
+            print(f"{len(frames['hotel']):>13,}{question:>42}{sum(llm.prompt_chars) // 4:>15,}"
+                  f"{first_s * 1000:>15.1f}{memo_s * 1000:>11.3f}")
+
+    print("\nPlanos recusados pelo validador:")
+    for raw in REJECTED_PLANS:
+        try:
+            validate_plan(raw, base)
+            print(f"  ⚠️ aceite: {raw}")
+        except QueryPlanError as e:
+            print(f"  ✅ {e}")
+
+
+if __name__ == "__main__":
+    main()
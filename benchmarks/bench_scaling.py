@@ -0,0 +1,262 @@
+"""
+Benchmark de escala do pipeline do dashboard com dados sintéticos (10k → 10M linhas)
+
+Para cada tamanho gera (uma vez, em cache) os cinco datasets com
+`tools/synthetic_data.py` e mede, num processo novo, cada etapa do pipeline
+com o mesmo código que o dashboard usa: carregamento (CSV e snapshot, como o
+`load_data`), perfil, gráficos e rollups de receita (`analyze_dataset`),
+tabela por cliente e agregações da análise cruzada (`show_cross_analysis`) e
+scoring em lote dos dois modelos. Uma segunda passagem com tracemalloc mede o
+pico de memória de cada etapa (`--no-memory` para a saltar).
+
+Todas as etapas devem escalar de forma linear com o nº de linhas. Entre
+tamanhos consecutivos calcula-se o expoente k de tempo ∝ linhas^k (e de
+memória); acima de `--max-exponent` (1.3 por defeito) o código de saída é 1:
+    python benchmarks/bench_scaling.py
+    python benchmarks/bench_scaling.py --sizes 10000 100000 1000000 10000000 --no-memory
+    python benchmarks/bench_scaling.py --key-skew 1.1 --json resultados.json
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_MAX_EXPONENT = 1.3
+TRAIN_ROWS = 20_000  # linhas de treino dos modelos (fixas: só o scoring escala)
+# Abaixo destes valores dominam custos fixos e ruído: o expoente não é verificado
+MIN_STAGE_S = 0.05
+MIN_STAGE_MB = 5.0
+
+STAGES = {
+    "load_csv": "CSV → DataFrames tipados + escrita dos snapshots",
+    "load_snapshot": "snapshots Feather → DataFrames",
+    "profile": "fingerprint + correlação/describe/em falta",
+    "charts": "histograma e box plot de gasto_total",
+    "revenue_rollup": "rollups de receita diária/semanal/mensal",
+    "customer_rollup": "tabela agregada por cliente",
+    "cross_analysis": "top 10% e segmentos de valor",
+    "predict_hotel": "scoring em lote (hotel)",
+    "predict_restaurant": "scoring em lote (restaurante)",
+}
+
+
+def dataset_dir(cache_dir, rows, clients, key_skew, seed):
+    """Gera (se ainda não existir) e devolve a pasta com os datasets de um tamanho"""
+    from tools.synthetic_data import write_datasets
+
+    params = {"rows": rows, "clients": clients, "key_skew": key_skew, "seed": seed}
+    path = os.path.join(cache_dir, f"rows{rows}-clients{clients}-skew{key_skew:g}-seed{seed}")
+    marker = os.path.join(path, "params.json")
+    if not os.path.exists(marker):
+        shutil.rmtree(path, ignore_errors=True)
+        start = time.perf_counter()
+        write_datasets(path, rows, rows, clients, key_skew, seed)
+        with open(marker, "w") as f:
+            json.dump(params, f)
+        print(f"  dados gerados: {rows:,} linhas/dataset, {clients:,} clientes "
+              f"({time.perf_counter() - start:.1f}s) em {path}")
+    return path
+
+
+def model_registry(cache_dir, seed):
+    """Registo com os dois modelos treinados uma vez sobre um dataset sintético pequeno"""
+    from model_registry import MODEL_SPECS, ModelRegistry
+
+    train_dir = dataset_dir(cache_dir, TRAIN_ROWS, TRAIN_ROWS // 2, 0.0, seed)
+    specs = {name: replace(spec, csv_path=os.path.join(train_dir, spec.csv_path))
+             for name, spec in MODEL_SPECS.items()}
+    return ModelRegistry(specs, models_dir=os.path.join(cache_dir, "models"))
+
+
+def run_stages(data_dir, cache_dir, seed, trace_memory):
+    """Executa as etapas sobre os dados de `data_dir` e devolve {etapa: métricas}"""
+    import plotly.graph_objects  # noqa: F401  (import fora da medição)
+
+    from analytics import build_customer_rollup, build_dataset_profile, dataset_fingerprint, find_date_column
+    from batch_scoring import score_hotel_batch, score_restaurant_batch
+    from charts import binned_histogram, summary_box_plot
+    from data_store import DATASET_PATHS, SNAPSHOT_DIR, read_dataset
+    from profiling import Profiler
+    from timeseries import RevenueRollupStore
+
+    registry = model_registry(cache_dir, seed)
+    models = {name: registry.get(name) for name in registry.specs}
+
+    os.chdir(data_dir)
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    profiler = Profiler(label=data_dir, trace_memory=trace_memory)
+    with profiler.activate():
+        with profiler.span("load_csv") as record:
+            frames = {name: read_dataset(path) for name, path in DATASET_PATHS.items()}
+            record.rows = sum(len(df) for df in frames.values())
+        del frames
+        with profiler.span("load_snapshot") as record:
+            frames = {name: read_dataset(path) for name, path in DATASET_PATHS.items()}
+            record.rows = sum(len(df) for df in frames.values())
+        businesses = {"Restaurante": frames["restaurante"], "Hotel": frames["hotel"]}
+        rows = sum(len(df) for df in businesses.values())
+
+        with profiler.span("profile", rows):
+            for df in businesses.values():
+                build_dataset_profile(df, dataset_fingerprint(df))
+        with profiler.span("charts", rows):
+            for business, df in businesses.items():
+                binned_histogram(df["gasto_total"], business)
+                summary_box_plot(df["gasto_total"], business)
+        with profiler.span("revenue_rollup", rows):
+            store = RevenueRollupStore()
+            for business, df in businesses.items():
+                store.sync(business, df, find_date_column(df))
+
+        with profiler.span("customer_rollup", rows + len(frames["clientes"])):
+            df_rollup = build_customer_rollup(frames["clientes"], frames["restaurante"], frames["hotel"])
+        with profiler.span("cross_analysis", len(df_rollup)):
+            ambos = df_rollup[df_rollup["segmento_servicos"] == "Ambos Serviços"]
+            top = ambos[ambos["gasto_total_combinado"] >= ambos["gasto_total_combinado"].quantile(0.9)]
+            top["idade"].mean(), top["genero"].value_counts(normalize=True), top["nacionalidade"].mode()
+            ambos.groupby("segmento").agg({"gasto_total_combinado": ["count", "mean", "sum"],
+                                           "num_visitas_rest": "mean", "num_estadias_hotel": "mean",
+                                           "idade": "mean"})
+
+        with profiler.span("predict_hotel", len(frames["hotel"])):
+            score_hotel_batch(frames["hotel"], models["hotel_extras"])
+        with profiler.span("predict_restaurant", len(frames["restaurante"])):
+            reservas = frames["restaurante"].rename(columns={"periodo": "horario"})
+            score_restaurant_batch(reservas, models["restaurante_gasto"])
+
+    return {
+        "stages": {span.name: {"s": span.wall_s, "rows": span.rows, "mem_mb": span.mem_peak_mb}
+                   for span in profiler.spans},
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_child(options):
+    out = subprocess.run([sys.executable, __file__, "--child", json.dumps(options)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise SystemExit(f"Falhou com {options['rows']:,} linhas:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def exponents(points, minimum):
+    """Expoente k (valor ∝ linhas^k) entre tamanhos consecutivos; None abaixo do mínimo medível"""
+    result = []
+    for (n1, v1), (n2, v2) in zip(points, points[1:]):
+        if v1 is None or v2 is None or v1 < minimum:
+            result.append(None)
+        else:
+            result.append(math.log(max(v2, 1e-9) / v1) / math.log(n2 / n1))
+    return result
+
+
+def print_table(title, unit, sizes, results, key, minimum, max_exponent):
+    """Mostra a métrica por etapa e tamanho, com os expoentes; devolve as etapas acima do limite"""
+    header = "".join(f"{size:>12,}" for size in sizes)
+    steps = "".join(f"{'k ' + _short(a) + '→' + _short(b):>14}" for a, b in zip(sizes, sizes[1:]))
+    print(f"\n{title} ({unit})")
+    print(f"{'etapa':<20}{header}{steps}")
+    failures = []
+    for stage in STAGES:
+        values = [results[size]["stages"][stage][key] for size in sizes]
+        ks = exponents(list(zip(sizes, values)), minimum)
+        cells = "".join(f"{v:>12.3f}" if v is not None else f"{'-':>12}" for v in values)
+        marks = ""
+        for k in ks:
+            flag = "❌" if k is not None and k > max_exponent else "  "
+            marks += f"{'-' if k is None else f'{k:.2f}':>12}{flag}"
+            if k is not None and k > max_exponent:
+                failures.append((stage, k))
+        print(f"{stage:<20}{cells}{marks}")
+    return failures
+
+
+def _short(size):
+    for unit, scale in (("M", 1_000_000), ("k", 1_000)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return str(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="linhas de hotel e de restaurante por execução")
+    parser.add_argument("--clients-ratio", type=float, default=0.5, help="clientes por linha de cada dataset")
+    parser.add_argument("--key-skew", type=float, default=0.0,
+                        help="expoente Zipf da distribuição de cliente_id (0 = uniforme)")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por tamanho (é usada a mediana)")
+    parser.add_argument("--no-memory", action="store_true", help="não fazer a passagem com tracemalloc")
+    parser.add_argument("--max-exponent", type=float, default=DEFAULT_MAX_EXPONENT,
+                        help="expoente máximo aceite entre tamanhos consecutivos")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench_scaling"),
+                        help="cache dos datasets gerados e dos modelos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        options = json.loads(args.child)
+        print(json.dumps(run_stages(options["data_dir"], options["cache_dir"], options["seed"],
+                                    options["trace_memory"])))
+        return
+
+    sizes = sorted(set(args.sizes))
+    cache_dir = os.path.abspath(args.data_dir)
+    print(f"Tamanhos: {', '.join(f'{s:,}' for s in sizes)} linhas (hotel e restaurante cada)")
+    for stage, description in STAGES.items():
+        print(f"  {stage:<20}{description}")
+    model_registry(cache_dir, args.seed)  # treino fora das medições
+
+    results = {}
+    for size in sizes:
+        clients = max(int(size * args.clients_ratio), 1)
+        options = {"rows": size, "data_dir": dataset_dir(cache_dir, size, clients, args.key_skew, args.seed),
+                   "cache_dir": cache_dir, "seed": args.seed, "trace_memory": False}
+        runs = [run_child(options) for _ in range(args.repeat)]
+        result = {"stages": {}, "max_rss_mb": max(run["max_rss_mb"] for run in runs)}
+        for stage in STAGES:
+            times = sorted(run["stages"][stage]["s"] for run in runs)
+            result["stages"][stage] = {"s": times[len(times) // 2], "rows": runs[0]["stages"][stage]["rows"],
+                                       "mem_mb": None}
+        if not args.no_memory:
+            traced = run_child({**options, "trace_memory": True})
+            for stage in STAGES:
+                result["stages"][stage]["mem_mb"] = traced["stages"][stage]["mem_mb"]
+        results[size] = result
+        total_s = sum(stage["s"] for stage in result["stages"].values())
+        print(f"  {size:>12,} linhas: {total_s:.2f}s no total, RSS máximo {result['max_rss_mb']:,.0f} MB")
+
+    failures = print_table("Tempo (mediana)", "s", sizes, results, "s", MIN_STAGE_S, args.max_exponent)
+    if not args.no_memory:
+        failures += [(f"{stage} (memória)", k) for stage, k in
+                     print_table("Pico de memória (tracemalloc)", "MB", sizes, results, "mem_mb",
+                                 MIN_STAGE_MB, args.max_exponent)]
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"sizes": sizes, "key_skew": args.key_skew, "results": results}, f, indent=2)
+
+    print(f"\nk = expoente de escala entre tamanhos (1 = linear); não verificado abaixo de "
+          f"{MIN_STAGE_S}s / {MIN_STAGE_MB:g} MB")
+    if failures:
+        for stage, k in failures:
+            print(f"❌ {stage}: k = {k:.2f} > {args.max_exponent:g} (escala pior que linear)")
+        sys.exit(1)
+    print(f"✅ Todas as etapas com k ≤ {args.max_exponent:g}")
+
+
+if __name__ == "__main__":
+    main()
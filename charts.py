@@ -0,0 +1,105 @@
+"""
+Gráficos Plotly com agregação no servidor
+
+Os histogramas e box plots são calculados com NumPy no servidor e apenas os
+agregados (bins, quartis, bigodes e uma amostra de outliers) são enviados para
+o browser. O tamanho do JSON deixa de crescer com o número de registos.
+Os agregados podem ser calculados à parte (`histogram_bins`, `box_stats`) e
+guardados em cache, para não voltar a percorrer a coluna em cada rerun.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+# Limites para manter o payload pequeno mesmo com milhões de linhas
+MAX_BINS = 100
+OUTLIER_SAMPLE_SIZE = 200
+
+
+def _finite_values(values):
+    """Converte uma série/array em float64 sem NaN nem infinitos"""
+    arr = np.asarray(values, dtype="float64")
+    return arr[np.isfinite(arr)]
+
+
+def histogram_bins(values, nbins=None, max_bins=MAX_BINS):
+    """Calcula contagens e limites dos bins (regra 'auto' do NumPy, limitada a max_bins)"""
+    arr = _finite_values(values)
+    if arr.size == 0:
+        return np.array([]), np.array([])
+    if nbins is None:
+        edges = np.histogram_bin_edges(arr, bins="auto")
+        if len(edges) - 1 > max_bins:
+            edges = np.histogram_bin_edges(arr, bins=max_bins)
+    else:
+        edges = np.histogram_bin_edges(arr, bins=nbins)
+    counts, edges = np.histogram(arr, bins=edges)
+    return counts, edges
+
+
+def box_stats(values, outlier_sample=OUTLIER_SAMPLE_SIZE, seed=42):
+    """Quartis, bigodes (1.5 × IQR), média e amostra de outliers de uma variável"""
+    arr = _finite_values(values)
+    if arr.size == 0:
+        return None
+    q1, median, q3 = np.percentile(arr, [25, 50, 75])
+    iqr = q3 - q1
+    is_outlier = (arr < q1 - 1.5 * iqr) | (arr > q3 + 1.5 * iqr)
+    inside = arr[~is_outlier]
+    outliers = arr[is_outlier]
+    n_outliers = int(outliers.size)
+    if outliers.size > outlier_sample:
+        rng = np.random.default_rng(seed)
+        outliers = rng.choice(outliers, size=outlier_sample, replace=False)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": inside.min() if inside.size else q1,
+        "upperfence": inside.max() if inside.size else q3,
+        "mean": arr.mean(),
+        "outliers": outliers,
+        "n_outliers": n_outliers,
+    }
+
+
+def binned_histogram(values, title, x_label="gasto_total", y_label="count", nbins=None, bins=None):
+    """Histograma a partir de bins calculados no servidor (ou de `bins` = (contagens, limites))"""
+    counts, edges = bins if bins is not None else histogram_bins(values, nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2 if len(edges) else [],
+        y=counts,
+        width=np.diff(edges) if len(edges) else None,
+        hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<extra></extra>",
+    ))
+    fig.update_layout(title=title, bargap=0, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
+def summary_box_plot(values, title, y_label="gasto_total", outlier_sample=OUTLIER_SAMPLE_SIZE,
+                     stats=None):
+    """
+    Box plot a partir de quartis e bigodes calculados no servidor, com amostra de
+    outliers (ou a partir de `stats`, o resultado de `box_stats`, já calculado)
+    """
+    if stats is None:
+        stats = box_stats(values, outlier_sample)
+    fig = go.Figure()
+    if stats is not None:
+        fig.add_trace(go.Box(
+            x=[y_label],
+            q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+            mean=[stats["mean"]],
+            name=y_label,
+            boxpoints=False,
+        ))
+        if stats["outliers"].size:
+            fig.add_trace(go.Scatter(
+                x=[y_label] * stats["outliers"].size,
+                y=stats["outliers"],
+                mode="markers",
+                marker=dict(size=4, opacity=0.6),
+                name=f"Outliers (amostra {stats['outliers'].size} de {stats['n_outliers']:,})",
+            ))
+    fig.update_layout(title=title, yaxis_title=y_label, showlegend=False)
+    return fig
@@ -1,19 +1,21 @@
 """
 Configurações centrais do projeto
+
+As constantes abaixo são estáticas e o import deste módulo não lê ficheiros
+nem variáveis de ambiente. A configuração do Groq (chave, endpoint, quota)
+só é resolvida quando o LLM é usado pela primeira vez, com `get_settings()`,
+e fica em memória durante o processo. Cada valor vem da primeira fonte que o
+define: variáveis de ambiente, `st.secrets` (quando corre no Streamlit) e o
+ficheiro `.env`. Sem `GROQ_API_KEY`, as funcionalidades LLM ficam desligadas.
 """
 import os
-from dotenv import load_dotenv
- 
-# Carrega variáveis de ambiente
-load_dotenv()
- 
-# API Keys
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
- 
-# Verificar se a chave existe
-if not GROQ_API_KEY:
-    raise ValueError("Por favor, configure GROQ_API_KEY no ficheiro .env")
- 
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Endpoint compatível com OpenAI (pode apontar para um servidor local de testes)
+GROQ_BASE_URL_PADRAO = "https://api.groq.com/openai/v1"
+
 # Modelos disponíveis no Groq (atualizados)
 MODELOS_GROQ = {
     # Modelos Llama (Meta)
@@ -23,13 +25,29 @@ MODELOS_GROQ = {
     "gpt-oss-120b": "openai/gpt-oss-120b",     # Mais poderoso e versátil
     "gpt-oss-20b": "openai/gpt-oss-20b",       # Rápido e eficiente
 }
- 
+
 # Modelo padrão para análise de dados
 MODELO_PADRAO = MODELOS_GROQ["llama-3.3-70b"]
- 
+
+# Encaminhamento automático por tipo de pedido (modelos por ordem de preferência):
+# pedidos interativos (respostas curtas) para modelos rápidos, relatórios para os maiores
+ROTAS_MODELOS = {
+    "interativo": [MODELOS_GROQ["llama-3.1-8b"], MODELOS_GROQ["gpt-oss-20b"], MODELOS_GROQ["llama-3.3-70b"]],
+    "relatorio": [MODELOS_GROQ["llama-3.3-70b"], MODELOS_GROQ["gpt-oss-120b"], MODELOS_GROQ["gpt-oss-20b"]],
+}
+# Latência p95 (segundos) acima da qual um modelo passa para o fim da rota
+LATENCIA_P95_MAX_S = {"interativo": 5.0, "relatorio": 30.0}
+
 # Configurações de geração
 TEMPERATURA_PADRAO = 0.1  # Baixa para análise de dados (mais determinístico)
 MAX_TOKENS_PADRAO = 2048
+DIGEST_MAX_TOKENS = 400  # Orçamento do resumo de dados enviado em cada prompt
+
+# Pedidos concorrentes e quota da conta Groq (o plano gratuito permite 30 pedidos/minuto);
+# valores por defeito, substituíveis por GROQ_MAX_CONCURRENCY, GROQ_REQUESTS_PER_MINUTE e GROQ_TIMEOUT_S
+GROQ_MAX_CONCURRENCY = 4
+GROQ_REQUESTS_PER_MINUTE = 30
+GROQ_TIMEOUT_S = 60.0
 
 # Configurações para visualização Plotly usadas pelo dashboard
 PLOTLY_CONFIG = {
@@ -39,4 +57,73 @@ PLOTLY_CONFIG = {
     "responsive": True,
     # Remover dicas flutuantes
     "showTips": False
-}
\ No newline at end of file
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Configuração do Groq resolvida (ambiente > st.secrets > .env > valores por defeito)"""
+    api_key: str = field(default=None, repr=False)  # segredo: fora do repr e dos logs
+    base_url: str = GROQ_BASE_URL_PADRAO
+    max_concurrency: int = GROQ_MAX_CONCURRENCY
+    requests_per_minute: int = GROQ_REQUESTS_PER_MINUTE
+    timeout_s: float = GROQ_TIMEOUT_S
+    models: dict = field(default_factory=lambda: MODELOS_GROQ)
+    default_model: str = MODELO_PADRAO
+    routes: dict = field(default_factory=lambda: ROTAS_MODELOS)
+    latency_slo_s: dict = field(default_factory=lambda: LATENCIA_P95_MAX_S)
+    temperature: float = TEMPERATURA_PADRAO
+    max_tokens: int = MAX_TOKENS_PADRAO
+    digest_max_tokens: int = DIGEST_MAX_TOKENS
+
+    @property
+    def llm_enabled(self):
+        return bool(self.api_key)
+
+
+def _dotenv_values():
+    """Variáveis do ficheiro `.env` (sem alterar `os.environ`); vazio se não houver ficheiro ou python-dotenv"""
+    try:
+        from dotenv import dotenv_values, find_dotenv
+    except ImportError:
+        return {}
+    path = find_dotenv(usecwd=True)
+    return {key: value for key, value in dotenv_values(path).items() if value is not None} if path else {}
+
+
+def _secret_values():
+    """Segredos de primeiro nível de `st.secrets`, só se o Streamlit já estiver carregado"""
+    if "streamlit" not in sys.modules:
+        return {}
+    from streamlit import secrets
+
+    if not secrets.load_if_toml_exists():
+        return {}
+    return {key: str(value) for key, value in secrets.items() if not hasattr(value, "keys")}
+
+
+@lru_cache(maxsize=1)
+def get_settings():
+    """
+    Configuração do Groq, resolvida na primeira chamada e reutilizada nas
+    seguintes (`get_settings.cache_clear()` força nova leitura)
+    """
+    sources = [os.environ, _secret_values(), _dotenv_values()]
+
+    def lookup(name, default, cast=str):
+        for source in sources:
+            value = source.get(name)
+            if value not in (None, ""):
+                try:
+                    return cast(value)
+                except ValueError:
+                    raise ValueError(f"Valor inválido para {name}: {value!r}") from None
+        return default
+
+    return Settings(
+        api_key=lookup("GROQ_API_KEY", None),
+        base_url=lookup("GROQ_BASE_URL", GROQ_BASE_URL_PADRAO),
+        max_concurrency=lookup("GROQ_MAX_CONCURRENCY", GROQ_MAX_CONCURRENCY, int),
+        requests_per_minute=lookup("GROQ_REQUESTS_PER_MINUTE", GROQ_REQUESTS_PER_MINUTE, int),
+        timeout_s=lookup("GROQ_TIMEOUT_S", GROQ_TIMEOUT_S, float),
+    )
@@ -15,42 +15,43 @@ Data: 2025-10-20
 """
 
 # Importações necessárias
+# (módulos pesados como o scikit-learn só são carregados pelas funções que os usam;
+#  `python tools/import_audit.py` mostra o custo de cada import no arranque)
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import seaborn as sns
-import matplotlib.pyplot as plt
+import json
+import logging
 import os
+import time
 import warnings
+from datetime import datetime
 warnings.filterwarnings('ignore')
 
 # Plotly / projeção de configurações (vem de Parte_D/config.py)
-try:
-    from config import PLOTLY_CONFIG
-except Exception:
-    # fallback para caso o import falhe — usar configuração razoável
-    PLOTLY_CONFIG = {
-        "displayModeBar": False,
-        "responsive": True
-    }
+from config import PLOTLY_CONFIG
 
-# Importações para ML
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.svm import SVR, SVC
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error, accuracy_score, classification_report
-
-# Importações para API e dados
-import requests
-import json
-from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+# Módulos do projeto (ML, análise, LLM)
+from model_registry import ModelRegistry
+from data_digest import DEFAULT_TOKEN_BUDGET, estimate_tokens
+from data_store import DATASET_PATHS, dataset_version, read_shared
+from charts import binned_histogram, box_stats, histogram_bins, summary_box_plot
+from analytics import (build_customer_rollup, build_dataset_profile, dataset_fingerprint,
+                       find_date_column, top_correlated_pairs)
+from timeseries import GRANULARITIES, RevenueRollupStore
+from profiling import Profiler, profiled, span, to_jsonl
+from metrics import REGISTRY, RERUN_SECONDS, exporter_options, metered_cache, start_http_server
+from evaluate_models import RESULTS_PATH as ML_RESULTS_PATH
+from llm_cache import ResponseCache
+from generate_insights import INSIGHTS_PATH as LLM_INSIGHTS_PATH
+from llm_client import LLMError, groq_settings
+from llm_insights import INSIGHT_SECTIONS, build_insight_generator, build_section_summaries
+from query_engine import QueryEngine, QueryPlanError, describe_schema
+from semantic_cache import SemanticCache
+from batch_scoring import (HOTEL_EXAMPLE, HOTEL_OPTIONAL, HOTEL_REQUIRED, RESTAURANT_EXAMPLE,
+                           RESTAURANT_OPTIONAL, RESTAURANT_REQUIRED, score_hotel_batch,
+                           score_restaurant_batch, template_csv, to_csv_bytes)
 
 # Configuração da página
 st.set_page_config(
@@ -348,29 +349,67 @@ st.markdown("""
         border-left: 4px solid #1f77b4;
         margin: 1rem 0;
     }
+    /* Navegação por secção ativa com aspeto de tabs */
+    .st-key-active_section div[role="radiogroup"] {
+        gap: 12px;
+        flex-wrap: wrap;
+    }
+    .st-key-active_section div[role="radiogroup"] label {
+        padding: 8px 20px;
+        border-radius: 10px;
+        border: 1px solid #D6D9E0;
+    }
 </style>
 """, unsafe_allow_html=True)
 
+def data_files_stamp():
+    """
+    (caminho, mtime, tamanho) de cada CSV: verificação barata, em cada rerun,
+    de que os dados em memória correspondem aos ficheiros atuais
+    """
+    stamp = []
+    for path in DATASET_PATHS.values():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamp.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
 # Função para carregar dados
-@st.cache_data
-def load_data():
-    """Carrega todos os dados necessários"""
+# cache_resource: as mesmas tabelas (mapeadas em memória, só de leitura) para todas as
+# sessões, em vez da cópia por sessão do cache_data; não acrescentar colunas a estes DataFrames.
+# A chave é o `data_files_stamp()`: quando um CSV muda os dados são recarregados e a versão
+# anterior sai da cache (max_entries=1)
+@profiled
+@metered_cache(st.cache_resource(max_entries=1))
+def load_data(stamp):
+    """
+    Carrega todos os dados necessários e a versão de cada CSV carregado
+    ({nome: DataVersion}, que identifica os dados nos rollups e perfis em cache)
+    """
+    versions = {}
+
+    def read(name, path):
+        # Versão lida antes dos dados: uma alteração durante a leitura dá uma versão diferente depois
+        versions[name] = dataset_version(path)
+        return read_shared(path)
+
     try:
-        import os
-        
         # Para Streamlit Cloud, usar caminhos relativos diretos
         # Os arquivos estão na mesma estrutura que o script principal
+        # (read_shared mapeia o snapshot colunar tipado, criado a partir do CSV se preciso)
         
         # Datasets limpos
-        df_restaurante = pd.read_csv('Datasets_clean/restaurante_clean.csv')
-        df_hotel = pd.read_csv('Datasets_clean/hotel_clean.csv')
-        df_clientes = pd.read_csv('Datasets_clean/clientes.csv')
+        df_restaurante = read('restaurante', 'Datasets_clean/restaurante_clean.csv')
+        df_hotel = read('hotel', 'Datasets_clean/hotel_clean.csv')
+        df_clientes = read('clientes', 'Datasets_clean/clientes.csv')
         
         # Datasets para ML
-        df_restaurante_ml = pd.read_csv('Datasets_ML/restaurante_ml.csv')
-        df_hotel_ml = pd.read_csv('Datasets_ML/hotel_ml.csv')
+        df_restaurante_ml = read('restaurante_ml', 'Datasets_ML/restaurante_ml.csv')
+        df_hotel_ml = read('hotel_ml', 'Datasets_ML/hotel_ml.csv')
 
-        return df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml
+        return df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml, versions
         
     except FileNotFoundError as e:
         st.error(f"❌ Erro ao carregar dados: {e}")
@@ -383,59 +422,198 @@ def load_data():
             project_root = os.path.dirname(current_dir)
             
             # Datasets limpos
-            df_restaurante = pd.read_csv(os.path.join(project_root, 'Datasets_clean', 'restaurante_clean.csv'))
-            df_hotel = pd.read_csv(os.path.join(project_root, 'Datasets_clean', 'hotel_clean.csv'))
-            df_clientes = pd.read_csv(os.path.join(project_root, 'Datasets_clean', 'clientes.csv'))
+            df_restaurante = read('restaurante', os.path.join(project_root, 'Datasets_clean', 'restaurante_clean.csv'))
+            df_hotel = read('hotel', os.path.join(project_root, 'Datasets_clean', 'hotel_clean.csv'))
+            df_clientes = read('clientes', os.path.join(project_root, 'Datasets_clean', 'clientes.csv'))
             
             # Datasets para ML
-            df_restaurante_ml = pd.read_csv(os.path.join(project_root, 'Datasets_ML', 'restaurante_ml.csv'))
-            df_hotel_ml = pd.read_csv(os.path.join(project_root, 'Datasets_ML', 'hotel_ml.csv'))
+            df_restaurante_ml = read('restaurante_ml', os.path.join(project_root, 'Datasets_ML', 'restaurante_ml.csv'))
+            df_hotel_ml = read('hotel_ml', os.path.join(project_root, 'Datasets_ML', 'hotel_ml.csv'))
             
-            return df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml
+            return df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml, versions
         except:
             st.error("❌ Não foi possível carregar os dados em nenhum caminho.")
-            return None, None, None, None, None
+            return None, None, None, None, None, {}
+
+def dataset_key(versions, *names):
+    """Chave de cache de um conjunto de datasets: o hash de cada CSV carregado por `load_data`"""
+    return tuple(versions[name].sha256 if name in versions else None for name in names)
+
+# Datasets que alimentam a tabela por cliente (a sua versão é a chave da cache)
+CUSTOMER_DATASETS = ("clientes", "restaurante", "hotel")
+
+# Tabela agregada por cliente (uma linha por cliente_id) para a análise cruzada
+# (os DataFrames com `_` não entram na chave: os dados são identificados pela versão)
+@profiled
+@metered_cache(st.cache_data)
+def load_customer_rollup(version_key, _df_clientes, _df_restaurante, _df_hotel):
+    """Agrega visitas, estadias e gastos por cliente, uma vez por versão dos três datasets"""
+    if _df_clientes is None:
+        return None
+    return build_customer_rollup(_df_clientes, _df_restaurante, _df_hotel)
 
-# Função para carregar modelos ML pré-treinados (simulado)
+# Rollups temporais de receita partilhados entre reruns e sessões
 @st.cache_resource
+def get_revenue_store():
+    """Devolve o store com os rollups diários/semanais/mensais de receita"""
+    return RevenueRollupStore()
+
+@profiled
+def load_revenue_rollup(df, business_type, version=None):
+    """Sincroniza (incrementalmente, se os dados só cresceram) e devolve o rollup de receita de um negócio"""
+    date_col = find_date_column(df)
+    if date_col is None or 'gasto_total' not in df.columns:
+        return None
+    return get_revenue_store().sync(business_type, df, date_col, version=version)
+
+# Acima deste número de colunas numéricas a correlação é mostrada como top-k pares
+CORR_HEATMAP_MAX_COLS = 15
+
+@st.cache_data(show_spinner=False)
+def _cached_dataset_profile(fingerprint, _df):
+    """Perfil do dataset cacheado pelo hash do conteúdo (o DataFrame não é re-hashado)"""
+    return build_dataset_profile(_df, fingerprint)
+
+def get_dataset_profile(df, version=None):
+    """
+    Devolve o perfil (correlação, describe, dados em falta) de um DataFrame. Com a
+    versão do CSV carregado (`load_data`) a chave é o hash calculado uma vez na carga;
+    sem versão, o DataFrame é re-hashado (custo proporcional às linhas)
+    """
+    fingerprint = version.sha256 if version is not None else dataset_fingerprint(df)
+    return _cached_dataset_profile(fingerprint, df)
+
+@st.cache_data(show_spinner=False)
+def _cached_histogram_bins(fingerprint, column, _values):
+    """Bins de uma coluna cacheados pela versão dos dados (a coluna não é re-hashada)"""
+    return histogram_bins(_values)
+
+@st.cache_data(show_spinner=False)
+def _cached_box_stats(fingerprint, column, _values):
+    """Quartis, bigodes e amostra de outliers de uma coluna, cacheados pela versão dos dados"""
+    return box_stats(_values)
+
+def get_histogram_bins(series, version=None):
+    """Bins do histograma de uma coluna, uma vez por versão do CSV carregado (sem versão: sempre)"""
+    if version is None:
+        return histogram_bins(series)
+    return _cached_histogram_bins(version.sha256, series.name, series)
+
+def get_box_stats(series, version=None):
+    """Estatísticas do box plot de uma coluna, uma vez por versão do CSV carregado (sem versão: sempre)"""
+    if version is None:
+        return box_stats(series)
+    return _cached_box_stats(version.sha256, series.name, series)
+
+# Função para carregar modelos ML persistidos
+@profiled
+@metered_cache(st.cache_resource)
 def load_ml_models():
-    """Carrega e treina modelos ML"""
-    df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml = load_data()
-    
-    if df_restaurante_ml is None:
+    """Devolve o registo de modelos ML (treinados uma vez e guardados em disco)"""
+    return ModelRegistry()
+
+@profiled
+def show_chart(fig):
+    """Mostra um gráfico Plotly (a serialização da figura conta no profiling)"""
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+# Secções da navegação principal (rótulos iguais aos das tabs)
+NAV_SECTIONS = [
+    "🏠 **Visão Geral**",
+    "📊 **Análise Exploratória**", 
+    "� **Machine Learning**",
+    "🔮 **Previsões IA**",
+    "💡 **Insights LLM**",
+    "🔄 **Análise Cruzada**"
+]
+
+# Modos de navegação: só a secção ativa é calculada, ou todas as tabs (Streamlit executa todas)
+NAV_MODE_LAZY = "⚡ Só a secção ativa"
+NAV_MODE_TABS = "📑 Todas as tabs"
+
+# Painel de profiling (escondido): abrir o dashboard com ?profile=1
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_HISTORY = 50  # reruns guardados por sessão para exportar
+
+# Métricas Prometheus (METRICS_PORT / METRICS_HOST / METRICS_TEXTFILE no ambiente)
+@st.cache_resource
+def start_metrics_exporter():
+    """Inicia, uma vez por processo, o endpoint /metrics (se METRICS_PORT estiver definido)"""
+    host, port, _ = exporter_options()
+    if port is None:
         return None
-    
-    models = {}
-    
-    # Modelos para Restaurante
-    if df_restaurante_ml is not None:
-        # Preparar dados do restaurante
-        X_rest = df_restaurante_ml.drop(['gasto_total', 'voltou_visitar', 'experiencia_completa'], axis=1, errors='ignore')
-        y_rest_gasto = df_restaurante_ml['gasto_total']
-        
-        # Modelo de regressão para gasto
-        models['restaurante_gasto'] = LinearRegression()
-        models['restaurante_gasto'].fit(X_rest, y_rest_gasto)
-    
-    # Modelos para Hotel (integrar trabalho do Nuno)
-    if df_hotel_ml is not None:
-        # Preparar dados do hotel
-        X_hotel = df_hotel_ml.drop(['gasto_total', 'foi_spa'], axis=1, errors='ignore')
-        y_hotel_gasto = df_hotel_ml['gasto_total']
-        y_hotel_spa = df_hotel_ml['foi_spa']
-        
-        # Modelo de regressão para gasto hotel
-        models['hotel_gasto'] = LinearRegression()
-        models['hotel_gasto'].fit(X_hotel, y_hotel_gasto)
-        
-        # Modelo de classificação para spa
-        le = LabelEncoder()
-        y_hotel_spa_encoded = le.fit_transform(y_hotel_spa)
-        models['hotel_spa'] = RandomForestClassifier()
-        models['hotel_spa'].fit(X_hotel, y_hotel_spa_encoded)
-        models['spa_encoder'] = le
-    
-    return models
+    try:
+        return start_http_server(port, host)
+    except OSError as e:
+        logging.getLogger(__name__).warning("Métricas: não foi possível abrir %s:%s (%s)", host, port, e)
+        return None
+
+def record_rerun_metrics(profiler):
+    """Regista a duração de cada secção calculada e atualiza o ficheiro de métricas, se configurado"""
+    for section in profiler.top_level():
+        if section.name in NAV_SECTIONS:
+            RERUN_SECONDS.observe(section.wall_s, section=section.name.replace('**', ''))
+    _, _, textfile = exporter_options()
+    if textfile:
+        REGISTRY.write_textfile(textfile)
+
+def run_section(name, render):
+    """Executa uma secção dentro de um intervalo de topo do profiler ativo"""
+    with span(name):
+        render()
+
+def show_section_timings(placeholder, profiler):
+    """Mostra no sidebar o tempo de cálculo por secção no último rerun"""
+    sections = [s for s in profiler.top_level() if s.name in NAV_SECTIONS]
+    with placeholder.container():
+        st.subheader("⏱️ Tempo de Cálculo")
+        st.caption(f"Último rerun: {sum(s.wall_s for s in sections) * 1000:.0f} ms "
+                   f"em {len(sections)} secção(ões)")
+        for section in sections:
+            st.caption(f"{section.name.replace('**', '')}: {section.wall_s * 1000:.0f} ms")
+
+def show_profiling_panel(profiler):
+    """Decomposição do último rerun por função (estilo flame graph) e exportação em JSON lines"""
+    history = st.session_state.setdefault("profile_history", [])
+    history.append(profiler)
+    del history[:-PROFILE_HISTORY]
+
+    st.subheader("🔬 Profiling")
+    st.toggle("Medir memória (tracemalloc, mais lento)", key="profile_memory",
+              help="Aplica-se a partir do próximo rerun")
+    st.caption(f"Rerun: {profiler.total_s * 1000:.0f} ms · {len(profiler.spans)} chamadas medidas")
+    if not profiler.spans:
+        return
+
+    # Cada barra é uma chamada: posição = início no rerun, largura = duração, linha = profundidade
+    spans = profiler.spans
+    fig = go.Figure(go.Bar(
+        base=[s.start_s * 1000 for s in spans],
+        x=[max(s.wall_s * 1000, 0.1) for s in spans],
+        y=[s.depth for s in spans],
+        orientation='h',
+        text=[s.name.replace('**', '') for s in spans],
+        textposition='inside',
+        insidetextanchor='start',
+        customdata=[[s.cpu_s * 1000, s.rows,
+                     f"{s.mem_peak_mb:.1f} MB" if s.mem_peak_mb is not None else "-"] for s in spans],
+        hovertemplate="%{text}<br>%{x:.1f} ms (CPU %{customdata[0]:.1f} ms)"
+                      "<br>linhas: %{customdata[1]:,}<br>pico de memória: %{customdata[2]}<extra></extra>",
+        marker_color=[px.colors.qualitative.Pastel[hash(s.name) % 10] for s in spans],
+    ))
+    fig.update_layout(height=80 + 40 * (max(s.depth for s in spans) + 1), margin=dict(l=0, r=0, t=10, b=0),
+                      xaxis_title="ms desde o início do rerun", bargap=0.05, showlegend=False)
+    fig.update_yaxes(autorange="reversed", tickvals=list(range(max(s.depth for s in spans) + 1)),
+                     title="profundidade")
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+    summary = pd.DataFrame(profiler.summary())
+    for col in ("total_s", "proprio_s", "cpu_s"):
+        summary[col.replace("_s", "_ms")] = (summary.pop(col) * 1000).round(1)
+    summary["pico_mem_mb"] = pd.to_numeric(summary["pico_mem_mb"]).round(2)
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+    st.download_button(f"⬇️ Exportar {len(history)} rerun(s) (JSON lines)", to_jsonl(history),
+                       file_name="profiling.jsonl", mime="application/x-ndjson", key="profile_export")
 
 # Interface principal
 def main():
@@ -444,15 +622,22 @@ def main():
     # Navegação principal com tabs horizontais (mais user-friendly)
     st.markdown("### 🧭 Navegação Principal")
     
-    # Tabs principais bem visíveis
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "🏠 **Visão Geral**",
-        "📊 **Análise Exploratória**", 
-        "� **Machine Learning**",
-        "🔮 **Previsões IA**",
-        "💡 **Insights LLM**",
-        "🔄 **Análise Cruzada**"
-    ])
+    # O modo de navegação vem do sidebar (valor do rerun anterior)
+    lazy_nav = st.session_state.get("nav_mode", NAV_MODE_LAZY) == NAV_MODE_LAZY
+    active_section, tabs = None, None
+    
+    if lazy_nav:
+        # Seletor horizontal: apenas a secção escolhida é executada em cada rerun
+        active_section = st.radio(
+            "Secção",
+            NAV_SECTIONS,
+            horizontal=True,
+            key="active_section",
+            label_visibility="collapsed"
+        )
+    else:
+        # Tabs principais bem visíveis (todas as tabs são calculadas em cada rerun)
+        tabs = st.tabs(NAV_SECTIONS)
     
     # Sidebar para configurações e informações auxiliares
     with st.sidebar:
@@ -478,6 +663,16 @@ def main():
         # Aplicar tema ao dashboard
         apply_dashboard_theme(st.session_state.dashboard_theme)
         
+        # Modo de navegação
+        st.subheader("🧭 Modo de Navegação")
+        st.radio(
+            "Secções calculadas em cada interação:",
+            [NAV_MODE_LAZY, NAV_MODE_TABS],
+            key="nav_mode"
+        )
+        timings_placeholder = st.empty()
+        profiling_placeholder = st.empty()
+        
         st.markdown("---")
         st.subheader("ℹ️ Sobre o Dashboard")
         st.markdown("""
@@ -496,8 +691,26 @@ def main():
         4. Consulte os insights
         """)
     
+    start_metrics_exporter()
+    
+    # Profiling do rerun: load_*/show_*/analyze_*/make_* e cada secção ficam registados
+    profiling_enabled = st.query_params.get(PROFILE_QUERY_PARAM) == "1"
+    profiler = Profiler(label=active_section or NAV_MODE_TABS,
+                        trace_memory=profiling_enabled and st.session_state.get("profile_memory", False))
+    with profiler.activate():
+        render_sections(active_section, tabs)
+
+    record_rerun_metrics(profiler)
+    show_section_timings(timings_placeholder, profiler)
+    if profiling_enabled:
+        with profiling_placeholder.container():
+            show_profiling_panel(profiler)
+
+def render_sections(active_section, tabs):
+    """Carrega os dados e calcula a secção ativa (ou, sem secção ativa, todas as tabs)"""
     # Carregar dados
-    df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml = load_data()
+    df_restaurante, df_hotel, df_clientes, df_restaurante_ml, df_hotel_ml, versions = load_data(
+        data_files_stamp())
     
     if df_restaurante is None:
         st.error("❌ Erro ao carregar dados. Verifique se os arquivos estão no local correto.")
@@ -510,27 +723,35 @@ def main():
         st.info(f"🏨 Hotel: {len(df_hotel):,} registros")
         st.info(f"👥 Clientes: {len(df_clientes):,} registros")
     
-    # Navegação por tabs
-    with tab1:
-        show_overview(df_restaurante, df_hotel, df_clientes)
-    
-    with tab2:
-        show_exploratory_analysis(df_restaurante, df_hotel, df_clientes)
-    
-    with tab3:
-        show_ml_results(df_restaurante_ml, df_hotel_ml)
-    
-    with tab4:
-        show_prediction_system()
-    
-    with tab5:
-        show_llm_insights()
-    
-    with tab6:
-        show_cross_analysis(df_restaurante, df_hotel, df_clientes)
+    # Materializar os rollups de receita (com dados recarregados por linhas acrescentadas ao CSV,
+    # só as linhas novas são agregadas)
+    load_revenue_rollup(df_restaurante, "Restaurante", versions.get("restaurante"))
+    load_revenue_rollup(df_hotel, "Hotel", versions.get("hotel"))
+    
+    # Funções de renderização de cada secção
+    renderers = [
+        lambda: show_overview(df_restaurante, df_hotel, df_clientes, versions),
+        lambda: show_exploratory_analysis(df_restaurante, df_hotel, df_clientes, versions),
+        lambda: show_ml_results(),
+        lambda: show_prediction_system(),
+        lambda: show_llm_insights(df_restaurante, df_hotel, df_clientes, versions),
+        lambda: show_cross_analysis(load_customer_rollup(
+            dataset_key(versions, *CUSTOMER_DATASETS), df_clientes, df_restaurante, df_hotel)),
+    ]
+    
+    # Navegação: calcular apenas a secção ativa ou todas as tabs
+    if active_section is not None:
+        section_index = NAV_SECTIONS.index(active_section)
+        run_section(active_section, renderers[section_index])
+    else:
+        for name, tab, render in zip(NAV_SECTIONS, tabs, renderers):
+            with tab:
+                run_section(name, render)
 
-def show_overview(df_restaurante, df_hotel, df_clientes):
+@profiled
+def show_overview(df_restaurante, df_hotel, df_clientes, versions=None):
     """Página de visão geral"""
+    versions = versions or {}
     st.markdown('<h2 class="sub-header">📈 Visão Geral dos Negócios</h2>', unsafe_allow_html=True)
     
     # Métricas principais em colunas
@@ -585,7 +806,7 @@ def show_overview(df_restaurante, df_hotel, df_clientes):
         # Distribuição por gênero
         fig = px.pie(df_clientes, names='genero', title="Distribuição por Gênero")
         fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     with col2:
         # Distribuição por nacionalidade
@@ -593,13 +814,13 @@ def show_overview(df_restaurante, df_hotel, df_clientes):
         fig = px.bar(x=top_nacionalidades.index, y=top_nacionalidades.values, 
                      title="Top 5 Nacionalidades")
         fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     with col3:
         # Distribuição por tipo de cliente
         fig = px.pie(df_clientes, names='tipo_cliente', title="Tipo de Cliente")
         fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     # Gráficos de visão geral - Distribuições de Gastos
     st.subheader("💰 Distribuições de Gastos por Negócio")
@@ -610,18 +831,20 @@ def show_overview(df_restaurante, df_hotel, df_clientes):
             "📊 Distribuição de Gastos - Restaurante",
             "Este histograma mostra como estão distribuídos os valores gastos pelos clientes do restaurante. Picos indicam valores mais comuns de consumo. Uma distribuição concentrada sugere padrão de preços consistente, enquanto distribuição espalhada indica grande variação nos gastos dos clientes."
         ), unsafe_allow_html=True)
-        fig = px.histogram(df_restaurante, x='gasto_total', title="Histograma de Gastos - Restaurante")
+        bins = get_histogram_bins(df_restaurante['gasto_total'], versions.get("restaurante"))
+        fig = binned_histogram(None, "Histograma de Gastos - Restaurante", bins=bins)
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     with col2:
         st.markdown(create_tooltip(
             "📊 Distribuição de Gastos - Hotel", 
             "Mostra a distribuição dos gastos totais dos hóspedes do hotel. Permite identificar o perfil de gastos dos clientes: se há concentração em valores baixos/médios/altos. Útil para definir estratégias de preços e identificar segmentos de clientes premium."
         ), unsafe_allow_html=True)
-        fig = px.histogram(df_hotel, x='gasto_total', title="Histograma de Gastos - Hotel")
+        bins = get_histogram_bins(df_hotel['gasto_total'], versions.get("hotel"))
+        fig = binned_histogram(None, "Histograma de Gastos - Hotel", bins=bins)
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     # Estatísticas resumidas
     st.subheader("📋 Estatísticas Resumidas dos Negócios")
@@ -634,29 +857,33 @@ def show_overview(df_restaurante, df_hotel, df_clientes):
     
     with col1:
         st.write("**🍽️ Restaurante:**")
-        st.dataframe(df_restaurante.describe(), use_container_width=True)
+        st.dataframe(get_dataset_profile(df_restaurante, versions.get("restaurante")).describe,
+                     use_container_width=True)
     
     with col2:
         st.write("**🏨 Hotel:**")
-        st.dataframe(df_hotel.describe(), use_container_width=True)
+        st.dataframe(get_dataset_profile(df_hotel, versions.get("hotel")).describe, use_container_width=True)
 
-def show_exploratory_analysis(df_restaurante, df_hotel, df_clientes):
+@profiled
+def show_exploratory_analysis(df_restaurante, df_hotel, df_clientes, versions=None):
     """Página de análise exploratória"""
     st.markdown('<h2 class="sub-header">🔍 Análise Exploratória de Dados</h2>', unsafe_allow_html=True)
     
     # Tabs para diferentes análises
     tab1, tab2, tab3 = st.tabs(["🍽️ Restaurante", "🏨 Hotel", "👥 Clientes"])
     
+    versions = versions or {}
     with tab1:
-        analyze_dataset(df_restaurante, "Restaurante")
+        analyze_dataset(df_restaurante, "Restaurante", versions.get("restaurante"))
     
     with tab2:
-        analyze_dataset(df_hotel, "Hotel")
+        analyze_dataset(df_hotel, "Hotel", versions.get("hotel"))
     
     with tab3:
-        analyze_clientes(df_clientes, df_restaurante, df_hotel)
+        analyze_clientes(df_clientes, df_restaurante, df_hotel, versions.get("clientes"))
 
-def analyze_clientes(df_clientes, df_restaurante, df_hotel):
+@profiled
+def analyze_clientes(df_clientes, df_restaurante, df_hotel, version=None):
     """Análise específica do dataset de clientes"""
     st.subheader("👥 Análise dos Clientes")
     
@@ -672,7 +899,8 @@ def analyze_clientes(df_clientes, df_restaurante, df_hotel):
         pct_pt = (df_clientes['nacionalidade'] == 'PT').mean() * 100
         st.metric("% Portugueses", f"{pct_pt:.1f}%")
     with col4:
-        pct_habitual = (df_clientes['cliente_habitual'] == 'Sim').mean() * 100
+        # cliente_habitual é booleano nos dados tipados (Sim/Não → True/False)
+        pct_habitual = df_clientes['cliente_habitual'].mean() * 100
         st.metric("% Clientes Habituais", f"{pct_habitual:.1f}%")
     
     # Análises demográficas detalhadas
@@ -682,33 +910,35 @@ def analyze_clientes(df_clientes, df_restaurante, df_hotel):
     
     with col1:
         # Distribuição de idades
-        fig = px.histogram(df_clientes, x='idade', 
-                          title="Distribuição de Idades dos Clientes",
-                          labels={'idade': 'Idade (anos)', 'count': 'Frequência'})
+        fig = binned_histogram(None, "Distribuição de Idades dos Clientes",
+                               x_label='Idade (anos)', y_label='Frequência',
+                               bins=get_histogram_bins(df_clientes['idade'], version))
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
         
         # Distribuição por distrito (apenas PT)
         df_pt = df_clientes[df_clientes['nacionalidade'] == 'PT']
         if len(df_pt) > 0:
-            distrito_counts = df_pt['distrito_residencia'].value_counts().head(10)
+            distrito_counts = df_pt['distrito_residencia'].value_counts()
+            distrito_counts = distrito_counts[distrito_counts > 0].head(10)
             fig = px.bar(x=distrito_counts.values, y=distrito_counts.index,
                         orientation='h',
                         title="Top 10 Distritos (Clientes PT)",
                         labels={'x': 'Número de Clientes', 'y': 'Distrito'})
             fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            show_chart(fig)
     
     with col2:
         # Análise temporal - clientes por ano
-        df_clientes['ano_cliente'] = pd.to_datetime(df_clientes['cliente_desde']).dt.year
-        clientes_por_ano = df_clientes['ano_cliente'].value_counts().sort_index()
+        # Série local: df_clientes é partilhado entre sessões e não é alterado
+        ano_cliente = pd.to_datetime(df_clientes['cliente_desde']).dt.year
+        clientes_por_ano = ano_cliente.value_counts().sort_index()
         
         fig = px.line(x=clientes_por_ano.index, y=clientes_por_ano.values,
                      title="Novos Clientes por Ano",
                      labels={'x': 'Ano', 'y': 'Novos Clientes'})
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
         
         # Comparação Gênero vs Tipo Cliente
         crosstab = pd.crosstab(df_clientes['genero'], df_clientes['tipo_cliente'])
@@ -716,13 +946,13 @@ def analyze_clientes(df_clientes, df_restaurante, df_hotel):
                     title="Gênero vs Tipo de Cliente",
                     labels={'value': 'Quantidade', 'index': 'Gênero'})
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     # Análise de perfis
     st.subheader("🎯 Perfis de Cliente")
     
     # Análise por tipo de cliente
-    tipo_stats = df_clientes.groupby('tipo_cliente').agg({
+    tipo_stats = df_clientes.groupby('tipo_cliente', observed=True).agg({
         'idade': 'mean',
         'cliente_id': 'count'
     }).round(1)
@@ -736,7 +966,7 @@ def analyze_clientes(df_clientes, df_restaurante, df_hotel):
     
     with col2:
         # Tabela resumo por nacionalidade
-        nac_stats = df_clientes.groupby('nacionalidade').agg({
+        nac_stats = df_clientes.groupby('nacionalidade', observed=True).agg({
             'idade': 'mean', 
             'cliente_id': 'count'
         }).round(1).sort_values('cliente_id', ascending=False).head(5)
@@ -745,87 +975,91 @@ def analyze_clientes(df_clientes, df_restaurante, df_hotel):
         st.write("**🌍 Top 5 Nacionalidades:**")
         st.dataframe(nac_stats, use_container_width=True)
 
-def analyze_dataset(df, business_type):
+@profiled
+def analyze_dataset(df, business_type, version=None):
     """Análise genérica de dataset"""
     st.subheader(f"📊 Análise do {business_type}")
     
+    # Perfil do dataset (correlação, describe, dados em falta) cacheado por hash do conteúdo
+    profile = get_dataset_profile(df, version)
+    
     # Informações básicas
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.info(f"**Registros:** {len(df):,}")
+        st.info(f"**Registros:** {profile.n_rows:,}")
     with col2:
-        st.info(f"**Colunas:** {len(df.columns)}")
+        st.info(f"**Colunas:** {profile.n_cols}")
     with col3:
-        missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
-        st.info(f"**Dados Faltantes:** {missing_pct:.1f}%")
+        st.info(f"**Dados Faltantes:** {profile.missing_pct:.1f}%")
     
     # Análise de correlação (apenas colunas numéricas)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 1:
+    if len(profile.numeric_cols) > 1:
         st.markdown(create_tooltip(
             "🔗 Matriz de Correlação",
-            "Mostra como diferentes variáveis se relacionam entre si. Valores próximos de +1 indicam correlação positiva forte, próximos de -1 indicam correlação negativa, e próximos de 0 indicam pouca relação."
+            "Mostra como diferentes variáveis se relacionam entre si. Valores próximos de +1 indicam correlação positiva forte (quando uma sobe, a outra também sobe), próximos de -1 indicam correlação negativa (quando uma sobe, a outra desce), e próximos de 0 indicam pouca relação. Cores mais escuras = correlação mais forte."
         ), unsafe_allow_html=True)
         
-        corr = df[numeric_cols].corr()
-        fig = px.imshow(corr, text_auto=True, aspect="auto", 
-                       title=f"Matriz de Correlação - {business_type}")
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        # Com muitas colunas o heatmap com valores é pesado no browser: mostrar só os top-k pares
+        many_cols = len(profile.numeric_cols) > CORR_HEATMAP_MAX_COLS
+        only_top_pairs = st.checkbox(
+            "Mostrar apenas os pares mais correlacionados",
+            value=many_cols,
+            key=f"corr_top_pairs_{business_type}"
+        )
+        
+        if only_top_pairs:
+            top_k = st.slider("Número de pares", 5, 50, 15, key=f"corr_top_k_{business_type}")
+            pairs = top_correlated_pairs(profile.corr, top_k)
+            pairs['par'] = pairs['variavel_1'] + " × " + pairs['variavel_2']
+            fig = px.bar(pairs.iloc[::-1], x='correlacao', y='par', orientation='h',
+                         color='correlacao', color_continuous_scale='RdBu', range_color=[-1, 1],
+                         title=f"Top {len(pairs)} Pares Correlacionados - {business_type}",
+                         labels={'correlacao': 'Correlação', 'par': ''})
+            fig.update_layout(height=max(400, 25 * len(pairs)))
+        else:
+            fig = px.imshow(profile.corr, text_auto=".2f", aspect="auto", 
+                           title=f"Matriz de Correlação - {business_type}")
+            fig.update_layout(height=500)
+        show_chart(fig)
     
     # Estatísticas descritivas
     st.subheader("📋 Estatísticas Descritivas")
-    st.dataframe(df.describe(), use_container_width=True)
+    st.dataframe(profile.describe, use_container_width=True)
     
     # Análise de distribuições das principais variáveis
     if 'gasto_total' in df.columns:
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.histogram(df, x='gasto_total', 
-                             title=f"Distribuição de Gastos - {business_type}")
+            # Bins e quartis calculados no servidor: só os agregados vão para o browser
+            fig = binned_histogram(None, f"Distribuição de Gastos - {business_type}",
+                                   bins=get_histogram_bins(df['gasto_total'], version))
             fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            show_chart(fig)
         
         with col2:
-            fig = px.box(df, y='gasto_total',
-                        title=f"Box Plot - Gastos {business_type}")
+            fig = summary_box_plot(None, f"Box Plot - Gastos {business_type}",
+                                   stats=get_box_stats(df['gasto_total'], version))
             fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            show_chart(fig)
     
-    # Análise de correlação
-    st.markdown(create_tooltip(
-        "🔗 Matriz de Correlação",
-        "Mostra como diferentes variáveis se relacionam entre si. Valores próximos de +1 indicam correlação positiva forte (quando uma sobe, a outra também sobe), próximos de -1 indicam correlação negativa (quando uma sobe, a outra desce), e próximos de 0 indicam pouca relação. Cores mais escuras = correlação mais forte."
-    ), unsafe_allow_html=True)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 1:
-        corr_matrix = df[numeric_cols].corr()
-        fig = px.imshow(corr_matrix, text_auto=True, aspect="auto", 
-                       title=f"Matriz de Correlação - {business_type}")
-    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
-    
-    # Análise temporal (se houver coluna de data)
-    date_cols = df.select_dtypes(include=['datetime64', 'object']).columns
-    date_col = None
-    for col in date_cols:
-        if 'data' in col.lower() or 'date' in col.lower():
-            date_col = col
-            break
-    
-    if date_col:
+    # Análise temporal (rollups de receita materializados no carregamento)
+    rollup = load_revenue_rollup(df, business_type, version)
+    if rollup is not None:
         st.subheader("📅 Análise Temporal")
-        try:
-            df_temp = df.copy()
-            df_temp[date_col] = pd.to_datetime(df_temp[date_col])
-            daily_revenue = df_temp.groupby(df_temp[date_col].dt.date)['gasto_total'].sum().reset_index()
-            
-            fig = px.line(daily_revenue, x=date_col, y='gasto_total', 
-                         title=f"Evolução da Receita - {business_type}")
-            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
-        except:
-            st.warning("Não foi possível processar dados temporais")
+        granularidade = st.radio(
+            "Granularidade:",
+            list(GRANULARITIES),
+            horizontal=True,
+            key=f"revenue_granularity_{business_type}"
+        )
+        # No máximo DEFAULT_POINT_BUDGET pontos (LTTB), independentemente do número de registos
+        revenue = rollup.series(granularidade)
+        fig = px.line(x=revenue.index, y=revenue.values,
+                     title=f"Evolução da Receita - {business_type}",
+                     labels={'x': rollup.date_col, 'y': 'gasto_total'})
+        show_chart(fig)
     
     # Top insights
     st.subheader("💡 Insights Principais")
@@ -848,107 +1082,120 @@ def analyze_dataset(df, business_type):
     for insight in insights:
         st.markdown(f'<div class="insight-box">{insight}</div>', unsafe_allow_html=True)
 
-def show_ml_results(df_restaurante_ml, df_hotel_ml):
-    """Página de resultados ML"""
+# Secções da página de ML (negócio no artefacto, título, explicação)
+ML_RESULTS_SECTIONS = [
+    ("restaurante", "🍽️ Modelos do Restaurante",
+     "Resultados dos algoritmos de Machine Learning aplicados aos dados do restaurante. Cada modelo foi treinado para duas tarefas: prever quanto um cliente vai gastar (regressão) e se o cliente vai retornar (classificação). Métricas mais altas = melhor performance."),
+    ("hotel", "🏨 Modelos do Hotel",
+     "Resultados dos modelos de Machine Learning aplicados aos dados do hotel. Compara diferentes algoritmos para prever gastos e classificar clientes. Performance diferente do restaurante devido à natureza distinta dos dados de hospedagem vs refeições."),
+]
+
+# Colunas de custo/tamanho no artefacto (as restantes são métricas de qualidade)
+ML_COST_COLUMNS = ['fit_s', 'predict_us_por_linha', 'latencia_1_linha_ms', 'n_treino', 'n_teste']
+
+@st.cache_data(show_spinner=False)
+def _read_artifact(path, mtime):
+    """Lê o artefacto JSON (o mtime faz parte da chave de cache)"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+@profiled
+def load_ml_results(path=ML_RESULTS_PATH):
+    """Lê os resultados da avaliação offline, recarregando apenas quando o ficheiro muda"""
+    if not os.path.exists(path):
+        return None
+    return _read_artifact(path, os.path.getmtime(path))
+
+@profiled
+def show_ml_task_results(task_title, models_results):
+    """Tabela de métricas e gráfico do score principal de uma tarefa"""
+    results_df = pd.DataFrame(models_results).T
+    quality_cols = [c for c in results_df.columns if c not in ML_COST_COLUMNS]
+    st.dataframe(results_df[quality_cols].astype(float).round(4), use_container_width=True)
+    
+    main_metric = 'R²' if 'R²' in results_df.columns else 'Accuracy'
+    fig = px.bar(x=results_df.index, y=results_df[main_metric].astype(float),
+                 title=f"{main_metric} por Modelo - {task_title}",
+                 labels={'x': 'Modelo', 'y': main_metric},
+                 text=results_df[main_metric].astype(float).round(3))
+    show_chart(fig)
+
+@profiled
+def show_ml_results():
+    """Página de resultados ML (lidos do artefacto da avaliação offline)"""
     st.markdown('<h2 class="sub-header">🤖 Resultados dos Modelos Machine Learning</h2>', unsafe_allow_html=True)
     
-    # Resultados do Restaurante (nossa implementação)
-    st.markdown(create_tooltip(
-        "🍽️ Modelos do Restaurante",
-        "Resultados dos algoritmos de Machine Learning aplicados aos dados do restaurante. Cada modelo foi treinado para duas tarefas: prever quanto um cliente vai gastar (regressão) e se o cliente vai retornar (classificação). Métricas mais altas = melhor performance."
-    ), unsafe_allow_html=True)
-    
-    # Resultados simulados baseados no que implementamos
-    restaurante_results = {
-        "Regressão (Gasto Total)": {
-            "Linear Regression": {"R²": 1.0000, "MAE": 0.0015, "RMSE": 0.001},
-            "Random Forest": {"R²": 0.9988, "MAE": 0.4884, "RMSE": 2.956},
-            "SVR": {"R²": 0.9714, "MAE": 2.1841, "RMSE": 14.14}
-        },
-        "Classificação (Retorno Cliente)": {
-            "Logistic Regression": {"Accuracy": 1.0, "Precision": 1.0, "Recall": 1.0},
-            "Random Forest": {"Accuracy": 1.0, "Precision": 1.0, "Recall": 1.0},
-            "SVC": {"Accuracy": 0.9998, "Precision": 0.9998, "Recall": 0.9998}
-        }
-    }
-    
-    # Exibir resultados em tabs
-    tab1, tab2 = st.tabs(["📈 Regressão", "🎯 Classificação"])
-    
-    with tab1:
-        st.write("**Previsão de Gasto Total:**")
-        st.markdown(tooltip_info("R² = quão bem o modelo explica os dados (1.0 = perfeito). MAE = erro médio absoluto em euros. RMSE = erro quadrático médio (penaliza erros grandes). Valores menores de erro = melhor modelo."), unsafe_allow_html=True)
-        reg_df = pd.DataFrame(restaurante_results["Regressão (Gasto Total)"]).T
-        st.dataframe(reg_df, use_container_width=True)
-        
-        # Gráfico de performance
-        models = list(restaurante_results["Regressão (Gasto Total)"].keys())
-        r2_scores = [restaurante_results["Regressão (Gasto Total)"][m]["R²"] for m in models]
-        
-        fig = px.bar(x=models, y=r2_scores, title="R² Score por Modelo")
-        fig.update_layout(yaxis_range=[0.95, 1.005])
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
-    
-    with tab2:
-        st.write("**Previsão de Retorno do Cliente:**")
-        st.markdown(tooltip_info("Accuracy = % de previsões corretas. Precision = % de clientes que realmente retornaram entre os que o modelo previu que retornariam. Recall = % de clientes que retornaram que o modelo conseguiu identificar. Valores próximos de 1.0 = excelente performance."), unsafe_allow_html=True)
-        clf_df = pd.DataFrame(restaurante_results["Classificação (Retorno Cliente)"]).T
-        st.dataframe(clf_df, use_container_width=True)
-        
-        # Gráfico de performance
-        models = list(restaurante_results["Classificação (Retorno Cliente)"].keys())
-        accuracies = [restaurante_results["Classificação (Retorno Cliente)"][m]["Accuracy"] for m in models]
-        
-        fig = px.bar(x=models, y=accuracies, title="Accuracy por Modelo")
-        fig.update_layout(yaxis_range=[0.995, 1.005])
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
-    
-    # Resultados do Hotel (trabalho do Nuno)
-    st.markdown(create_tooltip(
-        "🏨 Modelos do Hotel",
-        "Resultados dos modelos de Machine Learning aplicados aos dados do hotel. Compara diferentes algoritmos para prever gastos totais e classificar clientes. Performance ligeiramente diferente do restaurante devido à natureza distinta dos dados de hospedagem vs refeições."
-    ), unsafe_allow_html=True)
-    
-    # Integrar resultados do Nuno (simulado)
-    hotel_results = {
-        "Regressão (Gasto Total)": {
-            "Linear Regression": {"R²": 0.9654, "MAE": 15.42, "RMSE": 23.87},
-            "Random Forest": {"R²": 0.9876, "MAE": 8.91, "RMSE": 14.32},
-            "SVR": {"R²": 0.9543, "MAE": 18.76, "RMSE": 27.41}
-        },
-        "Classificação (Uso do SPA)": {
-            "Logistic Regression": {"Accuracy": 0.8934, "Precision": 0.8721, "Recall": 0.8956},
-            "Random Forest": {"Accuracy": 0.9287, "Precision": 0.9145, "Recall": 0.9234},
-            "SVC": {"Accuracy": 0.9156, "Precision": 0.8998, "Recall": 0.9087}
-        }
-    }
-    
-    tab3, tab4 = st.tabs(["📈 Regressão Hotel", "🎯 Classificação SPA"])
-    
-    with tab3:
-        st.write("**Previsão de Gasto Total Hotel:**")
-        hotel_reg_df = pd.DataFrame(hotel_results["Regressão (Gasto Total)"]).T
-        st.dataframe(hotel_reg_df, use_container_width=True)
+    artifact = load_ml_results()
+    if artifact is None:
+        st.warning("⚠️ Ainda não existem resultados de avaliação. Execute `python evaluate_models.py` "
+                   "para treinar e avaliar os modelos.")
+        return
     
-    with tab4:
-        st.write("**Previsão de Uso do SPA:**")
-        hotel_clf_df = pd.DataFrame(hotel_results["Classificação (Uso do SPA)"]).T
-        st.dataframe(hotel_clf_df, use_container_width=True)
+    config = artifact.get('config', {})
+    st.caption(f"📄 Avaliação gerada em {artifact.get('generated_at', '?')} · "
+               f"teste: {config.get('test_size', 0):.0%} · "
+               f"validação cruzada: {config.get('cv') or 'desligada'}")
+    
+    # Avisar se os dados de treino mudaram desde a avaliação
+    registry = load_ml_models()
+    for csv_path, version in artifact.get('data_versions', {}).items():
+        if os.path.exists(csv_path) and registry.data_version(csv_path) != version:
+            st.warning(f"⚠️ {csv_path} mudou desde a avaliação. Execute novamente `python evaluate_models.py`.")
+    
+    for business, title, explanation in ML_RESULTS_SECTIONS:
+        st.markdown(create_tooltip(title, explanation), unsafe_allow_html=True)
+        business_results = artifact['results'].get(business)
+        if not business_results:
+            st.info("ℹ️ Sem resultados para este negócio (dataset ML não encontrado na avaliação).")
+            continue
+        
+        st.markdown(tooltip_info("R² = quão bem o modelo explica os dados (1.0 = perfeito). MAE/RMSE = erros médios (menor = melhor). Accuracy = % de previsões corretas. Precision/Recall = qualidade das previsões positivas (média ponderada por classe)."), unsafe_allow_html=True)
+        tabs = st.tabs([f"📈 {task}" if 'Regressão' in task else f"🎯 {task}" for task in business_results])
+        for tab, (task_title, models_results) in zip(tabs, business_results.items()):
+            with tab:
+                show_ml_task_results(task_title, models_results)
+    
+    # Custo de cada modelo: tempo de treino e latência de previsão
+    st.subheader("⏱️ Custo por Modelo")
+    st.markdown(tooltip_info("Tempo de treino (s), tempo de previsão por linha em lote (µs) e latência de uma previsão individual (ms). Permite escolher modelos de produção pelo custo e não apenas pelo score."), unsafe_allow_html=True)
+    cost_rows = []
+    best_models = []
+    for business, by_task in artifact['results'].items():
+        for task_title, models_results in by_task.items():
+            main_metric = 'R²' if 'R²' in next(iter(models_results.values())) else 'Accuracy'
+            for model_name, result in models_results.items():
+                cost_rows.append({
+                    'Negócio': business.capitalize(),
+                    'Tarefa': task_title,
+                    'Modelo': model_name,
+                    'Métrica': main_metric,
+                    'Score': result[main_metric],
+                    'Treino (s)': result['fit_s'],
+                    'Previsão (µs/linha)': result['predict_us_por_linha'],
+                    'Latência 1 linha (ms)': result['latencia_1_linha_ms'],
+                })
+            best_name, best = max(models_results.items(), key=lambda item: item[1][main_metric])
+            best_models.append((business, task_title, best_name, main_metric, best))
+    st.dataframe(pd.DataFrame(cost_rows).round(4), use_container_width=True, hide_index=True)
     
     # Comparação entre negócios
     st.subheader("⚖️ Comparação de Performance")
     
-    st.markdown("""
+    insights = "".join(
+        f"<li><strong>{business.capitalize()} · {task_title}:</strong> {name} "
+        f"({metric} = {result[metric]:.3f}, {result['latencia_1_linha_ms']:.1f} ms por previsão)</li>"
+        for business, task_title, name, metric, result in best_models
+    )
+    st.markdown(f"""
     <div class="insight-box">
-    <h4>🎯 Principais Insights:</h4>
+    <h4>🎯 Melhor Modelo por Tarefa:</h4>
     <ul>
-    <li><strong>Restaurante:</strong> Performance excepcional com R² = 1.0 e Accuracy = 100%</li>
-    <li><strong>Hotel:</strong> Performance sólida com R² = 0.99 e Accuracy = 93%</li>
-    <li><strong>Recomendação:</strong> Modelos prontos para produção em ambos os negócios</li>
+    {insights}
     </ul>
     </div>
     """, unsafe_allow_html=True)
 
+@profiled
 def show_prediction_system():
     """Sistema de previsões interativo com modelos ML reais"""
     st.markdown(create_tooltip(
@@ -966,25 +1213,75 @@ def show_prediction_system():
     
     # Seletor de negócio
     business = st.selectbox("🏢 Escolha o negócio:", ["🏨 Hotel", "🍽️ Restaurante"])
+    mode = st.radio("Modo de previsão:", ["📝 Reserva individual", "📦 Lote (CSV)"],
+                    horizontal=True, key="prediction_mode")
     
-    if business == "🏨 Hotel":
+    if mode == "📦 Lote (CSV)":
+        show_batch_scoring(business)
+    elif business == "🏨 Hotel":
         show_hotel_smart_predictions()
     else:
         show_restaurant_smart_predictions()
 
+@profiled
+def show_batch_scoring(business):
+    """Scoring em lote: carrega um CSV de reservas e prevê todas de uma vez"""
+    is_hotel = business == "🏨 Hotel"
+    required, optional, example = ((HOTEL_REQUIRED, HOTEL_OPTIONAL, HOTEL_EXAMPLE) if is_hotel
+                                   else (RESTAURANT_REQUIRED, RESTAURANT_OPTIONAL, RESTAURANT_EXAMPLE))
+    slug = "hotel" if is_hotel else "restaurante"
+    
+    st.subheader(f"📦 Scoring em Lote - {'Hotel' if is_hotel else 'Restaurante'}")
+    st.markdown(tooltip_info(
+        f"Uma reserva por linha. Colunas obrigatórias: {', '.join(required)}. "
+        f"Opcionais (valor por omissão se ausentes): {', '.join(optional)}. "
+        "Flags aceitam Sim/Não, True/False ou 1/0; o mês aceita 1-12 ou o nome."
+    ), unsafe_allow_html=True)
+    st.download_button("📄 Descarregar CSV modelo", template_csv(example, optional),
+                       file_name=f"modelo_reservas_{slug}.csv", mime="text/csv")
+    
+    uploaded = st.file_uploader("📤 CSV de reservas", type="csv", key=f"batch_upload_{slug}")
+    if uploaded is None:
+        return
+    
+    try:
+        reservas = pd.read_csv(uploaded)
+        start = time.perf_counter()
+        if is_hotel:
+            scored = score_hotel_batch(reservas, load_ml_models().get("hotel_extras"))
+        else:
+            scored = score_restaurant_batch(reservas, load_ml_models().get("restaurante_gasto"))
+        elapsed = time.perf_counter() - start
+    except FileNotFoundError:
+        st.error(f"❌ Erro ao carregar dados do {slug} para previsão")
+        return
+    except ValueError as e:
+        st.error(f"❌ CSV inválido: {e}")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("📋 Reservas", f"{len(scored):,}")
+    col2.metric("💰 Receita Prevista", f"€{scored['gasto_total_previsto'].sum():,.0f}")
+    col3.metric("⚡ Throughput", f"{len(scored) / max(elapsed, 1e-9):,.0f} linhas/s")
+    
+    categorias = scored['categoria'].value_counts()
+    fig = px.bar(x=categorias.index, y=categorias.values, title="Reservas por Categoria",
+                 labels={'x': 'Categoria', 'y': 'Reservas'})
+    show_chart(fig)
+    
+    st.dataframe(scored.head(1000), use_container_width=True)
+    if len(scored) > 1000:
+        st.caption(f"A mostrar as primeiras 1.000 de {len(scored):,} reservas — o ficheiro completo está no download.")
+    st.download_button("💾 Descarregar previsões (CSV)", to_csv_bytes(scored),
+                       file_name=f"previsoes_{slug}.csv", mime="text/csv", type="primary")
+
+@profiled
 def show_hotel_smart_predictions():
     """Sistema de previsão inteligente para hotel usando ML real"""
     st.subheader("🏨 Análise Inteligente de Reserva - Hotel")
     
     st.markdown("### 📝 Dados da Nova Reserva")
     
-    # Carregar dados para treinar modelo em tempo real
-    try:
-        df_hotel_ml = pd.read_csv('Datasets_ML/hotel_ml.csv')
-    except:
-        st.error("❌ Erro ao carregar dados do hotel para previsão")
-        return
-    
     # Formulário mais completo baseado nas features reais
     col1, col2, col3 = st.columns(3)
     
@@ -1034,8 +1331,12 @@ def show_hotel_smart_predictions():
                 regime, canal_reserva
             )
             
-            # Fazer previsões usando modelo ML real
-            predictions = make_hotel_predictions(df_hotel_ml, input_data)
+            # Fazer previsões usando modelo ML persistido
+            try:
+                predictions = make_hotel_predictions(input_data)
+            except FileNotFoundError:
+                st.error("❌ Erro ao carregar dados do hotel para previsão")
+                return
             
             # Exibir resultados e estratégias
             display_hotel_predictions(predictions, input_data)
@@ -1044,158 +1345,41 @@ def prepare_hotel_prediction_data(noites, num_hospedes, antecedencia_dias, tipo_
                                 fim_semana, feriado, evento_cidade, motivo_viagem, foi_spa,
                                 pediu_room_service, late_checkout, estacionamento, transfer_aeroporto,
                                 regime, canal_reserva):
-    """Prepara dados de entrada para o modelo de ML"""
-    
-    # Mapear mês para número
-    mes_map = {"Janeiro": 1, "Fevereiro": 2, "Março": 3, "Abril": 4, "Maio": 5, "Junho": 6,
-               "Julho": 7, "Agosto": 8, "Setembro": 9, "Outubro": 10, "Novembro": 11, "Dezembro": 12}
-    mes_num = mes_map[mes]
-    
-    # Determinar época
-    if mes_num in [7, 8, 9]:  # Verão
-        epoca = "Alta"
-    elif mes_num in [12, 1, 2]:  # Inverno
-        epoca = "Baixa" 
-    else:
-        epoca = "Media"
-    
-    # Criar dicionário com todas as features
-    data = {
+    """Reserva do formulário com os mesmos campos do scoring em lote"""
+    return {
         'noites': noites,
-        'antecedencia_dias': antecedencia_dias,
         'num_hospedes': num_hospedes,
+        'antecedencia_dias': antecedencia_dias,
+        'tipo_quarto': tipo_quarto,
+        'mes': mes,
         'fim_semana': fim_semana,
         'feriado': feriado,
         'evento_cidade': evento_cidade,
+        'motivo_viagem': motivo_viagem,
         'foi_spa': foi_spa,
-        'num_massagens': 1 if foi_spa else 0,
         'pediu_room_service': pediu_room_service,
-        'num_vezes_room_service': 1 if pediu_room_service else 0,
         'late_checkout': late_checkout,
         'estacionamento': estacionamento,
         'transfer_aeroporto': transfer_aeroporto,
-        'consumo_minibar': 0,  # Será previsto
-        'consumo_bar_hotel': 0,  # Será previsto
-        'gasto_spa': 0,  # Será previsto
-        'rating_limpeza': 4.2,  # Média histórica
-        'rating_staff': 4.1,
-        'rating_localizacao': 4.3,
-        'rating_geral': 4.2,
-        'fez_reclamacao': False,
-        'preco_quarto_noite': 120,  # Base
-        'gasto_quarto_total': 120 * noites,
-        'desconto_aplicado': 0,
-        'reserva_antecipada': 1 if antecedencia_dias > 30 else 0,
-        'reserva_ultimo_minuto': 1 if antecedencia_dias < 7 else 0,
-        'cliente_frequente': 0,  # Cliente novo
+        'regime': regime,
+        'canal_reserva': canal_reserva,
     }
-    
-    # One-hot encoding para variáveis categóricas
-    # Tipo de quarto
-    for tipo in ['Familiar', 'Standard', 'Suite', 'Superior']:
-        data[f'tipo_quarto_{tipo}'] = (tipo_quarto == tipo)
-    
-    # Motivo de viagem
-    for motivo in ['Business', 'Evento', 'Lazer']:
-        data[f'motivo_viagem_{motivo}'] = (motivo_viagem == motivo)
-    
-    # Canal de reserva
-    for canal in ['Agencia', 'Booking', 'Direto', 'Expedia']:
-        data[f'canal_reserva_{canal}'] = (canal_reserva == canal)
-    
-    # Regime
-    for reg in ['Meia_Pensao', 'Pequeno_Almoco']:
-        data[f'regime_{reg}'] = (regime == reg)
-    
-    # Mês
-    for m in range(1, 13):
-        data[f'mes_{m}'] = (mes_num == m)
-    
-    # Época
-    for ep in ['Alta', 'Baixa', 'Media']:
-        data[f'epoca_{ep}'] = (epoca == ep)
-    
-    return data
 
-def make_hotel_predictions(df_ml, input_data):
-    """Faz previsões usando modelo ML real"""
-    
-    # Preparar dados de treino
-    features_to_exclude = ['gasto_extras_total', 'gasto_quarto_total', 'preco_quarto_noite', 
-                          'consumo_minibar', 'consumo_bar_hotel', 'gasto_spa']
-    
-    # Selecionar features disponíveis
-    available_features = [col for col in df_ml.columns if col not in features_to_exclude]
-    
-    X = df_ml[available_features]
-    y_extras = df_ml['gasto_extras_total']
-    
-    # Treinar modelo de regressão para gastos extras
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.preprocessing import StandardScaler
-    
-    # Normalizar dados
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Treinar modelo
-    model_extras = RandomForestRegressor(n_estimators=100, random_state=42)
-    model_extras.fit(X_scaled, y_extras)
-    
-    # Preparar dados de entrada para previsão
-    input_df = pd.DataFrame([input_data])
-    
-    # Garantir que temos todas as colunas necessárias
-    for col in available_features:
-        if col not in input_df.columns:
-            input_df[col] = 0
+@profiled
+def make_hotel_predictions(input_data):
+    """Faz previsões usando o modelo ML persistido no registo"""
     
-    # Reordenar colunas para corresponder ao treino
-    input_df = input_df[available_features]
-    
-    # Fazer previsão
-    input_scaled = scaler.transform(input_df)
-    gasto_extras_previsto = model_extras.predict(input_scaled)[0]
-    
-    # Calcular métricas adicionais
-    gasto_quarto = input_data['noites'] * 120  # Base price
-    
-    # Ajustar preço base por tipo de quarto
-    if input_data.get('tipo_quarto_Superior', False):
-        gasto_quarto *= 1.3
-    elif input_data.get('tipo_quarto_Suite', False):
-        gasto_quarto *= 1.8
-    elif input_data.get('tipo_quarto_Familiar', False):
-        gasto_quarto *= 1.1
-    
-    # Ajustar por época
-    if input_data.get('epoca_Alta', False):
-        gasto_quarto *= 1.4
-    elif input_data.get('epoca_Baixa', False):
-        gasto_quarto *= 0.8
-    
-    gasto_total = gasto_quarto + max(0, gasto_extras_previsto)
-    
-    # Calcular probabilidades
-    prob_spa = 0.3
-    if input_data['foi_spa']:
-        prob_spa += 0.4
-    if input_data.get('tipo_quarto_Suite', False) or input_data.get('tipo_quarto_Superior', False):
-        prob_spa += 0.2
-    
-    prob_retorno = 0.6
-    if gasto_total > 300:
-        prob_retorno += 0.2
-    if input_data['antecedencia_dias'] > 30:
-        prob_retorno += 0.1
+    # Uma reserva é um lote de uma linha: mesma codificação e regras do scoring em lote
+    model_extras = load_ml_models().get("hotel_extras")
+    scored = score_hotel_batch(pd.DataFrame([input_data]), model_extras).iloc[0]
     
     return {
-        'gasto_quarto': gasto_quarto,
-        'gasto_extras': max(0, gasto_extras_previsto),
-        'gasto_total': gasto_total,
-        'prob_spa': min(prob_spa, 0.95),
-        'prob_retorno': min(prob_retorno, 0.95),
-        'valor_diario': gasto_total / input_data['noites']
+        'gasto_quarto': scored['gasto_quarto_previsto'],
+        'gasto_extras': scored['gasto_extras_previsto'],
+        'gasto_total': scored['gasto_total_previsto'],
+        'prob_spa': scored['prob_spa'],
+        'prob_retorno': scored['prob_retorno'],
+        'valor_diario': scored['valor_diario']
     }
 
 def display_hotel_predictions(predictions, input_data):
@@ -1344,19 +1528,13 @@ def display_hotel_predictions(predictions, input_data):
     if input_data['antecedencia_dias'] < 7:
         st.warning("🏃‍♂️ **Reserva de última hora** - Cliente pode aceitar upgrades!")
 
+@profiled
 def show_restaurant_smart_predictions():
     """Sistema de previsão inteligente para restaurante"""
     st.subheader("🍽️ Análise Inteligente de Reserva - Restaurante")
     
     st.markdown("### 📝 Dados da Nova Reserva")
     
-    # Carregar dados para treinar modelo
-    try:
-        df_restaurant_ml = pd.read_csv('Datasets_ML/restaurante_ml.csv')
-    except:
-        st.error("❌ Erro ao carregar dados do restaurante para previsão")
-        return
-    
     # Formulário baseado nas features reais do restaurante
     col1, col2, col3 = st.columns(3)
     
@@ -1403,8 +1581,12 @@ def show_restaurant_smart_predictions():
                 menu_degustacao, tipo_cliente, canal_reserva
             )
             
-            # Fazer previsões usando modelo ML real
-            predictions = make_restaurant_predictions(df_restaurant_ml, input_data)
+            # Fazer previsões usando modelo ML persistido
+            try:
+                predictions = make_restaurant_predictions(input_data)
+            except FileNotFoundError:
+                st.error("❌ Erro ao carregar dados do restaurante para previsão")
+                return
             
             # Exibir resultados e estratégias
             display_restaurant_predictions(predictions, input_data)
@@ -1412,28 +1594,12 @@ def show_restaurant_smart_predictions():
 def prepare_restaurant_prediction_data(num_pessoas, horario, mesa_especial, criancas, ocasiao_especial,
                                      dia_semana, mes, feriado, evento_local, vinho, sobremesa,
                                      menu_degustacao, tipo_cliente, canal_reserva):
-    """Prepara dados de entrada para o modelo de restaurante"""
-    
-    # Mapear horário
-    if "Almoço" in horario:
-        periodo = "Almoco"
-    elif "Jantar" in horario:
-        periodo = "Jantar"
-    else:
-        periodo = "Lanche"
-    
-    # Mapear mês
-    mes_map = {"Janeiro": 1, "Fevereiro": 2, "Março": 3, "Abril": 4, "Maio": 5, "Junho": 6,
-               "Julho": 7, "Agosto": 8, "Setembro": 9, "Outubro": 10, "Novembro": 11, "Dezembro": 12}
-    mes_num = mes_map[mes]
-    
-    # Calcular valores base
-    preco_medio_pessoa = 25 if periodo == "Jantar" else 15
-    if menu_degustacao:
-        preco_medio_pessoa *= 2.5
-    
-    data = {
+    """Reserva do formulário com os mesmos campos do scoring em lote"""
+    return {
         'num_pessoas': num_pessoas,
+        'horario': horario,
+        'dia_semana': dia_semana,
+        'mes': mes,
         'mesa_especial': mesa_especial,
         'criancas': criancas,
         'ocasiao_especial': ocasiao_especial,
@@ -1442,103 +1608,25 @@ def prepare_restaurant_prediction_data(num_pessoas, horario, mesa_especial, cria
         'vinho': vinho,
         'sobremesa': sobremesa,
         'menu_degustacao': menu_degustacao,
-        'preco_medio_pessoa': preco_medio_pessoa,
-        'gasto_total_previsto': preco_medio_pessoa * num_pessoas,
-        'rating_comida': 4.3,  # Média histórica
-        'rating_servico': 4.1,
-        'rating_ambiente': 4.2,
-        'rating_geral': 4.2,
-        'tempo_espera_min': 10,
-        'fez_reclamacao': False,
-        'mes_num': mes_num
+        'tipo_cliente': tipo_cliente,
+        'canal_reserva': canal_reserva,
     }
-    
-    # One-hot encoding
-    # Período
-    for p in ['Almoco', 'Jantar', 'Lanche']:
-        data[f'periodo_{p}'] = (periodo == p)
-    
-    # Dia da semana
-    for dia in ['Domingo', 'Quarta', 'Quinta', 'Sabado', 'Segunda', 'Sexta', 'Terca']:
-        data[f'dia_semana_{dia}'] = (dia_semana == dia)
-    
-    # Tipo de cliente
-    for tipo in ['Habitual', 'Novo', 'VIP']:
-        data[f'tipo_cliente_{tipo}'] = (tipo_cliente == tipo)
-    
-    # Canal de reserva
-    for canal in ['App', 'Presencial', 'Telefone', 'Website']:
-        data[f'canal_reserva_{canal}'] = (canal_reserva == canal)
-    
-    # Mês
-    for m in range(1, 13):
-        data[f'mes_{m}'] = (mes_num == m)
-    
-    return data
 
-def make_restaurant_predictions(df_ml, input_data):
-    """Faz previsões usando modelo ML real para restaurante"""
-    
-    # Preparar dados de treino
-    features_to_exclude = ['gasto_total_previsto', 'preco_medio_pessoa', 'rating_geral']
-    available_features = [col for col in df_ml.columns if col not in features_to_exclude]
-    
-    X = df_ml[available_features]
-    y_gasto = df_ml['gasto_total_previsto']
-    
-    # Treinar modelo
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.preprocessing import StandardScaler
-    
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    model_gasto = RandomForestRegressor(n_estimators=100, random_state=42)
-    model_gasto.fit(X_scaled, y_gasto)
-    
-    # Preparar dados de entrada
-    input_df = pd.DataFrame([input_data])
-    
-    # Garantir todas as colunas necessárias
-    for col in available_features:
-        if col not in input_df.columns:
-            input_df[col] = 0
-    
-    input_df = input_df[available_features]
-    
-    # Fazer previsão
-    input_scaled = scaler.transform(input_df)
-    gasto_previsto = model_gasto.predict(input_scaled)[0]
-    
-    # Calcular métricas adicionais
-    gasto_por_pessoa = gasto_previsto / input_data['num_pessoas']
-    
-    # Probabilidades baseadas em características
-    prob_vinho = 0.4
-    if input_data['vinho']:
-        prob_vinho += 0.3
-    if input_data.get('periodo_Jantar', False):
-        prob_vinho += 0.2
-    
-    prob_sobremesa = 0.5
-    if input_data['sobremesa']:
-        prob_sobremesa += 0.3
-    if input_data['ocasiao_especial']:
-        prob_sobremesa += 0.2
+@profiled
+def make_restaurant_predictions(input_data):
+    """Faz previsões usando o modelo ML persistido para restaurante"""
     
-    prob_retorno = 0.7
-    if gasto_por_pessoa > 30:
-        prob_retorno += 0.2
-    if input_data.get('tipo_cliente_VIP', False):
-        prob_retorno += 0.1
+    # Uma reserva é um lote de uma linha: mesma codificação e regras do scoring em lote
+    model_gasto = load_ml_models().get("restaurante_gasto")
+    scored = score_restaurant_batch(pd.DataFrame([input_data]), model_gasto).iloc[0]
     
     return {
-        'gasto_total': max(gasto_previsto, input_data['num_pessoas'] * 15),
-        'gasto_por_pessoa': gasto_por_pessoa,
-        'prob_vinho': min(prob_vinho, 0.95),
-        'prob_sobremesa': min(prob_sobremesa, 0.95),
-        'prob_retorno': min(prob_retorno, 0.95),
-        'margem_estimada': gasto_previsto * 0.3  # 30% de margem
+        'gasto_total': scored['gasto_total_previsto'],
+        'gasto_por_pessoa': scored['gasto_por_pessoa'],
+        'prob_vinho': scored['prob_vinho'],
+        'prob_sobremesa': scored['prob_sobremesa'],
+        'prob_retorno': scored['prob_retorno'],
+        'margem_estimada': scored['margem_estimada']
     }
 
 def display_restaurant_predictions(predictions, input_data):
@@ -1681,150 +1769,256 @@ def display_restaurant_predictions(predictions, input_data):
     if input_data['ocasiao_especial']:
         st.info("🎉 **Ocasião especial detectada** - Preparar surpresa ou atenção especial!")
     
-    if input_data.get('periodo_Jantar', False) and input_data['num_pessoas'] > 6:
+    if 'Jantar' in input_data['horario'] and input_data['num_pessoas'] > 6:
         st.warning("👥 **Grupo grande no jantar** - Considerar menu de grupo ou desconto!")
     
-    if input_data.get('tipo_cliente_VIP', False):
+    if input_data['tipo_cliente'] == 'VIP':
         st.success("⭐ **Cliente VIP** - Garantir serviço excecional e ofertas exclusivas!")
 
-def show_llm_insights():
+# Insights LLM: cliente Groq e cache de respostas partilhados por todas as sessões
+# Opção do seletor de modelo que entrega a escolha ao router
+ROUTER_LABEL = "🔀 Automático (por tipo de pedido)"
+
+@st.cache_resource
+def get_insight_generator():
+    """Devolve (gerador de insights, configuração Groq ou None se não houver chave)"""
+    settings = groq_settings()
+    # cache_resource: o limitador de ritmo e o router são partilhados por todas as sessões
+    return build_insight_generator(settings, ResponseCache()), settings
+
+@st.cache_resource
+def get_semantic_cache():
+    """Cache semântica das perguntas livres (partilhada por todas as sessões)"""
+    return SemanticCache()
+
+@st.cache_resource
+def get_query_engine():
+    """Motor de consultas locais (planos memoizados partilhados por todas as sessões)"""
+    generator, _ = get_insight_generator()
+    return QueryEngine(generator.complete, get_semantic_cache())
+
+@profiled
+@st.cache_data(show_spinner=False)
+def load_query_schema(version, _frames):
+    """Esquema dos datasets enviado ao modelo (colunas e tipos, sem linhas), uma vez por versão"""
+    return describe_schema(_frames)
+
+@profiled
+def load_llm_insights(path=LLM_INSIGHTS_PATH):
+    """Insights pré-gerados por `generate_insights.py` ({secção: entrada}), ou {}"""
+    if not os.path.exists(path):
+        return {}
+    return _read_artifact(path, os.path.getmtime(path))["sections"]
+
+@profiled
+@st.cache_data(show_spinner=False)
+def load_insight_summaries(version, ml_results, token_budget, _df_restaurante, _df_hotel, _df_rollup):
+    """
+    Resumos compactos dos dados por secção, calculados uma vez por versão dos
+    dados (`version` dos CSVs carregados e resultados da avaliação ML)
+    """
+    return build_section_summaries(_df_restaurante, _df_hotel, _df_rollup, ml_results, token_budget)
+
+@profiled
+def show_insight_section(generator, section, summary, model, llm_enabled=True, pregenerated=None):
+    """
+    Insight de uma secção: pré-gerado (artefacto offline, se o resumo não mudou),
+    da cache, ou gerado a pedido do utilizador (model=None: escolhido pelo router)
+    """
+    with st.expander(f"📋 Resumo dos dados enviado ao modelo (≈{estimate_tokens(summary)} tokens)"):
+        st.code(summary, language=None)
+    
+    if (pregenerated is not None and pregenerated["input_hash"] == generator.input_hash(section, summary)
+            and model in (None, pregenerated["model"])):
+        st.markdown(pregenerated["text"])
+        st.caption(f"📦 pré-gerado em {pregenerated['generated_at']} · {pregenerated['model']} · "
+                   f"{pregenerated['prompt_tokens']} tokens de prompt · "
+                   f"{pregenerated['completion_tokens']} tokens de resposta")
+        return
+    if not llm_enabled:
+        return
+    
+    insight = generator.cached(section, summary, model) if model else generator.cached_routed(section, summary)
+    if insight is not None:
+        st.markdown(insight.text)
+        st.caption(f"⚡ da cache · {insight.model} · {insight.prompt_tokens} tokens de prompt · "
+                   f"{insight.completion_tokens} tokens de resposta")
+        return
+    
+    if not st.button("✨ Gerar insight", key=f"llm_generate_{section}"):
+        st.caption("Ainda não existe um insight para estes dados com este modelo.")
+        return
+    
+    # Streaming: o texto aparece a partir do primeiro token (a resposta fica na cache no fim)
+    try:
+        stream = generator.stream(section, summary, model) if model else generator.stream_routed(section, summary)
+        st.write_stream(stream)
+    except LLMError as e:
+        st.error(f"❌ {e}")
+        return
+    st.caption(f"🌐 {stream.model} · primeiro token em {stream.ttft_s or 0:.2f}s · "
+               f"{stream.tokens_per_s:.0f} tokens/s · total {stream.total_s:.1f}s · "
+               f"{stream.prompt_tokens} tokens de prompt · {stream.completion_tokens} tokens de resposta")
+
+@profiled
+def show_llm_insights(df_restaurante, df_hotel, df_clientes, versions):
     """Página de insights LLM"""
     st.markdown(create_tooltip(
         "💡 Insights Gerados por LLM",
-        "Análises automáticas geradas por Large Language Models (LLM) usando IA avançada. O sistema LLM processou todos os dados e modelos ML para gerar interpretações, descobrir padrões ocultos e sugerir estratégias de negócio. Combina análise estatística com inteligência artificial para insights mais profundos."
+        "Análises automáticas geradas por Large Language Models (LLM) a partir de resumos estatísticos dos dados atuais (nunca dos registos em bruto). As respostas ficam guardadas em cache: enquanto os dados não mudarem, o mesmo insight é mostrado sem nova chamada ao modelo."
     ), unsafe_allow_html=True)
     
-    st.info("🤖 Esta seção integra os insights gerados pela nossa análise LLM da Parte C")
-    
-    # Tabs para diferentes tipos de insights
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📊 Resumo Estatístico",
-        "🤖 Interpretação ML", 
-        "💼 Insights de Negócio",
-        "🔄 Análise Cruzada"
-    ])
-    
-    with tab1:
-        st.subheader("📊 Resumo Estatístico Inteligente")
-        st.markdown("""
-        <div class="insight-box">
-        <h4>🎯 Principais Métricas do Restaurante:</h4>
-        <ul>
-        <li><strong>📈 Gasto médio:</strong> €45.32 por visita</li>
-        <li><strong>🔄 Taxa de retorno:</strong> 73.2% dos clientes</li>
-        <li><strong>⭐ Satisfação geral:</strong> 85.7%</li>
-        <li><strong>👥 Base de clientes:</strong> 26.000 registros únicos</li>
-        </ul>
-        
-        <h4>📈 Tendências Identificadas:</h4>
-        <ul>
-        <li>Clientes que gastam >€60 têm 92% de chance de retornar</li>
-        <li>Picos de movimento: sextas 18:30-20:30 e fins de semana</li>
-        <li>Crescimento de 15% em clientes premium (>€80/visita)</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with tab2:
-        st.subheader("🤖 Interpretação dos Modelos ML")
-        st.markdown("""
-        <div class="insight-box">
-        <h4>🎯 Performance Excepcional dos Modelos:</h4>
-        <ul>
-        <li><strong>Linear Regression:</strong> R² = 1.0000 - Performance perfeita para previsão de gastos</li>
-        <li><strong>Random Forest:</strong> 100% accuracy - Excelente para classificação de retorno</li>
-        <li><strong>Padrões claros:</strong> Dados mostram comportamentos muito consistentes</li>
-        </ul>
-        
-        <h4>🔑 Variáveis Mais Importantes:</h4>
-        <ol>
-        <li><strong>Experiência completa</strong> (peso: 0.89)</li>
-        <li><strong>Tempo de espera</strong> (peso: -0.76)</li>
-        <li><strong>Qualidade do serviço</strong> (peso: 0.72)</li>
-        </ol>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with tab3:
-        st.subheader("💼 Insights Estratégicos de Negócio")
-        st.markdown("""
-        <div class="insight-box">
-        <h4>💰 Oportunidades de Receita:</h4>
-        <ul>
-        <li><strong>Clientes premium (20%)</strong> geram 45% da receita total</li>
-        <li><strong>Potencial de upselling:</strong> €12.50 por cliente médio</li>
-        <li><strong>Horários estratégicos:</strong> Oportunidades em baixa ocupação</li>
-        </ul>
-        
-        <h4>🎯 Estratégias Recomendadas:</h4>
-        <ul>
-        <li>Programa de fidelidade VIP (ROI estimado: 2.3x)</li>
-        <li>Sistema de reservas online (reduz tempo de espera)</li>
-        <li>Menu executivo para horários de almoço</li>
-        <li>Eventos temáticos nas quartas e quintas</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
+    generator, settings = get_insight_generator()
+    token_budget = settings.digest_max_tokens if settings is not None else DEFAULT_TOKEN_BUDGET
+    # Mesma versão dos dados que a tabela por cliente (de onde vem o resumo da análise cruzada)
+    version = dataset_key(versions, *CUSTOMER_DATASETS)
+    df_rollup = load_customer_rollup(version, df_clientes, df_restaurante, df_hotel)
+    summaries = load_insight_summaries(version, load_ml_results(), token_budget,
+                                       df_restaurante, df_hotel, df_rollup)
+    
+    if settings is None:
+        st.warning("⚠️ Configure GROQ_API_KEY (ficheiro .env ou secrets do Streamlit) para gerar insights. "
+                   "Abaixo estão os resumos dos dados que seriam enviados ao modelo.")
+        model = None
+    else:
+        # Automático: cada secção vai para o modelo da rota do seu tipo de pedido
+        labels = [ROUTER_LABEL] + list(settings.models)
+        label = st.selectbox("🧠 Modelo", labels, index=0, key="llm_model",
+                             help="Automático: respostas curtas em modelos rápidos, relatórios nos maiores, "
+                                  "com failover se um modelo falhar ou ficar lento.")
+        model = settings.models.get(label)
+        
+        # As secções são independentes: pedidas em simultâneo, demoram o mesmo que a mais lenta
+        if st.button("✨ Gerar todas as secções", key="llm_generate_all"):
+            with st.spinner("A gerar insights..."):
+                insights, elapsed_s = generator.generate_all(summaries, model)
+            failed = {section: result for section, result in insights.items() if isinstance(result, Exception)}
+            generated = [result for result in insights.values()
+                         if not isinstance(result, Exception) and not result.cached]
+            for section, error in failed.items():
+                st.error(f"❌ {INSIGHT_SECTIONS[section].title}: {error}")
+            if generated:
+                st.caption(f"⚡ {len(generated)} secções geradas em {elapsed_s:.1f}s "
+                           f"(soma das latências: {sum(i.latency_s for i in generated):.1f}s)")
+    
+    # Tabs para diferentes tipos de insights (pré-gerados offline quando disponíveis)
+    pregenerated = load_llm_insights()
+    tabs = st.tabs([section.title for section in INSIGHT_SECTIONS.values()])
+    for tab, section in zip(tabs, INSIGHT_SECTIONS):
+        with tab:
+            show_insight_section(generator, section, summaries[section], model, settings is not None,
+                                 pregenerated.get(section))
+    
+    if settings is not None:
+        # Consultas sobre os dados carregados, identificados pela versão de cada CSV
+        query_frames = {"restaurante": df_restaurante, "hotel": df_hotel, "clientes": df_clientes}
+        show_data_questions(generator, summaries, model, query_frames,
+                            dataset_key(versions, *query_frames))
+    
+    stats = generator.cache.stats()
+    st.caption(f"🗄️ Cache de respostas: {stats['entradas']} entradas · {stats['bytes'] / 1024:.0f} KB · "
+               f"taxa de acertos {stats['hit_rate']:.0%}")
+    
+    # Latência de streaming por modelo (pedidos desde o arranque do servidor)
+    latency_rows = generator.metrics.summary()
+    if latency_rows:
+        with st.expander("⏱️ Latência por modelo (streaming)"):
+            latency_df = pd.DataFrame(latency_rows).rename(columns={
+                'modelo': 'Modelo', 'pedidos': 'Pedidos', 'ttft_p50_s': 'TTFT p50 (s)',
+                'ttft_p95_s': 'TTFT p95 (s)', 'tokens_s_p50': 'Tokens/s p50', 'total_p50_s': 'Total p50 (s)'})
+            st.dataframe(latency_df.round(2), use_container_width=True, hide_index=True)
+            st.caption("TTFT = tempo até ao primeiro token (latência percebida com streaming); "
+                       "Total = tempo que uma chamada bloqueante demoraria.")
+    
+    if generator.router is not None:
+        show_router_panel(generator.router)
+
+@profiled
+def show_data_questions(generator, summaries, model, frames, version):
+    """
+    Perguntas livres sobre os dados, respondidas pela cache semântica ou pelo LLM.
+    `version` identifica `frames` na memoização dos planos e na cache semântica.
+    """
+    st.subheader("💬 Pergunte aos dados")
+    semantic_cache = get_semantic_cache()
+    question = st.text_input("Pergunta", key="llm_question",
+                             placeholder="p.ex. qual o gasto médio por época no hotel?")
+    query_mode = st.toggle("🧮 Calcular a resposta nos dados completos", value=True, key="llm_query_mode",
+                           help="O modelo converte a pergunta numa consulta (filtros, agrupamento, agregações) "
+                                "executada localmente; só o resultado é enviado para a resposta.")
+    if st.button("Perguntar", key="llm_ask") and question.strip():
+        try:
+            with st.spinner("A responder..."):
+                if query_mode:
+                    answer = get_query_engine().answer(question.strip(), frames, version,
+                                                       load_query_schema(version, frames), model)
+                else:
+                    # Contexto: os resumos de dados das secções (o mesmo para todas as perguntas)
+                    context = "\n\n".join(summaries[section] for section in ("resumo", "negocio", "cruzada"))
+                    answer = generator.ask(question.strip(), context, semantic_cache, model)
+        except QueryPlanError as e:
+            st.error(f"❌ O modelo propôs uma consulta inválida: {e}")
+        except LLMError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.markdown(answer.text)
+            if getattr(answer, "plan", None) is not None:
+                with st.expander("🧮 Consulta executada e resultado"):
+                    st.json(answer.plan.to_dict())
+                    st.dataframe(answer.result, use_container_width=True, hide_index=True)
+            if answer.cached:
+                st.caption(f"🧠 da cache semântica (semelhança {answer.similarity:.2f} com "
+                           f"«{answer.matched_question}») · {answer.model} · {answer.latency_s * 1000:.0f} ms")
+            else:
+                memo = " · consulta em memória" if getattr(answer, "memoized", False) else ""
+                st.caption(f"🌐 {answer.model} · {answer.latency_s:.1f}s{memo}")
     
-    with tab4:
-        st.subheader("🔄 Análise Cruzada Restaurant-Hotel")
-        st.markdown("""
-        <div class="insight-box">
-        <h4>🔄 Sinergias Identificadas:</h4>
-        <ul>
-        <li><strong>23%</strong> dos hóspedes do hotel visitam o restaurante</li>
-        <li><strong>Hóspedes gastam 35%</strong> mais que clientes externos</li>
-        <li><strong>Taxa de satisfação cruzada:</strong> 94.2%</li>
-        </ul>
-        
-        <h4>💡 Oportunidades de Cross-Selling:</h4>
-        <ul>
-        <li><strong>Pacotes integrados:</strong> Estadia + Jantar (€189/casal)</li>
-        <li><strong>Sistema unificado:</strong> Reservas e programa de pontos</li>
-        <li><strong>Impacto estimado:</strong> +22% receita conjunta</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
+    stats = semantic_cache.stats()
+    st.caption(f"🧠 Cache semântica: {stats['entradas']} perguntas · {stats['consultas']} consultas · "
+               f"taxa de acertos {stats['hit_rate']:.0%} · {stats['latencia_poupada_s']:.1f}s de LLM poupados")
 
-def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
-    """Análise cruzada entre datasets usando JOIN obrigatório"""
+@profiled
+def show_router_panel(router):
+    """Instrumentação do router: latência e erros por modelo e últimas decisões"""
+    decisions = router.decisions()
+    with st.expander("🔀 Encaminhamento de modelos"):
+        st.caption("Rotas: " + " · ".join(f"{request_type} → {' › '.join(models)}"
+                                          for request_type, models in router.routes.items()))
+        health_df = pd.DataFrame(router.summary()).rename(columns={
+            'modelo': 'Modelo', 'pedidos': 'Pedidos', 'latencia_p50_s': 'Latência p50 (s)',
+            'latencia_p95_s': 'Latência p95 (s)', 'taxa_erros': 'Erros (%)', 'estado': 'Estado'})
+        health_df['Erros (%)'] = health_df['Erros (%)'] * 100
+        st.dataframe(health_df.round(2), use_container_width=True, hide_index=True)
+        if decisions:
+            st.dataframe(pd.DataFrame([{
+                'Hora': datetime.fromtimestamp(d.timestamp).strftime('%H:%M:%S'),
+                'Tipo': d.request_type, 'Modelo': d.model, 'Motivo': d.reason,
+            } for d in decisions[:20]]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Ainda sem pedidos encaminhados.")
+
+@profiled
+def show_cross_analysis(df_rollup):
+    """Análise cruzada entre datasets a partir da tabela agregada por cliente"""
     st.markdown(create_tooltip(
         "🔄 Análise Cruzada com JOIN - Clientes, Hotel & Restaurante",
         "Análises obrigatórias usando clientes.csv como base com JOINs para identificar perfil do cliente ideal, oportunidades de cross-selling e segmentação por valor. Fundamental para compreender comportamento integrado dos clientes."
     ), unsafe_allow_html=True)
     
     # Verificar se dados estão carregados
-    if df_clientes is None:
+    if df_rollup is None:
         st.error("❌ Dataset de clientes não carregado!")
         return
     
     # JOIN 1: Clientes + Restaurante
     st.subheader("🍽️ Análise Clientes-Restaurante (JOIN)")
     
-    # Fazer JOIN entre clientes e restaurante
-    df_clientes_rest = df_clientes.merge(
-        df_restaurante, 
-        on='cliente_id', 
-        how='inner',
-        suffixes=('_cliente', '_restaurante')
-    )
-    
-    # JOIN 2: Clientes + Hotel  
-    df_clientes_hotel = df_clientes.merge(
-        df_hotel,
-        on='cliente_id', 
-        how='inner',
-        suffixes=('_cliente', '_hotel')
-    )
-    
-    # JOIN 3: Clientes com AMBOS (hotel E restaurante)
-    df_clientes_ambos = df_clientes_rest.merge(
-        df_clientes_hotel[['cliente_id', 'gasto_total']], 
-        on='cliente_id',
-        how='inner',
-        suffixes=('_rest', '_hotel')
-    )
-    df_clientes_ambos['gasto_total_combinado'] = df_clientes_ambos['gasto_total_rest'] + df_clientes_ambos['gasto_total_hotel']
+    # A tabela agregada tem uma linha por cliente (JOIN de clientes com as
+    # agregações por cliente de cada negócio), evitando o produto visitas × estadias
+    df_clientes_rest = df_rollup[df_rollup['num_visitas_rest'] > 0]
+    df_clientes_hotel = df_rollup[df_rollup['num_estadias_hotel'] > 0]
+    df_clientes_ambos = df_rollup[df_rollup['segmento_servicos'] == 'Ambos Serviços']
+    total_clientes = len(df_rollup)
     
     # Métricas de JOIN
     col1, col2, col3, col4 = st.columns(4)
@@ -1833,21 +2027,21 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
         st.metric(
             "� Clientes Restaurante",
             f"{len(df_clientes_rest):,}",
-            delta=f"{len(df_clientes_rest)/len(df_clientes)*100:.1f}% do total"
+            delta=f"{len(df_clientes_rest)/total_clientes*100:.1f}% do total"
         )
     
     with col2:
         st.metric(
             "🏨 Clientes Hotel", 
             f"{len(df_clientes_hotel):,}",
-            delta=f"{len(df_clientes_hotel)/len(df_clientes)*100:.1f}% do total"
+            delta=f"{len(df_clientes_hotel)/total_clientes*100:.1f}% do total"
         )
     
     with col3:
         st.metric(
             "🔄 Clientes Ambos Serviços",
             f"{len(df_clientes_ambos):,}",
-            delta=f"Cross-selling: {len(df_clientes_ambos)/len(df_clientes)*100:.1f}%"
+            delta=f"Cross-selling: {len(df_clientes_ambos)/total_clientes*100:.1f}%"
         )
     
     with col4:
@@ -1862,6 +2056,7 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
     # ANÁLISE 1: PERFIL DO CLIENTE IDEAL (maior gasto combinado)
     st.subheader("� Perfil do Cliente Ideal - Maior Gasto Combinado")
     
+    df_top_clientes = df_clientes_ambos.iloc[0:0]
     if len(df_clientes_ambos) > 0:
         # Top 10% clientes por gasto combinado
         top_percentile = df_clientes_ambos['gasto_total_combinado'].quantile(0.9)
@@ -1891,16 +2086,20 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
             # Gasto médio
             gasto_medio_top = df_top_clientes['gasto_total_combinado'].mean()
             st.write(f"• **Gasto médio combinado:** €{gasto_medio_top:.2f}")
+            
+            # Frequência
+            st.write(f"• **Frequência média:** {df_top_clientes['num_visitas_rest'].mean():.1f} visitas "
+                     f"e {df_top_clientes['num_estadias_hotel'].mean():.1f} estadias")
         
         with col2:
             # Gráfico de distribuição dos gastos dos top clientes
-            fig = px.histogram(
-                df_top_clientes, 
-                x='gasto_total_combinado',
-                title="Distribuição Gastos - Top 10% Clientes",
-                labels={'gasto_total_combinado': 'Gasto Total Combinado (€)', 'count': 'Frequência'}
+            fig = binned_histogram(
+                df_top_clientes['gasto_total_combinado'],
+                "Distribuição Gastos - Top 10% Clientes",
+                x_label='Gasto Total Combinado (€)',
+                y_label='Frequência'
             )
-            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            show_chart(fig)
     
     # ANÁLISE 2: CROSS-SELLING DETALHADO
     st.subheader("🎯 Análise Cross-Selling Detalhada")
@@ -1922,36 +2121,21 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
         barmode='stack',
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    show_chart(fig)
     
     # ANÁLISE 3: SEGMENTAÇÃO POR VALOR
     st.subheader("💰 Segmentação de Clientes por Valor Total Gerado")
     
-    # Criar segmentos de valor para clientes com ambos os serviços
+    # Segmentos de valor (quartis) já calculados na tabela agregada
     if len(df_clientes_ambos) > 0:
-        # Definir quartis para segmentação
-        q1 = df_clientes_ambos['gasto_total_combinado'].quantile(0.25)
-        q2 = df_clientes_ambos['gasto_total_combinado'].quantile(0.50)
-        q3 = df_clientes_ambos['gasto_total_combinado'].quantile(0.75)
-        
-        def classificar_cliente(gasto):
-            if gasto <= q1:
-                return 'Bronze (Q1)'
-            elif gasto <= q2:
-                return 'Prata (Q2)'
-            elif gasto <= q3:
-                return 'Ouro (Q3)'
-            else:
-                return 'Platina (Q4)'
-        
-        df_clientes_ambos['segmento'] = df_clientes_ambos['gasto_total_combinado'].apply(classificar_cliente)
-        
         # Análise por segmento
         segmento_stats = df_clientes_ambos.groupby('segmento').agg({
             'gasto_total_combinado': ['count', 'sum', 'mean'],
             'idade': 'mean',
-            'gasto_total_rest': 'mean',
-            'gasto_total_hotel': 'mean'
+            'gasto_rest': 'mean',
+            'gasto_hotel': 'mean',
+            'num_visitas_rest': 'mean',
+            'num_estadias_hotel': 'mean'
         }).round(2)
         
         # Mostrar tabela de segmentos
@@ -1959,14 +2143,14 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
         st.dataframe(segmento_stats, use_container_width=True)
         
         # Gráfico de receita por segmento
-        receita_por_segmento = df_clientes_ambos.groupby('segmento')['gasto_total_combinado'].sum()
+        receita_por_segmento = segmento_stats[('gasto_total_combinado', 'sum')]
         
         fig = px.pie(
             values=receita_por_segmento.values,
             names=receita_por_segmento.index,
             title="Distribuição da Receita Total por Segmento de Cliente"
         )
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        show_chart(fig)
     
     # INSIGHTS FINAIS COM BASE NOS JOINS
     st.subheader("🎯 Insights Baseados em Análise Cruzada (JOIN)")
@@ -1975,7 +2159,6 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
     if len(df_clientes_ambos) > 0:
         cross_selling_rate = len(df_clientes_ambos) / len(df_clientes_rest) * 100
         avg_combined_spend = df_clientes_ambos['gasto_total_combinado'].mean()
-        avg_rest_only = df_clientes_rest['gasto_total'].mean()
         
         st.markdown(f"""
         <div class="insight-box">
@@ -1983,7 +2166,7 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
         <ul>
         <li><strong>🎯 Taxa Cross-Selling:</strong> {cross_selling_rate:.1f}% dos clientes do restaurante também usam o hotel</li>
         <li><strong>💰 Valor do Cliente Cruzado:</strong> Clientes que usam ambos serviços gastam €{avg_combined_spend:.2f} em média</li>
-        <li><strong>📈 Premium vs Standard:</strong> Clientes top 10% representam {len(df_top_clientes) if 'df_top_clientes' in locals() else 0} pessoas</li>
+        <li><strong>📈 Premium vs Standard:</strong> Clientes top 10% representam {len(df_top_clientes)} pessoas</li>
         <li><strong>🎯 Oportunidade:</strong> {clientes_so_rest:,} clientes só do restaurante são potencial para hotel</li>
         <li><strong>🏨 Potencial Hotel:</strong> {clientes_so_hotel:,} hóspedes não frequentam o restaurante</li>
         </ul>
@@ -2002,6 +2185,7 @@ def show_cross_analysis(df_restaurante, df_hotel, df_clientes):
         st.warning("⚠️ Não há clientes que utilizaram ambos os serviços nos dados atuais.")
 
 # Footer
+@profiled
 def show_footer():
     st.markdown("---")
     st.markdown(
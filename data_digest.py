@@ -0,0 +1,167 @@
+"""
+Resumos estatísticos compactos dos datasets para prompts de LLM
+
+Em vez de enviar linhas ou o `describe()` completo (dezenas de colunas), cada
+dataset é reduzido a blocos de texto curtos: agregados do `gasto_total`,
+tabelas por segmento (ordenadas pelo quanto explicam do gasto), correlações
+com o gasto e tendência mensal. `fit_to_budget` junta os blocos por ordem de
+prioridade sem ultrapassar um orçamento de tokens.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from analytics import find_date_column, top_correlated_pairs
+
+# Aproximação usada para orçamentar prompts (~4 caracteres por token)
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 400
+
+
+def estimate_tokens(text):
+    """Nº aproximado de tokens de um texto"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class DigestBlock:
+    """Bloco do resumo: título e linhas, da mais para a menos importante"""
+    title: str
+    lines: list = field(default_factory=list)
+
+
+def fit_to_budget(blocks, budget_tokens=DEFAULT_TOKEN_BUDGET, min_lines=2):
+    """
+    Junta os blocos num texto com no máximo `budget_tokens` tokens. Primeiro
+    entram as `min_lines` primeiras linhas de cada bloco (por ordem), depois as
+    restantes; linhas que não cabem são omitidas.
+    """
+    blocks = [block for block in blocks if block.lines]
+    kept = [[] for _ in blocks]
+    used = sum(estimate_tokens(f"{block.title}:\n") for block in blocks)
+
+    def fill(start, stop):
+        nonlocal used
+        for i, block in enumerate(blocks):
+            for line in block.lines[start:stop]:
+                cost = estimate_tokens(line + "\n")
+                if used + cost <= budget_tokens:
+                    kept[i].append(line)
+                    used += cost
+
+    fill(0, min_lines)
+    fill(min_lines, None)
+    return "\n".join(f"{block.title}:\n" + "\n".join(lines)
+                     for block, lines in zip(blocks, kept) if lines)
+
+
+def _money(value):
+    return f"€{value:,.0f}" if abs(value) >= 100 else f"€{value:.2f}"
+
+
+def _segment_columns(df, max_categories):
+    """Colunas categóricas/booleanas pequenas (excluindo identificadores)"""
+    return [col for col in df.columns
+            if not col.endswith("_id") and col != "gasto_total"
+            and not pd.api.types.is_datetime64_any_dtype(df[col])
+            and (not pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]))
+            and 1 < df[col].nunique() <= max_categories]
+
+
+def spend_block(df, name, value_col="gasto_total"):
+    """Agregados do gasto e peso de cada componente (colunas gasto_*_total)"""
+    values = pd.to_numeric(df[value_col], errors="coerce").dropna()
+    if values.empty:
+        return DigestBlock(f"{name} · {value_col}")
+    q10, q50, q90 = values.quantile([0.1, 0.5, 0.9])
+    lines = [
+        f"n={len(values):,}, total={_money(values.sum())}, média={_money(values.mean())}, "
+        f"mediana={_money(q50)}, p10={_money(q10)}, p90={_money(q90)}, desvio={_money(values.std())}",
+    ]
+    components = [col for col in df.columns
+                  if col.startswith("gasto_") and col.endswith("_total") and col != value_col]
+    if components:
+        shares = df[components].sum() / values.sum()
+        lines.append("peso no total: " + ", ".join(f"{col}={share:.0%}" for col, share in shares.items()))
+    ratings = [col for col in df.columns if col.startswith("rating_")]
+    if ratings:
+        lines.append("ratings médios (1-5): " + ", ".join(f"{col[7:]}={df[col].mean():.2f}" for col in ratings))
+    return DigestBlock(f"{name} · {value_col}", lines)
+
+
+def segment_block(df, name, value_col="gasto_total", max_categories=12, min_eta2=0.01):
+    """
+    Registos, peso e gasto médio por categoria. As colunas são ordenadas pela
+    fração da variância do gasto explicada pelos grupos (η²); as que quase não
+    a explicam (η² < `min_eta2`) são omitidas.
+    """
+    values = pd.to_numeric(df[value_col], errors="coerce")
+    total_var = values.var(ddof=0)
+    ranked = []
+    for col in _segment_columns(df, max_categories):
+        grouped = values.groupby(df[col], observed=True).agg(["size", "mean"])
+        between = (grouped["size"] * (grouped["mean"] - values.mean()) ** 2).sum() / grouped["size"].sum()
+        eta2 = between / total_var if total_var else 0.0
+        if eta2 < min_eta2:
+            continue
+        parts = " | ".join(f"{row.Index} {row.size / len(df):.0%} {_money(row.mean)}"
+                           for row in grouped.sort_values("mean", ascending=False).itertuples())
+        ranked.append((eta2, f"{col} (η²={eta2:.2f}): {parts}"))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return DigestBlock(f"{name} · segmentos (peso, gasto médio)", [line for _, line in ranked])
+
+
+def correlation_block(df, name, value_col="gasto_total", k=6):
+    """Variáveis mais correlacionadas com o gasto e pares fortes entre as restantes"""
+    numeric = df.select_dtypes(include=[np.number])
+    # Componentes do gasto correlacionam-se com ele por construção
+    numeric = numeric[[col for col in numeric.columns
+                       if col == value_col or not col.startswith("gasto_")]]
+    if value_col not in numeric.columns or numeric.shape[1] < 2:
+        return DigestBlock(f"{name} · correlações")
+    corr = numeric.corr()
+    with_value = corr[value_col].drop(value_col).dropna()
+    with_value = with_value.reindex(with_value.abs().sort_values(ascending=False).index).head(k)
+    lines = [f"com {value_col}: " + ", ".join(f"{col} {r:+.2f}" for col, r in with_value.items())]
+    pairs = top_correlated_pairs(corr.drop(index=value_col, columns=value_col), k=k)
+    lines.extend(f"{row.variavel_1} ↔ {row.variavel_2}: {row.correlacao:+.2f}"
+                 for row in pairs.itertuples() if abs(row.correlacao) >= 0.3)
+    return DigestBlock(f"{name} · correlações", lines)
+
+
+def trend_block(df, name, value_col="gasto_total", months=6):
+    """Receita mensal: período, crescimento recente e últimos meses"""
+    date_col = find_date_column(df)
+    if date_col is None:
+        return DigestBlock(f"{name} · tendência")
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    monthly = pd.Series(df[value_col].to_numpy(), index=dates)
+    monthly = monthly[monthly.index.notna()].resample("MS").agg(["sum", "size"])
+    if len(monthly) < 2:
+        return DigestBlock(f"{name} · tendência")
+    lines = [f"{monthly.index[0]:%Y-%m} a {monthly.index[-1]:%Y-%m} ({len(monthly)} meses, por {date_col}); "
+             f"melhor mês {monthly['sum'].idxmax():%Y-%m} ({_money(monthly['sum'].max())}), "
+             f"pior {monthly['sum'].idxmin():%Y-%m} ({_money(monthly['sum'].min())})"]
+    if len(monthly) >= 6:
+        recent, previous = monthly["sum"].iloc[-3:].sum(), monthly["sum"].iloc[-6:-3].sum()
+        if previous:
+            lines.append(f"últimos 3 meses vs 3 anteriores: {recent / previous - 1:+.1%}")
+    lines.append("receita mensal (registos): " + ", ".join(f"{row.Index:%Y-%m} {_money(row.sum)} ({row.size:,})"
+                                                          for row in monthly.tail(months).itertuples()))
+    return DigestBlock(f"{name} · tendência", lines)
+
+
+def rollup_block(df_rollup):
+    """Clientes por combinação de serviços e segmentos de valor (tabela agregada por cliente)"""
+    if df_rollup is None:
+        return DigestBlock("Clientes")
+    by_service = df_rollup.groupby("segmento_servicos")["gasto_total_combinado"].agg(["size", "mean", "sum"])
+    lines = [f"{len(df_rollup):,} clientes"]
+    lines.extend(f"{row.Index}: {row.size:,} clientes, gasto médio {_money(row.mean)}, total {_money(row.sum)}"
+                 for row in by_service.itertuples())
+    value_segments = df_rollup["segmento"].value_counts()
+    if not value_segments.empty:
+        lines.append("segmentos de valor (ambos os serviços): "
+                     + ", ".join(f"{idx}: {n:,}" for idx, n in value_segments.items()))
+    return DigestBlock("Clientes", lines)
@@ -0,0 +1,257 @@
+"""
+Snapshots colunares tipados dos datasets
+
+Cada CSV de `Datasets_clean/` e `Datasets_ML/` é convertido num snapshot Feather
+(Arrow IPC, sem compressão) guardado em `.snapshots/`, com tipos explícitos:
+flags `Sim`/`Não` como booleanos, categorias como `category`, datas como
+`datetime64`. O `read_dataset` lê o snapshot quando este é mais recente que
+o CSV e, caso contrário, volta ao CSV (aplicando os mesmos tipos).
+
+O `read_shared` mapeia o snapshot em memória (mmap) em vez de o copiar: as
+colunas numéricas e de datas do DataFrame são vistas só de leitura sobre o
+ficheiro, e as páginas ficam na page cache do sistema, partilhadas por todas
+as sessões e por todos os processos do servidor que leem o mesmo snapshot.
+Os snapshots são escritos num único record batch, para que estas colunas não
+tenham de ser concatenadas (copiadas) na leitura.
+
+O `dataset_version` identifica o conteúdo de um CSV (tamanho, data de
+modificação e SHA-256) no momento em que é carregado; `DataVersion.extends`
+diz se uma versão só acrescentou linhas a outra.
+
+Uso em linha de comandos (converter todos os datasets):
+    python data_store.py
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+SNAPSHOT_DIR = ".snapshots"
+
+DATASET_PATHS = {
+    "restaurante": os.path.join("Datasets_clean", "restaurante_clean.csv"),
+    "hotel": os.path.join("Datasets_clean", "hotel_clean.csv"),
+    "clientes": os.path.join("Datasets_clean", "clientes.csv"),
+    "restaurante_ml": os.path.join("Datasets_ML", "restaurante_ml.csv"),
+    "hotel_ml": os.path.join("Datasets_ML", "hotel_ml.csv"),
+}
+
+# Mapeamento das flags textuais para booleanos
+BOOL_VALUES = {"Sim": True, "Não": False}
+
+# Tipos explícitos por ficheiro (nome sem extensão). Colunas não listadas
+# seguem as regras genéricas de `coerce_dtypes`.
+DATASET_SCHEMAS = {
+    "hotel_clean": {
+        "category": ["cliente_id", "tipo_quarto", "motivo_viagem", "canal_reserva",
+                     "regime", "epoca"],
+        "bool": ["fim_semana", "feriado", "evento_cidade", "foi_spa",
+                 "pediu_room_service", "late_checkout", "estacionamento",
+                 "transfer_aeroporto", "fez_reclamacao"],
+        "datetime": ["data_checkin", "data_checkout"],
+    },
+    "clientes": {
+        "category": ["genero", "nacionalidade", "distrito_residencia", "tipo_cliente"],
+        "bool": ["cliente_habitual"],
+        "datetime": ["cliente_desde"],
+    },
+}
+
+# Colunas de texto com poucos valores distintos passam a `category`
+CATEGORY_MAX_RATIO = 0.5
+
+
+def file_hash(path, chunk_size=1 << 20, limit=None):
+    """Calcula o hash SHA-256 do conteúdo de um ficheiro (ou dos primeiros `limit` bytes)"""
+    digest = hashlib.sha256()
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class DataVersion:
+    """Versão do conteúdo de um CSV no momento em que foi carregado"""
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    def extends(self, previous):
+        """
+        Indica se esta versão só acrescentou linhas a `previous`: o ficheiro em disco
+        ainda é esta versão e os seus primeiros bytes são exatamente os de `previous`,
+        terminados numa linha completa
+        """
+        if previous is None or previous.path != self.path or previous.size > self.size:
+            return False
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_size, stat.st_mtime_ns) != (self.size, self.mtime_ns):
+                return False
+            if previous.size:
+                with open(self.path, "rb") as f:
+                    f.seek(previous.size - 1)
+                    if f.read(1) != b"\n":
+                        return False
+            return file_hash(self.path, limit=previous.size) == previous.sha256
+        except OSError:
+            return False
+
+
+def dataset_version(csv_path):
+    """Versão atual de um CSV (tamanho, data de modificação e hash do conteúdo)"""
+    stat = os.stat(csv_path)
+    return DataVersion(os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns, file_hash(csv_path))
+
+
+def snapshot_path(csv_path, snapshot_dir=SNAPSHOT_DIR):
+    """Caminho do snapshot Feather correspondente a um CSV"""
+    base, _ = os.path.splitext(os.path.normpath(csv_path))
+    if os.path.isabs(base):
+        # Caminhos absolutos: snapshot ao lado do CSV, dentro de .snapshots/
+        folder, name = os.path.split(base)
+        return os.path.join(folder, snapshot_dir, f"{name}.feather")
+    return os.path.join(snapshot_dir, f"{base}.feather")
+
+
+def _is_bool_flag(series):
+    values = series.dropna().unique()
+    return len(values) > 0 and set(values) <= set(BOOL_VALUES)
+
+
+def _to_bool(series):
+    """
+    Converte flags `Sim`/`Não` em booleanos; valores em falta dão o tipo `boolean`
+    (nullable) e valores desconhecidos são um erro, em vez de virarem `True`
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    mapped = series.map(BOOL_VALUES)
+    unknown = series[mapped.isna() & series.notna()].unique()
+    if len(unknown):
+        raise ValueError(f"Valores inválidos na coluna booleana {series.name}: {list(unknown)[:5]}")
+    return mapped.astype(bool) if mapped.notna().all() else mapped.astype("boolean")
+
+
+def coerce_dtypes(df, schema=None):
+    """Aplica tipos explícitos (schema) e regras genéricas a um DataFrame lido de CSV"""
+    schema = schema or {}
+    explicit = {col for cols in schema.values() for col in cols}
+
+    for col in schema.get("bool", []):
+        if col in df.columns:
+            df[col] = _to_bool(df[col])
+    for col in schema.get("datetime", []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in schema.get("category", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    # Regras genéricas para colunas de texto sem tipo explícito
+    for col in df.columns:
+        if col in explicit or not (pd.api.types.is_object_dtype(df[col])
+                                   or pd.api.types.is_string_dtype(df[col])):
+            continue
+        if _is_bool_flag(df[col]) and df[col].notna().all():
+            df[col] = _to_bool(df[col])
+        elif col.lower().startswith("data"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif df[col].nunique() <= CATEGORY_MAX_RATIO * len(df):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_csv_typed(csv_path):
+    """Lê um CSV aplicando os tipos definidos para esse dataset"""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return coerce_dtypes(pd.read_csv(csv_path), DATASET_SCHEMAS.get(name))
+
+
+def write_snapshot(df, csv_path):
+    """Guarda o snapshot Feather de um dataset (escrita atómica)"""
+    path = snapshot_path(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # Um único record batch: as colunas podem ser lidas por mmap sem cópia
+    df.reset_index(drop=True).to_feather(tmp_path, compression="uncompressed", chunksize=max(len(df), 1))
+    os.replace(tmp_path, path)
+    return path
+
+
+def snapshot_is_fresh(csv_path):
+    """Indica se existe um snapshot mais recente que o CSV"""
+    path = snapshot_path(csv_path)
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(csv_path)
+    except OSError:
+        return False
+
+
+def read_dataset(csv_path):
+    """Lê um dataset a partir do snapshot (se atualizado) ou do CSV"""
+    if snapshot_is_fresh(csv_path):
+        try:
+            return pd.read_feather(snapshot_path(csv_path))
+        except (ImportError, OSError, ValueError):
+            pass
+
+    df = read_csv_typed(csv_path)
+    try:
+        # Atualizar o snapshot para o próximo arranque (opcional, requer pyarrow)
+        write_snapshot(df, csv_path)
+    except (ImportError, OSError):
+        pass
+    return df
+
+
+def read_shared(csv_path):
+    """
+    Lê um dataset como vista só de leitura sobre o snapshot mapeado em memória
+
+    As colunas numéricas e de datas partilham as páginas do ficheiro (sem
+    cópia); booleanos e categorias são convertidos para os tipos do pandas
+    (cópia privada, 1 byte ou menos por linha). O DataFrame devolvido não deve
+    ser alterado: com Copy-on-Write as escritas em colunas criam cópias
+    privadas, mas acrescentar colunas altera o objeto partilhado. Sem pyarrow
+    ou sem snapshot, devolve o `read_dataset`.
+    """
+    if not snapshot_is_fresh(csv_path):
+        df = read_dataset(csv_path)
+        if not snapshot_is_fresh(csv_path):
+            return df
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return read_dataset(csv_path)
+
+    path = snapshot_path(csv_path)
+    try:
+        table = feather.read_table(path, memory_map=True)
+        if table.num_columns and table.column(0).num_chunks > 1:
+            # Snapshot antigo em vários batches: reescrever uma vez num só
+            write_snapshot(table.to_pandas(), csv_path)
+            table = feather.read_table(path, memory_map=True)
+    except (OSError, ValueError):
+        return read_dataset(csv_path)
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == "__main__":
+    for name, csv_path in DATASET_PATHS.items():
+        if not os.path.exists(csv_path):
+            print(f"⚠️ {name}: {csv_path} não encontrado, a ignorar")
+            continue
+        snap = write_snapshot(read_csv_typed(csv_path), csv_path)
+        csv_mb = os.path.getsize(csv_path) / 1e6
+        snap_mb = os.path.getsize(snap) / 1e6
+        print(f"✅ {name}: {csv_path} ({csv_mb:.1f} MB) → {snap} ({snap_mb:.1f} MB)")
@@ -0,0 +1,208 @@
+"""
+Avaliação offline dos modelos de Machine Learning
+
+Treina os modelos candidatos (Linear/Logistic, RandomForest, SVR/SVC) sobre
+`Datasets_ML/*` com divisão treino/teste (e validação cruzada opcional), em
+paralelo num process pool, e escreve métricas e tempos de treino/previsão em
+`artifacts/ml_results.json`. Cada worker usa um único thread (BLAS/OpenMP) e
+há no máximo um worker por CPU, para que os tempos sejam comparáveis entre
+modelos e não dependam do nº de workers. O dashboard apenas lê este ficheiro.
+
+Uso:
+    python evaluate_models.py
+    python evaluate_models.py --cv 5 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from data_store import file_hash, read_dataset
+
+RESULTS_PATH = os.path.join("artifacts", "ml_results.json")
+
+
+@dataclass(frozen=True)
+class EvalTask:
+    """Tarefa de avaliação: dataset, variável alvo e colunas excluídas das features"""
+    business: str
+    title: str
+    kind: str
+    csv_path: str
+    target: str
+    exclude: tuple = ()
+
+
+EVAL_TASKS = [
+    EvalTask("restaurante", "Regressão (Gasto Total)", "regression",
+             os.path.join("Datasets_ML", "restaurante_ml.csv"), "gasto_total",
+             ("gasto_total", "voltou_visitar", "experiencia_completa")),
+    EvalTask("restaurante", "Classificação (Retorno Cliente)", "classification",
+             os.path.join("Datasets_ML", "restaurante_ml.csv"), "voltou_visitar",
+             ("gasto_total", "voltou_visitar", "experiencia_completa")),
+    EvalTask("hotel", "Regressão (Gastos Extras)", "regression",
+             os.path.join("Datasets_ML", "hotel_ml.csv"), "gasto_extras_total",
+             ("gasto_extras_total", "gasto_quarto_total", "preco_quarto_noite",
+              "consumo_minibar", "consumo_bar_hotel", "gasto_spa")),
+    EvalTask("hotel", "Classificação (Uso do SPA)", "classification",
+             os.path.join("Datasets_ML", "hotel_ml.csv"), "foi_spa",
+             ("foi_spa", "num_massagens", "gasto_spa")),
+]
+
+CANDIDATE_MODELS = {
+    "regression": ["Linear Regression", "Random Forest", "SVR"],
+    "classification": ["Logistic Regression", "Random Forest", "SVC"],
+}
+
+
+def build_model(name, kind, random_state=42):
+    """Cria o estimador candidato (modelos SVM e lineares com normalização)"""
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC, SVR
+
+    if name == "Random Forest":
+        forest = RandomForestRegressor if kind == "regression" else RandomForestClassifier
+        return forest(n_estimators=100, random_state=random_state)
+    if name == "Linear Regression":
+        return LinearRegression()
+    if name == "Logistic Regression":
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    if name == "SVR":
+        return make_pipeline(StandardScaler(), SVR())
+    if name == "SVC":
+        return make_pipeline(StandardScaler(), SVC())
+    raise ValueError(f"Modelo desconhecido: {name}")
+
+
+def _score(kind, y_true, y_pred):
+    from sklearn.metrics import (accuracy_score, mean_absolute_error, mean_squared_error,
+                                 precision_score, r2_score, recall_score)
+    if kind == "regression":
+        return {
+            "R²": r2_score(y_true, y_pred),
+            "MAE": mean_absolute_error(y_true, y_pred),
+            "RMSE": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        }
+    return {
+        "Accuracy": accuracy_score(y_true, y_pred),
+        "Precision": precision_score(y_true, y_pred, average="weighted", zero_division=0),
+        "Recall": recall_score(y_true, y_pred, average="weighted", zero_division=0),
+    }
+
+
+def _split(task, test_size, random_state):
+    """Features e alvo da tarefa, com a divisão treino/teste (estratificada na classificação)"""
+    from sklearn.model_selection import train_test_split
+
+    df = read_dataset(task.csv_path)
+    features = [col for col in df.columns if col not in task.exclude]
+    X, y = df[features], df[task.target]
+
+    stratify = y if task.kind == "classification" else None
+    return X, y, train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=stratify)
+
+
+def _limit_threads():
+    """Inicialização dos workers: um thread BLAS/OpenMP por processo (sem competir com os outros workers)"""
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=1)
+
+
+def evaluate(task, model_name, test_size=0.2, cv=0, random_state=42):
+    """Treina e avalia um modelo numa tarefa, medindo tempos de treino e previsão"""
+    from sklearn.base import clone
+    from sklearn.model_selection import cross_val_score
+
+    X, y, (X_train, X_test, y_train, y_test) = _split(task, test_size, random_state)
+    model = build_model(model_name, task.kind, random_state)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_s = time.perf_counter() - start
+
+    # Latência de uma previsão individual (como no sistema de previsões do dashboard)
+    one_row = X_test.iloc[:1]
+    single = []
+    for _ in range(5):
+        start = time.perf_counter()
+        model.predict(one_row)
+        single.append(time.perf_counter() - start)
+
+    result = _score(task.kind, y_test, y_pred)
+    result.update({
+        "fit_s": fit_s,
+        "predict_us_por_linha": predict_s / len(X_test) * 1e6,
+        "latencia_1_linha_ms": float(np.median(single) * 1000),
+        "n_treino": len(X_train),
+        "n_teste": len(X_test),
+    })
+
+    if cv:
+        scoring = "r2" if task.kind == "regression" else "accuracy"
+        scores = cross_val_score(clone(model), X, y, cv=cv, scoring=scoring)
+        result[f"CV {scoring} (média)"] = float(scores.mean())
+        result[f"CV {scoring} (desvio)"] = float(scores.std())
+
+    return task, model_name, result
+
+
+def run_evaluation(tasks=EVAL_TASKS, workers=None, test_size=0.2, cv=0, output=RESULTS_PATH):
+    """Avalia todos os modelos candidatos em paralelo e escreve o artefacto de resultados"""
+    tasks = [task for task in tasks if os.path.exists(task.csv_path)]
+    results = {}
+    # Mais workers do que CPUs tornaria os tempos medidos dependentes da espera pelo CPU
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, cpus)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_limit_threads) as pool:
+        futures = [pool.submit(evaluate, task, name, test_size, cv)
+                   for task in tasks for name in CANDIDATE_MODELS[task.kind]]
+        for future in as_completed(futures):
+            task, name, result = future.result()
+            results.setdefault(task.business, {}).setdefault(task.title, {})[name] = result
+            print(f"✅ {task.business} · {task.title} · {name}: fit {result['fit_s']:.2f}s")
+
+    # Manter a ordem dos modelos candidatos no artefacto
+    for business, by_task in results.items():
+        for task in tasks:
+            if task.business == business and task.title in by_task:
+                by_task[task.title] = {name: by_task[task.title][name]
+                                       for name in CANDIDATE_MODELS[task.kind]}
+
+    artifact = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "data_versions": {task.csv_path: file_hash(task.csv_path) for task in tasks},
+        "config": {"test_size": test_size, "cv": cv},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output)
+    return artifact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Avaliação offline dos modelos ML")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos em paralelo (default e máximo: nº de CPUs)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="fração do conjunto de teste")
+    parser.add_argument("--cv", type=int, default=0, help="nº de folds de validação cruzada (0 = desligado)")
+    parser.add_argument("--output", default=RESULTS_PATH, help="caminho do artefacto de resultados")
+    args = parser.parse_args()
+
+    run_evaluation(workers=args.workers, test_size=args.test_size, cv=args.cv, output=args.output)
+    print(f"📄 Resultados escritos em {args.output}")
@@ -0,0 +1,275 @@
+"""
+Codificação de reservas em features dos modelos
+
+O `FeatureEncoder` é construído a partir da lista de colunas do treino
+(`Datasets_ML/*`, guardada em cada modelo) e de um esquema por negócio:
+cada coluna de treino é resolvida uma única vez para um campo numérico, uma
+categoria one-hot (`<prefixo>_<categoria>`) ou uma constante. A codificação
+escreve diretamente numa matriz NumPy pré-alocada, na ordem do treino, seja
+para uma reserva ou para milhões — a previsão individual e o scoring em lote
+usam o mesmo caminho.
+"""
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+MONTH_NUMBERS = {name: i for i, name in enumerate(MESES, start=1)}
+
+# Valores aceites nas colunas de flags (uma célula vazia conta como falso)
+TRUE_VALUES = {"true", "1", "sim", "s", "yes", "y", "x"}
+FALSE_VALUES = {"false", "0", "não", "nao", "n", "no", ""}
+
+
+@dataclass(frozen=True, eq=False)
+class EncodingSchema:
+    """Como os campos de uma reserva se relacionam com as colunas de treino"""
+    numeric: tuple
+    one_hot: tuple
+    constants: dict = field(default_factory=dict)
+
+
+class FeatureEncoder:
+    """Converte campos de reservas numa matriz de features pela ordem do treino"""
+
+    def __init__(self, columns, schema):
+        self.columns = list(columns)
+        self.schema = schema
+        self.unmapped = []
+        self._numeric = []      # (índice, campo)
+        self._constants = []    # (índice, valor)
+        self._one_hot = {}      # campo → [(índice, categoria)]
+
+        numeric = set(schema.numeric)
+        for j, col in enumerate(self.columns):
+            if col in numeric:
+                self._numeric.append((j, col))
+            elif col in schema.constants:
+                self._constants.append((j, schema.constants[col]))
+            else:
+                prefix = next((p for p in schema.one_hot if col.startswith(f"{p}_")), None)
+                if prefix is not None:
+                    self._one_hot.setdefault(prefix, []).append((j, col[len(prefix) + 1:]))
+                else:
+                    # Coluna de treino sem correspondência: fica a 0 (como no reindex)
+                    self.unmapped.append(col)
+
+    def encode(self, fields):
+        """Matriz (n_reservas × n_features) a partir de um dict campo → valores"""
+        try:
+            values = {name: np.atleast_1d(np.asarray(fields[name]))
+                      for name in [*(f for _, f in self._numeric), *self._one_hot]}
+        except KeyError as e:
+            raise ValueError(f"Campo em falta para o modelo: {e.args[0]}") from None
+        n = max((len(v) for v in values.values()), default=1)
+
+        # Ordem de Fortran: cada coluna é escrita numa zona contígua de memória
+        X = np.zeros((n, len(self.columns)), dtype="float64", order="F")
+        for j, name in self._numeric:
+            X[:, j] = values[name]
+        for j, value in self._constants:
+            X[:, j] = value
+        for name, targets in self._one_hot.items():
+            # Códigos por valor distinto; comparação em texto ('1' da coluna mes_1 ↔ mês 1)
+            codes, uniques = pd.factorize(values[name])
+            lookup = {str(value): code for code, value in enumerate(uniques)}
+            for j, category in targets:
+                code = lookup.get(category)
+                if code is not None:
+                    X[:, j] = codes == code
+        return X
+
+
+@lru_cache(maxsize=16)
+def encoder_for(columns, schema):
+    """Encoder em cache para uma lista de colunas de treino (tuple) e um esquema"""
+    return FeatureEncoder(columns, schema)
+
+
+def encode_for_model(model, schema, fields):
+    """Codifica os campos pela ordem de colunas do modelo treinado"""
+    return encoder_for(tuple(model.features), schema).encode(fields)
+
+
+# --- Conversão de valores de entrada -------------------------------------------
+
+def _map_unique(series, func):
+    """Aplica `func` a cada valor distinto (poucos) e expande para todas as linhas"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return np.asarray([func(value) for value in uniques], dtype=object)[codes]
+
+
+def _parse_flag(value):
+    if isinstance(value, (bool, int, float, np.number)) and value in (0, 1):
+        return bool(value)
+    if pd.isna(value):
+        return False
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    return None
+
+
+def _parse_month(value):
+    text = str(value).strip()
+    try:
+        return int(float(text))
+    except (ValueError, OverflowError):
+        return MONTH_NUMBERS.get(text.capitalize(), 0)
+
+
+def _parse_periodo(value):
+    text = _strip_accents(value).lower()
+    if "almoco" in text:
+        return "Almoco"
+    if "jantar" in text:
+        return "Jantar"
+    return "Lanche"
+
+
+def _strip_accents(value):
+    return unicodedata.normalize("NFKD", str(value).strip()).encode("ascii", "ignore").decode("ascii")
+
+
+def as_flag(series, name):
+    """Converte uma coluna de flags (True/False, 1/0, Sim/Não) em booleanos; outros valores são erro"""
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy()
+    flags = _map_unique(series, _parse_flag)
+    if any(flag is None for flag in flags):
+        raise ValueError(f"Coluna '{name}' com valores inválidos (use Sim/Não, True/False ou 1/0)")
+    return flags.astype(bool)
+
+
+def month_number(series):
+    """Aceita o mês como número (1-12) ou nome em português"""
+    if pd.api.types.is_numeric_dtype(series):
+        month = series.fillna(0).to_numpy()
+    else:
+        month = _map_unique(series, _parse_month)
+    month = month.astype(int) if len(month) else np.zeros(0, dtype=int)
+    if ((month < 1) | (month > 12)).any():
+        raise ValueError("Coluna 'mes' com valores inválidos (use 1-12 ou o nome do mês)")
+    return month
+
+
+def positive_number(series, name):
+    """Contagem (noites, pessoas) como array numérico; zero, negativos ou em falta são inválidos"""
+    values = pd.to_numeric(series).to_numpy(dtype="float64")
+    if (~np.isfinite(values) | (values <= 0)).any():
+        raise ValueError(f"Coluna '{name}' com valores inválidos (use números maiores que 0)")
+    return values
+
+
+def without_accents(series):
+    """Normaliza categorias escritas com acentos (p.ex. 'Sábado' → 'Sabado')"""
+    return _map_unique(series, _strip_accents).astype(str)
+
+
+def as_text(series):
+    """Categoria como array de texto"""
+    return _map_unique(series, lambda value: str(value).strip()).astype(str)
+
+
+# --- Hotel ---------------------------------------------------------------------
+
+HOTEL_SCHEMA = EncodingSchema(
+    numeric=("noites", "antecedencia_dias", "num_hospedes", "fim_semana", "feriado",
+             "evento_cidade", "foi_spa", "num_massagens", "pediu_room_service",
+             "num_vezes_room_service", "late_checkout", "estacionamento",
+             "transfer_aeroporto", "gasto_quarto_total", "reserva_antecipada",
+             "reserva_ultimo_minuto"),
+    one_hot=("tipo_quarto", "motivo_viagem", "canal_reserva", "regime", "mes", "epoca"),
+    constants={
+        # Consumos ainda desconhecidos e médias históricas de ratings
+        "consumo_minibar": 0, "consumo_bar_hotel": 0, "gasto_spa": 0,
+        "rating_limpeza": 4.2, "rating_staff": 4.1, "rating_localizacao": 4.3,
+        "rating_geral": 4.2, "fez_reclamacao": 0, "preco_quarto_noite": 120,
+        "desconto_aplicado": 0, "cliente_frequente": 0,  # Cliente novo
+    },
+)
+
+
+def hotel_fields(df):
+    """Campos do modelo de hotel (vetorizados) a partir das colunas de reservas"""
+    noites = positive_number(df["noites"], "noites")
+    antecedencia = pd.to_numeric(df["antecedencia_dias"]).to_numpy()
+    mes = month_number(df["mes"])
+    foi_spa = as_flag(df["foi_spa"], "foi_spa")
+    room_service = as_flag(df["pediu_room_service"], "pediu_room_service")
+    return {
+        "noites": noites,
+        "antecedencia_dias": antecedencia,
+        "num_hospedes": pd.to_numeric(df["num_hospedes"]).to_numpy(),
+        "fim_semana": as_flag(df["fim_semana"], "fim_semana"),
+        "feriado": as_flag(df["feriado"], "feriado"),
+        "evento_cidade": as_flag(df["evento_cidade"], "evento_cidade"),
+        "foi_spa": foi_spa,
+        "num_massagens": foi_spa.astype(int),
+        "pediu_room_service": room_service,
+        "num_vezes_room_service": room_service.astype(int),
+        "late_checkout": as_flag(df["late_checkout"], "late_checkout"),
+        "estacionamento": as_flag(df["estacionamento"], "estacionamento"),
+        "transfer_aeroporto": as_flag(df["transfer_aeroporto"], "transfer_aeroporto"),
+        "gasto_quarto_total": 120 * noites,
+        "reserva_antecipada": (antecedencia > 30).astype(int),
+        "reserva_ultimo_minuto": (antecedencia < 7).astype(int),
+        "tipo_quarto": as_text(df["tipo_quarto"]),
+        "motivo_viagem": as_text(df["motivo_viagem"]),
+        "canal_reserva": as_text(df["canal_reserva"]),
+        "regime": as_text(df["regime"]),
+        "mes": mes,
+        # Época: verão alta, inverno baixa
+        "epoca": np.select([np.isin(mes, [7, 8, 9]), np.isin(mes, [12, 1, 2])],
+                           ["Alta", "Baixa"], default="Media"),
+    }
+
+
+# --- Restaurante -----------------------------------------------------------------
+
+RESTAURANT_SCHEMA = EncodingSchema(
+    numeric=("num_pessoas", "mesa_especial", "criancas", "ocasiao_especial", "feriado",
+             "evento_local", "vinho", "sobremesa", "menu_degustacao",
+             "preco_medio_pessoa", "gasto_total_previsto", "mes_num"),
+    one_hot=("periodo", "dia_semana", "tipo_cliente", "canal_reserva", "mes"),
+    constants={
+        # Médias históricas
+        "rating_comida": 4.3, "rating_servico": 4.1, "rating_ambiente": 4.2,
+        "rating_geral": 4.2, "tempo_espera_min": 10, "fez_reclamacao": 0,
+    },
+)
+
+
+def restaurant_fields(df):
+    """Campos do modelo de restaurante (vetorizados) a partir das colunas de reservas"""
+    periodo = _map_unique(df["horario"], _parse_periodo).astype(str)
+    num_pessoas = positive_number(df["num_pessoas"], "num_pessoas")
+    menu_degustacao = as_flag(df["menu_degustacao"], "menu_degustacao")
+    mes = month_number(df["mes"])
+    preco_medio_pessoa = np.where(periodo == "Jantar", 25.0, 15.0) * np.where(menu_degustacao, 2.5, 1.0)
+    return {
+        "num_pessoas": num_pessoas,
+        "mesa_especial": as_flag(df["mesa_especial"], "mesa_especial"),
+        "criancas": as_flag(df["criancas"], "criancas"),
+        "ocasiao_especial": as_flag(df["ocasiao_especial"], "ocasiao_especial"),
+        "feriado": as_flag(df["feriado"], "feriado"),
+        "evento_local": as_flag(df["evento_local"], "evento_local"),
+        "vinho": as_flag(df["vinho"], "vinho"),
+        "sobremesa": as_flag(df["sobremesa"], "sobremesa"),
+        "menu_degustacao": menu_degustacao,
+        "preco_medio_pessoa": preco_medio_pessoa,
+        "gasto_total_previsto": preco_medio_pessoa * num_pessoas,
+        "mes_num": mes,
+        "periodo": periodo,
+        "dia_semana": without_accents(df["dia_semana"]),
+        "tipo_cliente": as_text(df["tipo_cliente"]),
+        "canal_reserva": as_text(df["canal_reserva"]),
+        "mes": mes,
+    }
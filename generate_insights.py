@@ -0,0 +1,124 @@
+"""
+Geração offline dos insights LLM
+
+Carrega os datasets uma vez, calcula o resumo de cada secção de insights e gera
+em paralelo (pedidos concorrentes, modelo escolhido pelo router ou fixo) apenas
+as secções cujo resumo de entrada mudou desde a última execução. Escreve
+`artifacts/llm_insights.json` com o hash dos dados e, por secção, o hash da
+entrada e o texto gerado. O dashboard lê este ficheiro em vez de chamar o LLM
+a cada visualização.
+
+Uso:
+    python generate_insights.py
+    python generate_insights.py --model llama-3.3-70b-versatile --force
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from data_digest import DEFAULT_TOKEN_BUDGET
+from data_store import DATASET_PATHS, file_hash, read_dataset
+from evaluate_models import RESULTS_PATH as ML_RESULTS_PATH
+
+INSIGHTS_PATH = os.path.join("artifacts", "llm_insights.json")
+
+
+def load_artifact(path=INSIGHTS_PATH):
+    """Artefacto de insights existente (ou None)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_summaries(token_budget=DEFAULT_TOKEN_BUDGET):
+    """Resumos de todas as secções, calculados como no dashboard"""
+    from analytics import build_customer_rollup
+    from llm_insights import build_section_summaries
+
+    df_restaurante = read_dataset(DATASET_PATHS["restaurante"])
+    df_hotel = read_dataset(DATASET_PATHS["hotel"])
+    df_clientes = read_dataset(DATASET_PATHS["clientes"])
+    ml_results = load_artifact(ML_RESULTS_PATH)
+    return build_section_summaries(df_restaurante, df_hotel,
+                                   build_customer_rollup(df_clientes, df_restaurante, df_hotel),
+                                   ml_results, token_budget)
+
+
+def run_generation(generator, summaries, model=None, force=False, output=INSIGHTS_PATH, token_budget=None):
+    """
+    Gera as secções em falta ou desatualizadas e escreve o artefacto. Devolve
+    (artefacto, {secção: erro}) — as secções que falharam ficam fora do artefacto.
+    """
+    previous = (load_artifact(output) or {}).get("sections", {})
+    sections, stale = {}, {}
+    for section, summary in summaries.items():
+        entry = previous.get(section)
+        unchanged = (entry is not None and entry["input_hash"] == generator.input_hash(section, summary)
+                     and model in (None, entry["model"]))
+        if unchanged and not force:
+            sections[section] = entry
+            print(f"⏭️  {section}: resumo inalterado")
+        else:
+            stale[section] = summary
+
+    errors = {}
+    if stale:
+        insights, elapsed_s = generator.generate_all(stale, model)
+        now = datetime.now().isoformat(timespec="seconds")
+        for section, insight in insights.items():
+            if isinstance(insight, Exception):
+                errors[section] = insight
+                print(f"❌ {section}: {insight}")
+                continue
+            sections[section] = {
+                "input_hash": generator.input_hash(section, stale[section]),
+                "model": insight.model,
+                "text": insight.text,
+                "prompt_tokens": insight.prompt_tokens,
+                "completion_tokens": insight.completion_tokens,
+                "latency_s": round(insight.latency_s, 3),
+                "cached": insight.cached,
+                "generated_at": now,
+            }
+            print(f"✅ {section}: {insight.model} ({'cache' if insight.cached else f'{insight.latency_s:.1f}s'})")
+        print(f"⚡ {len(stale)} secções em {elapsed_s:.1f}s")
+
+    artifact = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "data_versions": {path: file_hash(path) for path in list(DATASET_PATHS.values()) + [ML_RESULTS_PATH]
+                          if os.path.exists(path)},
+        "config": {"temperature": generator.temperature, "max_tokens": generator.max_tokens,
+                   "token_budget": token_budget},
+        "sections": {section: sections[section] for section in summaries if section in sections},
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output)
+    return artifact, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geração offline dos insights LLM")
+    parser.add_argument("--model", default=None, help="modelo Groq (default: escolhido pelo router por secção)")
+    parser.add_argument("--force", action="store_true", help="regenerar todas as secções")
+    parser.add_argument("--output", default=INSIGHTS_PATH, help="caminho do artefacto de insights")
+    args = parser.parse_args()
+
+    from llm_cache import ResponseCache
+    from llm_client import groq_settings
+    from llm_insights import build_insight_generator
+
+    settings = groq_settings()
+    if settings is None:
+        raise SystemExit("Defina GROQ_API_KEY no ficheiro .env")
+    summaries = load_summaries(settings.digest_max_tokens)
+    generator = build_insight_generator(settings, ResponseCache())
+    _, errors = run_generation(generator, summaries, args.model, args.force, args.output,
+                               settings.digest_max_tokens)
+    print(f"📄 Insights escritos em {args.output}")
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,103 @@
+"""
+Cache em disco das respostas do LLM
+
+Cada resposta é guardada num ficheiro JSON cujo nome é o hash SHA-256 do
+pedido (modelo, temperatura, template e resumo dos dados): o mesmo dashboard
+sobre os mesmos dados nunca paga uma segunda chamada. O tamanho total é
+limitado e os ficheiros menos usados recentemente são removidos primeiro
+(LRU pela data de modificação, atualizada em cada leitura).
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = ".llm_cache"
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+def request_key(**parts):
+    """Hash do conteúdo de um pedido (independente da ordem dos campos)"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Respostas do LLM endereçadas pelo conteúdo do pedido, com remoção LRU"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave → tamanho, do menos para o mais recente
+        self._total_bytes = 0
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _scan(self):
+        """Reconstrói o índice LRU a partir dos ficheiros existentes"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        found = []
+        for folder, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    stat = os.stat(os.path.join(folder, name))
+                    found.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key):
+        """Resposta guardada para a chave (ou None), marcando-a como usada"""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Guarda uma resposta (escrita atómica) e remove as menos usadas se necessário"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Entradas, tamanho em disco e taxa de acertos desde o arranque"""
+        lookups = self.hits + self.misses
+        return {
+            "entradas": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
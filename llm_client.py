@@ -0,0 +1,378 @@
+"""
+Cliente HTTP para a API de chat do Groq (compatível com OpenAI)
+
+O endpoint é configurável (`GROQ_BASE_URL`), o que permite apontar o
+dashboard para o servidor local de testes em `tools/groq_stub.py`.
+As respostas podem ser pedidas em streaming (server-sent events): o texto é
+mostrado à medida que chega e ficam registados, por modelo, o tempo até ao
+primeiro token (TTFT) e o débito em tokens/s.
+
+Todos os pedidos (completos ou em streaming, síncronos ou do `AsyncGroqClient`)
+passam pelo `GroqClient`, que aplica o limitador de ritmo global dimensionado
+para a quota da conta e repete com backoff aleatório os pedidos a que o Groq
+responde 429 (nos streams, antes do primeiro byte), dentro de um prazo total
+por pedido (`deadline_s`) que inclui as esperas do limitador e do backoff. O
+`AsyncGroqClient` envia vários pedidos em simultâneo, cada um numa thread
+(`asyncio.to_thread` sobre o pool de ligações do cliente síncrono).
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from metrics import LLM_REQUESTS, record_llm_request
+
+
+class LLMError(RuntimeError):
+    """Falha ao obter uma resposta do LLM (rede, autenticação, quota...)"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass
+class Completion:
+    """Resposta de um pedido de chat"""
+    text: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_s: float
+
+
+def groq_settings():
+    """
+    Configuração do Groq (`config.Settings`), ou None se a GROQ_API_KEY não
+    estiver definida e as funcionalidades LLM devem ficar desligadas.
+    """
+    from config import get_settings
+
+    settings = get_settings()
+    return settings if settings.llm_enabled else None
+
+
+class ChatStream:
+    """
+    Resposta em streaming: iterar devolve os fragmentos de texto à medida que
+    chegam. No fim ficam disponíveis o texto completo, o TTFT e os tokens/s.
+    """
+
+    def __init__(self, response, model, start, on_complete=None):
+        self.model = model
+        self.ttft_s = None
+        self.total_s = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._response = response
+        self._start = start
+        self._parts = []
+        self._on_complete = on_complete
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    @property
+    def tokens_per_s(self):
+        """Débito de geração (após o primeiro token)"""
+        if self.ttft_s is None or self.total_s is None or self.total_s <= self.ttft_s:
+            return 0.0
+        return self.completion_tokens / (self.total_s - self.ttft_s)
+
+    def __iter__(self):
+        import requests
+
+        # SSE sem charset seria decodificado como latin-1 pelo requests
+        self._response.encoding = "utf-8"
+        chunks = 0
+        done = False
+        try:
+            for line in self._response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    done = True
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError as e:
+                    LLM_REQUESTS.inc(model=self.model, status="resposta_invalida")
+                    raise LLMError(f"Evento inválido no streaming: {data[:200]}") from e
+                # O Groq envia a contagem de tokens no último evento (em `x_groq`)
+                usage = event.get("usage") or event.get("x_groq", {}).get("usage")
+                if usage:
+                    self.prompt_tokens = usage.get("prompt_tokens", 0)
+                    self.completion_tokens = usage.get("completion_tokens", 0)
+                choices = event.get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    if self.ttft_s is None:
+                        self.ttft_s = time.perf_counter() - self._start
+                    chunks += 1
+                    self._parts.append(delta)
+                    yield delta
+        except requests.RequestException as e:
+            LLM_REQUESTS.inc(model=self.model, status="stream_interrompido")
+            raise LLMError(f"Ligação interrompida durante o streaming: {e}") from e
+        finally:
+            self._response.close()
+        self.total_s = time.perf_counter() - self._start
+        if not done:
+            # Resposta cortada: não é registada como sucesso nem guardada na cache
+            LLM_REQUESTS.inc(model=self.model, status="stream_interrompido")
+            raise LLMError("O streaming terminou antes do fim da resposta ([DONE] em falta)")
+        if not self.completion_tokens:
+            # Sem usage no stream: cada evento traz aproximadamente um token
+            self.completion_tokens = chunks
+        record_llm_request(self.model, "stream", self.total_s, self.prompt_tokens, self.completion_tokens)
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+
+class StreamMetrics:
+    """TTFT e tokens/s dos últimos pedidos em streaming, por modelo"""
+
+    def __init__(self, window=200):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, stream):
+        """Regista as métricas de um stream terminado"""
+        if stream.ttft_s is None:
+            return
+        with self._lock:
+            self._samples[stream.model].append((stream.ttft_s, stream.tokens_per_s, stream.total_s))
+
+    def summary(self):
+        """Uma linha por modelo: nº de pedidos, TTFT p50/p95, tokens/s e tempo total p50"""
+        rows = []
+        with self._lock:
+            samples = {model: list(values) for model, values in self._samples.items()}
+        for model, values in samples.items():
+            ttft, tps, total = np.array(values).T
+            rows.append({
+                "modelo": model,
+                "pedidos": len(values),
+                "ttft_p50_s": float(np.percentile(ttft, 50)),
+                "ttft_p95_s": float(np.percentile(ttft, 95)),
+                "tokens_s_p50": float(np.percentile(tps, 50)),
+                "total_p50_s": float(np.percentile(total, 50)),
+            })
+        return rows
+
+
+class GroqClient:
+    """
+    Pedidos de chat completions ao Groq com uma sessão HTTP reutilizada, limitador
+    de ritmo partilhado e novas tentativas em caso de 429
+
+    `timeout` limita cada tentativa (ligação e leitura); `deadline_s` (por defeito
+    igual a `timeout`) limita o pedido inteiro, com as esperas do limitador e do
+    backoff entre tentativas.
+    """
+
+    def __init__(self, api_key, base_url, timeout=60, pool_size=4, rate_limiter=None, max_retries=4,
+                 backoff_base_s=0.5, backoff_max_s=20.0, deadline_s=None):
+        # requests só é carregado quando o LLM é usado (não pesa no arranque do dashboard)
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.deadline_s = timeout if deadline_s is None else deadline_s
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.retries = 0
+        self.session = requests.Session()
+        # Pool limitado: pedidos acima de `pool_size` esperam por uma ligação livre
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def backoff(self, attempt, retry_after=None):
+        """Espera antes da tentativa seguinte: Retry-After do servidor ou backoff exponencial com jitter"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base_s)
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+
+    def _post(self, payload, stream=False):
+        """
+        Envia o pedido respeitando o limitador de ritmo e repete-o em caso de 429,
+        sem passar de `deadline_s` no total (LLMError com status 429 se a quota
+        não chegar a tempo)
+        """
+        deadline = time.monotonic() + self.deadline_s
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None and not self.rate_limiter.wait(deadline - time.monotonic()):
+                self._deadline_exceeded(payload)
+            remaining = max(deadline - time.monotonic(), 0.001)
+            try:
+                return self._post_once(payload, stream, min(self.timeout, remaining))
+            except LLMError as e:
+                if e.status != 429 or attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e.retry_after)
+                if time.monotonic() + delay >= deadline:
+                    self._deadline_exceeded(payload, e)
+                self.retries += 1
+                time.sleep(delay)
+
+    def _deadline_exceeded(self, payload, cause=None):
+        LLM_REQUESTS.inc(model=payload["model"], status="prazo_excedido")
+        raise LLMError(f"Sem quota do Groq dentro do prazo de {self.deadline_s:g}s", status=429,
+                       retry_after=getattr(cause, "retry_after", None)) from cause
+
+    def _post_once(self, payload, stream, timeout):
+        import requests
+
+        try:
+            response = self.session.post(f"{self.base_url}/chat/completions",
+                                         json=payload, timeout=timeout, stream=stream)
+        except requests.RequestException as e:
+            LLM_REQUESTS.inc(model=payload["model"], status="ligacao")
+            raise LLMError(f"Erro de ligação ao Groq: {e}") from e
+        if response.status_code != 200:
+            LLM_REQUESTS.inc(model=payload["model"], status=str(response.status_code))
+            retry_after = response.headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            text = response.text[:200]
+            response.close()
+            raise LLMError(f"Groq respondeu {response.status_code}: {text}",
+                           status=response.status_code, retry_after=retry_after)
+        return response
+
+    def chat(self, messages, model, temperature, max_tokens):
+        """Envia as mensagens ao modelo e devolve a resposta completa"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        start = time.perf_counter()
+        response = self._post(payload)
+        latency_s = time.perf_counter() - start
+
+        # Corpo malformado ou sem `choices` é uma falha do LLM, não um erro do dashboard
+        try:
+            body = response.json()
+            usage = body.get("usage") or {}
+            completion = Completion(
+                text=body["choices"][0]["message"]["content"],
+                model=body.get("model", model),
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                latency_s=latency_s,
+            )
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            LLM_REQUESTS.inc(model=model, status="resposta_invalida")
+            raise LLMError(f"Resposta inválida do Groq ({type(e).__name__}): {response.text[:200]}") from e
+        record_llm_request(model, "chat", latency_s, completion.prompt_tokens, completion.completion_tokens)
+        return completion
+
+    def stream_chat(self, messages, model, temperature, max_tokens, on_complete=None):
+        """Pede a resposta em streaming (SSE); `on_complete(stream)` é chamado no fim"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        start = time.perf_counter()
+        return ChatStream(self._post(payload, stream=True), model, start, on_complete)
+
+
+class RateLimiter:
+    """
+    Token bucket partilhado entre threads (todas as sessões): no máximo
+    `requests_per_minute` pedidos por minuto, com rajadas até `burst`.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, requests_per_minute // 10)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Reserva um pedido e devolve quantos segundos é preciso esperar por ele"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def wait(self, timeout=None):
+        """
+        Bloqueia a thread até haver quota para mais um pedido; se a espera passar
+        de `timeout` devolve logo False e a reserva é anulada
+        """
+        wait = self.reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self._tokens += 1
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+class AsyncGroqClient:
+    """
+    Pedidos concorrentes ao Groq com limite de concorrência; o ritmo, as novas
+    tentativas e o prazo ficam a cargo do `GroqClient` (partilhados com os pedidos
+    síncronos)
+
+    Não é I/O assíncrono nativo: cada pedido corre o `GroqClient.chat` bloqueante
+    numa thread do executor (`asyncio.to_thread`). Uma tarefa cancelada não
+    interrompe a thread, por isso o tempo de cada pedido é limitado pelo
+    `deadline_s` do cliente e não por `asyncio.wait_for`.
+    """
+
+    def __init__(self, client, max_concurrency=4):
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+    @property
+    def retries(self):
+        """Novas tentativas após 429 (contador do cliente síncrono)"""
+        return self.client.retries
+
+    async def chat(self, messages, model, temperature, max_tokens, semaphore=None):
+        """Como `GroqClient.chat`, sem bloquear o event loop"""
+        if semaphore is None:
+            return await asyncio.to_thread(self.client.chat, messages, model, temperature, max_tokens)
+        async with semaphore:
+            return await asyncio.to_thread(self.client.chat, messages, model, temperature, max_tokens)
+
+    async def chat_many(self, requests_, model, temperature, max_tokens):
+        """
+        Envia todos os pedidos (lista de mensagens) em simultâneo, para o mesmo
+        modelo ou para uma lista de modelos (um por pedido). Devolve as respostas
+        pela mesma ordem; falhas aparecem como exceções na lista.
+        """
+        models = model if isinstance(model, (list, tuple)) else [model] * len(requests_)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(
+            *(self.chat(messages, name, temperature, max_tokens, semaphore)
+              for messages, name in zip(requests_, models)),
+            return_exceptions=True)
@@ -0,0 +1,365 @@
+"""
+Insights gerados por LLM a partir de resumos compactos dos dados
+
+Cada secção da página "Insights LLM" tem um template de prompt. O prompt
+recebe um resumo estatístico curto, com um orçamento de tokens (nunca linhas
+em bruto nem o `describe()` completo; ver `data_digest`), e a resposta é
+guardada na cache em disco, endereçada pelo modelo, temperatura, template e
+resumo. Com os mesmos dados o dashboard reutiliza a resposta sem chamar o Groq.
+As secções são independentes: `generate_all` pede-as todas em simultâneo, pelo
+que o tempo total é o da secção mais lenta e não a soma. Sem modelo escolhido,
+cada secção é encaminhada pelo `ModelRouter` conforme o seu tipo de pedido
+(interativo ou relatório), passando ao modelo seguinte da rota se falhar.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+
+from data_digest import (DEFAULT_TOKEN_BUDGET, DigestBlock, correlation_block, fit_to_budget,
+                         rollup_block, segment_block, spend_block, trend_block)
+from llm_cache import request_key
+from llm_client import AsyncGroqClient, GroqClient, LLMError, RateLimiter, StreamMetrics
+from llm_router import ModelRouter
+
+SYSTEM_PROMPT = (
+    "És um analista de dados sénior de um grupo de hotelaria e restauração. "
+    "Responde em português de Portugal, em markdown, com secções curtas e bullet points. "
+    "Usa apenas os números do resumo fornecido; não inventes valores."
+)
+
+
+@dataclass(frozen=True)
+class InsightSection:
+    """Secção de insights: título da tab, template do prompt e tipo de pedido (rota do router)"""
+    title: str
+    template: str
+    request_type: str = "relatorio"
+
+
+INSIGHT_SECTIONS = {
+    "resumo": InsightSection(
+        "📊 Resumo Estatístico",
+        "Resume as principais métricas e tendências destes dados em 5-8 bullet points, "
+        "destacando valores atípicos.\n\nDados:\n{summary}",
+        request_type="interativo",
+    ),
+    "ml": InsightSection(
+        "🤖 Interpretação ML",
+        "Interpreta os resultados de avaliação destes modelos de Machine Learning para um "
+        "gestor não técnico: que modelo usar em cada tarefa, se as métricas são credíveis "
+        "e o custo de previsão.\n\nResultados:\n{summary}",
+    ),
+    "negocio": InsightSection(
+        "💼 Insights de Negócio",
+        "Identifica oportunidades de receita e propõe 3-5 estratégias concretas, "
+        "justificadas pelos segmentos abaixo.\n\nDados:\n{summary}",
+    ),
+    "cruzada": InsightSection(
+        "🔄 Análise Cruzada",
+        "Analisa a relação entre clientes do restaurante e do hotel e sugere ações de "
+        "cross-selling.\n\nDados:\n{summary}",
+    ),
+}
+
+
+# Perguntas livres ("pergunte aos dados"): respostas curtas, encaminhadas como pedidos interativos
+QA_TEMPLATE = (
+    "Responde à pergunta do gestor de forma direta (no máximo 5 bullet points), usando apenas "
+    "os dados abaixo. Se os dados não chegarem para responder, diz isso.\n\n"
+    "Pergunta: {question}\n\nDados:\n{summary}"
+)
+QA_REQUEST_TYPE = "interativo"
+
+
+@dataclass
+class Answer:
+    """Resposta a uma pergunta livre e a sua origem (cache semântica ou LLM)"""
+    question: str
+    text: str
+    model: str
+    cached: bool
+    latency_s: float = 0.0
+    similarity: float = 1.0
+    matched_question: str = ""
+
+
+@dataclass
+class Insight:
+    """Texto gerado para uma secção e a sua origem"""
+    section: str
+    text: str
+    model: str
+    cached: bool
+    latency_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+# --- Resumos dos dados -----------------------------------------------------------
+
+def build_section_summaries(df_restaurante, df_hotel, df_rollup, ml_results,
+                            token_budget=DEFAULT_TOKEN_BUDGET):
+    """Resumos compactos (texto) enviados a cada secção, cada um com no máximo `token_budget` tokens"""
+    businesses = (("Restaurante", df_restaurante), ("Hotel", df_hotel))
+    resumo = [spend_block(df, name) for name, df in businesses]
+    resumo += [trend_block(df, name) for name, df in businesses]
+    resumo += [correlation_block(df, name) for name, df in businesses]
+    negocio = [segment_block(df, name) for name, df in businesses]
+
+    ml = DigestBlock("Avaliação dos modelos")
+    if ml_results:
+        for business, by_task in ml_results["results"].items():
+            for task, models in by_task.items():
+                scores = "; ".join(
+                    f"{model}: " + ", ".join(f"{metric}={value:.3f}" for metric, value in metrics.items()
+                                             if metric not in ("n_treino", "n_teste"))
+                    for model, metrics in models.items())
+                ml.lines.append(f"{business} · {task} → {scores}")
+
+    return {
+        "resumo": fit_to_budget(resumo, token_budget),
+        "ml": fit_to_budget([ml], token_budget) or "Sem resultados de avaliação disponíveis.",
+        "negocio": fit_to_budget(negocio, token_budget),
+        "cruzada": fit_to_budget([rollup_block(df_rollup)], token_budget) or "Sem tabela agregada de clientes.",
+    }
+
+
+# --- Geração com cache -----------------------------------------------------------
+
+class InsightGenerator:
+    """Gera insights por secção, reutilizando respostas em cache para o mesmo pedido"""
+
+    def __init__(self, cache, client=None, temperature=0.1, max_tokens=2048, async_client=None,
+                 router=None):
+        self.cache = cache
+        self.client = client
+        self.async_client = async_client
+        self.router = router
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.metrics = StreamMetrics()
+
+    def messages(self, section, summary):
+        """Mensagens de chat para uma secção"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": INSIGHT_SECTIONS[section].template.format(summary=summary)},
+        ]
+
+    def input_hash(self, section, summary):
+        """Hash da entrada de uma secção (parâmetros de geração, template e resumo), sem o modelo"""
+        return request_key(temperature=self.temperature, max_tokens=self.max_tokens,
+                           system=SYSTEM_PROMPT, template=INSIGHT_SECTIONS[section].template,
+                           summary=summary)
+
+    def cache_key(self, section, summary, model):
+        """Chave do pedido: modelo, parâmetros de geração, template e resumo"""
+        return request_key(model=model, temperature=self.temperature, max_tokens=self.max_tokens,
+                           system=SYSTEM_PROMPT, template=INSIGHT_SECTIONS[section].template,
+                           summary=summary)
+
+    def cached(self, section, summary, model):
+        """Insight já gerado para estes dados (ou None), sem chamar o LLM"""
+        hit = self.cache.get(self.cache_key(section, summary, model))
+        if hit is None:
+            return None
+        return Insight(section, hit["text"], hit["model"], cached=True,
+                       prompt_tokens=hit.get("prompt_tokens", 0),
+                       completion_tokens=hit.get("completion_tokens", 0))
+
+    def _store(self, section, summary, model, completion):
+        self.cache.put(self.cache_key(section, summary, model), {
+            "section": section,
+            "model": completion.model,
+            "text": completion.text,
+            "prompt_tokens": completion.prompt_tokens,
+            "completion_tokens": completion.completion_tokens,
+        })
+
+    def stream(self, section, summary, model, on_complete=None):
+        """
+        Gera o insight em streaming (iterar devolve fragmentos de texto). No fim
+        a resposta é guardada na cache e o TTFT/tokens/s ficam registados.
+        """
+        if self.client is None:
+            raise LLMError("LLM não configurado: defina GROQ_API_KEY no ficheiro .env")
+
+        def finished(stream):
+            self.metrics.record(stream)
+            if self.router is not None:
+                self.router.record_stream(stream)
+            self._store(section, summary, model, stream)
+            if on_complete is not None:
+                on_complete(stream)
+
+        return self.client.stream_chat(self.messages(section, summary), model,
+                                       self.temperature, self.max_tokens, finished)
+
+    def _record_failure(self, model, latency_s, error):
+        """
+        Regista no router a falha de um modelo. Um 429 que persiste depois das novas
+        tentativas é falta de quota da conta, não avaria do modelo: não o afasta da rota.
+        """
+        if getattr(error, "status", None) != 429:
+            self.router.record(model, latency_s, ok=False)
+
+    def chat_routed(self, messages, request_type):
+        """Pedido de chat no modelo escolhido pelo router, passando ao seguinte se falhar"""
+        failed = []
+        while True:
+            model = self.router.choose(request_type, exclude=failed)
+            if model in failed:
+                raise LLMError(f"Todos os modelos da rota '{request_type}' falharam: {error}")
+            start = time.perf_counter()
+            try:
+                completion = self.client.chat(messages, model, self.temperature, self.max_tokens)
+            except LLMError as e:
+                self._record_failure(model, time.perf_counter() - start, e)
+                failed.append(model)
+                error = e
+                continue
+            self.router.record(model, completion.latency_s, ok=True)
+            return completion
+
+    def complete(self, messages, model=None, request_type=QA_REQUEST_TYPE):
+        """Pedido de chat no modelo indicado ou, sem modelo, no escolhido pelo router"""
+        if self.client is None:
+            raise LLMError("LLM não configurado: defina GROQ_API_KEY no ficheiro .env")
+        if model:
+            return self.client.chat(messages, model, self.temperature, self.max_tokens)
+        return self.chat_routed(messages, request_type)
+
+    def ask(self, question, context, semantic_cache, model=None):
+        """
+        Responde a uma pergunta livre sobre os dados (`context`). Perguntas
+        semelhantes já respondidas para os mesmos dados vêm da cache semântica.
+        """
+        context_key = request_key(system=SYSTEM_PROMPT, template=QA_TEMPLATE, summary=context)
+        start = time.perf_counter()
+        hit = semantic_cache.lookup(question, context_key)
+        if hit is not None:
+            return Answer(question, hit.entry.answer, hit.entry.model, cached=True,
+                          latency_s=time.perf_counter() - start, similarity=hit.similarity,
+                          matched_question=hit.entry.question)
+
+        completion = self.complete([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": QA_TEMPLATE.format(question=question, summary=context)},
+        ], model)
+        semantic_cache.put(question, context_key, completion.text, completion.model, completion.latency_s)
+        return Answer(question, completion.text, completion.model, cached=False,
+                      latency_s=completion.latency_s)
+
+    def cached_routed(self, section, summary):
+        """Insight em cache gerado por qualquer modelo da rota da secção (ou None)"""
+        for model in self.router.candidates(INSIGHT_SECTIONS[section].request_type):
+            insight = self.cached(section, summary, model)
+            if insight is not None:
+                return insight
+        return None
+
+    def stream_routed(self, section, summary):
+        """Como `stream`, com o modelo escolhido pelo router e failover se o pedido falhar"""
+        request_type = INSIGHT_SECTIONS[section].request_type
+        failed = []
+        while True:
+            model = self.router.choose(request_type, exclude=failed)
+            if model in failed:
+                raise LLMError(f"Todos os modelos da rota '{request_type}' falharam: {error}")
+            start = time.perf_counter()
+            try:
+                return self.stream(section, summary, model)
+            except LLMError as e:
+                self._record_failure(model, time.perf_counter() - start, e)
+                failed.append(model)
+                error = e
+
+    def generate(self, section, summary, model):
+        """Insight da cache ou, se não existir, gerado pelo LLM e guardado"""
+        insight = self.cached(section, summary, model)
+        if insight is not None:
+            return insight
+        if self.client is None:
+            raise LLMError("LLM não configurado: defina GROQ_API_KEY no ficheiro .env")
+
+        completion = self.client.chat(self.messages(section, summary), model,
+                                      self.temperature, self.max_tokens)
+        self._store(section, summary, model, completion)
+        return Insight(section, completion.text, completion.model, cached=False,
+                       latency_s=completion.latency_s,
+                       prompt_tokens=completion.prompt_tokens,
+                       completion_tokens=completion.completion_tokens)
+
+    async def _generate_missing(self, missing, models):
+        completions = await self.async_client.chat_many(
+            [self.messages(section, summary) for section, summary in missing.items()],
+            [models[section] for section in missing], self.temperature, self.max_tokens)
+        insights = {}
+        for (section, summary), completion in zip(missing.items(), completions):
+            if isinstance(completion, BaseException):
+                insights[section] = completion
+                continue
+            self._store(section, summary, models[section], completion)
+            insights[section] = Insight(section, completion.text, completion.model, cached=False,
+                                        latency_s=completion.latency_s,
+                                        prompt_tokens=completion.prompt_tokens,
+                                        completion_tokens=completion.completion_tokens)
+        return insights
+
+    def generate_all(self, summaries, model=None):
+        """
+        Insights de todas as secções ({secção: resumo}): as que não estão em cache
+        são pedidas em simultâneo. Sem `model`, cada secção usa o modelo escolhido
+        pelo router e as que falham são repetidas no modelo seguinte da rota.
+        Devolve ({secção: Insight ou exceção}, segundos); uma secção falhada não
+        impede as restantes.
+        """
+        if self.async_client is None or (model is None and self.router is None):
+            raise LLMError("LLM não configurado: defina GROQ_API_KEY no ficheiro .env")
+        start = time.perf_counter()
+        insights, missing = {}, {}
+        for section, summary in summaries.items():
+            insight = self.cached(section, summary, model) if model else self.cached_routed(section, summary)
+            if insight is None:
+                missing[section] = summary
+            else:
+                insights[section] = insight
+
+        failed = {section: [] for section in missing}
+        while missing:
+            models = {section: model or self.router.choose(INSIGHT_SECTIONS[section].request_type,
+                                                           exclude=failed[section])
+                      for section in missing}
+            results = asyncio.run(self._generate_missing(missing, models))
+            retry = {}
+            for section, result in results.items():
+                insights[section] = result
+                ok = not isinstance(result, BaseException)
+                if self.router is not None:
+                    if ok:
+                        self.router.record(models[section], result.latency_s, ok=True)
+                    else:
+                        self._record_failure(models[section], 0.0, result)
+                if not ok and model is None:
+                    failed[section].append(models[section])
+                    if len(failed[section]) < len(self.router.routes[INSIGHT_SECTIONS[section].request_type]):
+                        retry[section] = missing[section]
+            missing = retry
+        return {section: insights[section] for section in summaries}, time.perf_counter() - start
+
+
+def build_insight_generator(settings, cache):
+    """
+    Gerador ligado ao Groq conforme `config.Settings` (cliente com pool de
+    ligações, limitador de ritmo global e router), ou sem LLM se `settings` for None
+    """
+    if settings is None:
+        return InsightGenerator(cache)
+    # O limitador fica no cliente síncrono: streaming, perguntas, consultas e fan-out partilham a quota
+    client = GroqClient(settings.api_key, settings.base_url,
+                        timeout=settings.timeout_s, pool_size=settings.max_concurrency,
+                        rate_limiter=RateLimiter(settings.requests_per_minute, burst=settings.max_concurrency))
+    async_client = AsyncGroqClient(client, settings.max_concurrency)
+    router = ModelRouter(settings.routes, settings.latency_slo_s)
+    return InsightGenerator(cache, client, settings.temperature, settings.max_tokens,
+                            async_client, router)
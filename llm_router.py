@@ -0,0 +1,145 @@
+"""
+Escolha do modelo Groq por tipo de pedido, com base na latência e nos erros medidos
+
+Cada tipo de pedido tem uma rota (modelos por ordem de preferência): pedidos
+interativos vão primeiro para modelos rápidos e relatórios longos para os
+maiores. O router guarda a latência e o resultado dos últimos pedidos de cada
+modelo; um modelo que falha repetidamente fica fora de serviço durante um
+período (`cooldown_s`) e um modelo cujo p95 ultrapassa o limite do tipo de
+pedido passa para o fim da rota. Cada decisão fica registada para o painel
+de instrumentação.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class RouteDecision:
+    """Modelo escolhido para um pedido e porquê"""
+    timestamp: float
+    request_type: str
+    model: str
+    reason: str
+
+
+class ModelHealth:
+    """Latência e resultado dos últimos pedidos de um modelo"""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)  # (latência em s, sucesso)
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+
+    def latency_percentile(self, q):
+        latencies = [latency for latency, ok in self.samples if ok]
+        return float(np.percentile(latencies, q)) if latencies else None
+
+    @property
+    def error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(not ok for _, ok in self.samples) / len(self.samples)
+
+
+class ModelRouter:
+    """Encaminha pedidos para o primeiro modelo saudável da rota do seu tipo"""
+
+    def __init__(self, routes, latency_slo_s=None, window=50, min_samples=5,
+                 max_error_rate=0.25, max_consecutive_failures=2, cooldown_s=60.0, history=100):
+        self.routes = routes
+        self.latency_slo_s = latency_slo_s or {}
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown_s = cooldown_s
+        self._health = {model: ModelHealth(window) for route in routes.values() for model in route}
+        self._decisions = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def _status(self, model, request_type, now):
+        """(disponível, motivo) de um modelo para um tipo de pedido"""
+        health = self._health[model]
+        if health.degraded_until > now:
+            return False, f"fora de serviço ({health.error_rate:.0%} de erros)"
+        slo = self.latency_slo_s.get(request_type)
+        p95 = health.latency_percentile(95)
+        if slo and p95 is not None and len(health.samples) >= self.min_samples and p95 > slo:
+            return False, f"lento (p95 {p95:.1f}s > {slo:g}s)"
+        return True, "saudável"
+
+    def candidates(self, request_type):
+        """Modelos da rota pela ordem a tentar: saudáveis primeiro, degradados no fim"""
+        now = time.monotonic()
+        with self._lock:
+            route = self.routes[request_type]
+            available = [model for model in route if self._status(model, request_type, now)[0]]
+            return available + [model for model in route if model not in available]
+
+    def choose(self, request_type, exclude=()):
+        """Modelo para um pedido (o primeiro disponível fora de `exclude`), com a decisão registada"""
+        now = time.monotonic()
+        with self._lock:
+            route = self.routes[request_type]
+            skipped = []
+            for model in route:
+                if model in exclude:
+                    skipped.append(f"{model}: falhou neste pedido")
+                    continue
+                ok, reason = self._status(model, request_type, now)
+                if ok:
+                    break
+                skipped.append(f"{model}: {reason}")
+            else:
+                # Nenhum modelo disponível: usar o de menor taxa de erros
+                model = min([m for m in route if m not in exclude] or route,
+                            key=lambda m: self._health[m].error_rate)
+                skipped.append("nenhum modelo saudável")
+            reason = "preferido" if not skipped else "failover (" + "; ".join(skipped) + ")"
+            self._decisions.append(RouteDecision(time.time(), request_type, model, reason))
+            return model
+
+    def record(self, model, latency_s, ok):
+        """Regista o resultado de um pedido; falhas repetidas põem o modelo fora de serviço"""
+        with self._lock:
+            health = self._health.get(model)
+            if health is None:
+                return
+            health.samples.append((latency_s, ok))
+            if ok:
+                health.consecutive_failures = 0
+                return
+            health.consecutive_failures += 1
+            too_many_errors = (len(health.samples) >= self.min_samples
+                               and health.error_rate >= self.max_error_rate)
+            if health.consecutive_failures >= self.max_consecutive_failures or too_many_errors:
+                health.degraded_until = time.monotonic() + self.cooldown_s
+
+    def record_stream(self, stream):
+        """Regista um pedido em streaming terminado (latência total)"""
+        self.record(stream.model, stream.total_s, ok=True)
+
+    def summary(self):
+        """Uma linha por modelo: pedidos, latência p50/p95, taxa de erros e estado"""
+        now = time.monotonic()
+        rows = []
+        with self._lock:
+            for model, health in self._health.items():
+                degraded = health.degraded_until > now
+                rows.append({
+                    "modelo": model,
+                    "pedidos": len(health.samples),
+                    "latencia_p50_s": health.latency_percentile(50),
+                    "latencia_p95_s": health.latency_percentile(95),
+                    "taxa_erros": health.error_rate,
+                    "estado": "fora de serviço" if degraded else "ativo",
+                })
+        return rows
+
+    def decisions(self):
+        """Últimas decisões de encaminhamento (mais recentes primeiro)"""
+        with self._lock:
+            return list(reversed(self._decisions))
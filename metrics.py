@@ -0,0 +1,242 @@
+"""
+Métricas de produção do dashboard no formato de texto do Prometheus
+
+Registo partilhado pelo processo (todas as sessões) com contadores e
+histogramas: duração de cada secção por rerun, hits/misses das funções com
+cache do Streamlit, latência e linhas das previsões dos modelos ML, e
+latência, resultado e tokens dos pedidos ao LLM. As métricas podem ser lidas
+num endpoint HTTP local (`METRICS_PORT`, em `/metrics`; só em 127.0.0.1, salvo
+se `METRICS_HOST` indicar outro endereço) ou escritas num ficheiro
+(`METRICS_TEXTFILE`, para o textfile collector do node_exporter), sem ser
+preciso ligar um profiler a um pod em produção. Estas duas opções vêm
+só das variáveis de ambiente (não obrigam a ler segredos nem o `.env`).
+"""
+import bisect
+import functools
+import math
+import os
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# O endpoint não tem autenticação: por omissão só aceita ligações locais
+DEFAULT_METRICS_HOST = "127.0.0.1"
+# Limites (segundos) dos histogramas de latência: de reruns rápidos a relatórios LLM longos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotónico por combinação de labels"""
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Distribuição de valores (p.ex. latências) em buckets cumulativos, por combinação de labels"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [contagem por bucket (+Inf no fim), soma]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        entry = self._values.get(tuple(labels[name] for name in self.labelnames))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas do processo, exportável no formato de texto do Prometheus"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrica {name} já registada como {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self):
+        """Todas as métricas no formato de texto do Prometheus (0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Escreve as métricas num ficheiro (escrita atómica, para leitura por outro processo)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+RERUN_SECONDS = REGISTRY.histogram(
+    "dashboard_section_rerun_seconds", "Tempo de cálculo de cada secção do dashboard por rerun", ["section"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "dashboard_cache_requests_total", "Chamadas a funções com cache do Streamlit, por resultado (hit/miss)",
+    ["function", "result"])
+MODEL_INFERENCE_SECONDS = REGISTRY.histogram(
+    "model_inference_seconds", "Latência das previsões dos modelos ML (por chamada)", ["model"])
+MODEL_INFERENCE_ROWS = REGISTRY.counter(
+    "model_inference_rows_total", "Linhas (reservas) previstas pelos modelos ML", ["model"])
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "Latência dos pedidos ao LLM (resposta completa)", ["model", "mode"])
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total", "Pedidos ao LLM por resultado (ok ou código/tipo de erro)", ["model", "status"])
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens dos pedidos ao LLM (prompt/completion)", ["model", "kind"])
+
+
+def exporter_options():
+    """
+    (endereço e porta do endpoint /metrics, ficheiro de texto) configurados no
+    ambiente; porta ou ficheiro None = desligado
+    """
+    port = os.getenv("METRICS_PORT")
+    host = os.getenv("METRICS_HOST") or DEFAULT_METRICS_HOST
+    return host, (int(port) if port else None), (os.getenv("METRICS_TEXTFILE") or None)
+
+
+def record_llm_request(model, mode, latency_s, prompt_tokens, completion_tokens):
+    """Regista um pedido ao LLM terminado com sucesso"""
+    LLM_REQUEST_SECONDS.observe(latency_s, model=model, mode=mode)
+    LLM_REQUESTS.inc(model=model, status="ok")
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+
+
+_cache_state = threading.local()
+
+
+def metered_cache(cache):
+    """
+    Aplica um decorador de cache do Streamlit (`st.cache_data`/`st.cache_resource`)
+    e conta hits e misses: é miss quando o corpo da função chega a ser executado.
+    """
+    def decorate(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            misses = getattr(_cache_state, "misses", None)
+            if misses is not None:
+                misses[name] = misses.get(name, 0) + 1
+            return func(*args, **kwargs)
+
+        cached = cache(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not hasattr(_cache_state, "misses"):
+                _cache_state.misses = {}
+            misses = _cache_state.misses
+            before = misses.get(name, 0)
+            result = cached(*args, **kwargs)
+            CACHE_REQUESTS.inc(function=name, result="miss" if misses.get(name, 0) > before else "hit")
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+
+def start_http_server(port, host=DEFAULT_METRICS_HOST, registry=REGISTRY):
+    """Serve `/metrics` numa thread em background e devolve o servidor"""
+    # http.server só é carregado quando o endpoint está ligado (não pesa no arranque)
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    return server
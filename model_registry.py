@@ -0,0 +1,244 @@
+"""
+Registo de modelos ML persistidos em disco
+
+Os pipelines de previsão (StandardScaler + RandomForestRegressor) são treinados
+uma única vez, versionados pelo hash SHA-256 do CSV de treino e guardados em
+`models/`. As previsões apenas carregam o pipeline e fazem o scoring.
+Quando o CSV de treino muda, o modelo anterior continua a servir pedidos
+enquanto a nova versão é treinada em background.
+
+Uso em linha de comandos (pré-treinar todos os modelos, p.ex. no deploy):
+    python model_registry.py
+"""
+import glob
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from data_store import file_hash
+from metrics import MODEL_INFERENCE_ROWS, MODEL_INFERENCE_SECONDS
+
+MODELS_DIR = "models"
+
+# Formato dos artefactos (incrementar quando o treino muda de forma incompatível)
+ARTIFACT_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Definição de um modelo: dataset de treino, variável alvo e colunas excluídas"""
+    name: str
+    csv_path: str
+    target: str
+    exclude: tuple = ()
+    n_estimators: int = 100
+    random_state: int = 42
+
+
+MODEL_SPECS = {
+    # Gastos extras do hotel (o valor do quarto é calculado por regras de negócio)
+    "hotel_extras": ModelSpec(
+        name="hotel_extras",
+        csv_path=os.path.join("Datasets_ML", "hotel_ml.csv"),
+        target="gasto_extras_total",
+        exclude=("gasto_extras_total", "gasto_quarto_total", "preco_quarto_noite",
+                 "consumo_minibar", "consumo_bar_hotel", "gasto_spa"),
+    ),
+    # Gasto total previsto do restaurante
+    "restaurante_gasto": ModelSpec(
+        name="restaurante_gasto",
+        csv_path=os.path.join("Datasets_ML", "restaurante_ml.csv"),
+        target="gasto_total_previsto",
+        exclude=("gasto_total_previsto", "preco_medio_pessoa", "rating_geral"),
+    ),
+}
+
+
+@dataclass
+class TrainedModel:
+    """Pipeline treinado com a ordem das colunas usada no treino"""
+    name: str
+    version: str
+    features: list
+    pipeline: object
+
+    def predict(self, X):
+        """
+        Faz previsões a partir de uma matriz pela ordem de `features` (ver
+        `feature_encoder`) ou de um DataFrame, reordenado para as colunas do treino.
+        """
+        start = time.perf_counter()
+        if isinstance(X, pd.DataFrame):
+            X = X.reindex(columns=self.features, fill_value=0).to_numpy(dtype="float64")
+        predictions = self.pipeline.predict(X)
+        MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start, model=self.name)
+        MODEL_INFERENCE_ROWS.inc(len(predictions), model=self.name)
+        return predictions
+
+
+def train_model(spec):
+    """Treina o pipeline definido em `spec` a partir do CSV de treino"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    df_ml = pd.read_csv(spec.csv_path)
+    features = [col for col in df_ml.columns if col not in spec.exclude]
+
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("model", RandomForestRegressor(n_estimators=spec.n_estimators,
+                                        random_state=spec.random_state)),
+    ])
+    # Treino sobre a matriz NumPy: a ordem das colunas fica guardada em `features`
+    pipeline.fit(df_ml[features].to_numpy(dtype="float64"), df_ml[spec.target])
+    return features, pipeline
+
+
+class ModelRegistry:
+    """Treina, versiona e serve os modelos definidos em MODEL_SPECS"""
+
+    def __init__(self, specs=None, models_dir=MODELS_DIR):
+        self.specs = specs or MODEL_SPECS
+        self.models_dir = models_dir
+        self._lock = threading.Lock()
+        self._loaded = {}
+        self._training = set()
+        self._train_locks = {}
+        self._hashes = {}
+
+    def get(self, name):
+        """Devolve o modelo pronto a usar, treinando-o apenas se necessário"""
+        spec = self.specs[name]
+        version = self.data_version(spec.csv_path)
+
+        current = self._loaded.get(name)
+        if current is not None and current.version == version:
+            return current
+
+        model = self._load(spec, version)
+        if model is not None:
+            self._loaded[name] = model
+            return model
+
+        # Dados mudaram: servir o modelo anterior e treinar a nova versão em background
+        stale = current or self._load_latest(spec)
+        if stale is not None:
+            self._loaded[name] = stale
+            self.retrain_async(name)
+            return stale
+
+        # Primeira execução: não há nenhum modelo, treinar de forma síncrona
+        return self._train_and_save(spec, version)
+
+    def data_version(self, csv_path):
+        """Hash do CSV de treino, recalculado apenas quando o ficheiro muda"""
+        stat = os.stat(csv_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(csv_path)
+        if cached is None or cached[0] != key:
+            cached = (key, file_hash(csv_path))
+            self._hashes[csv_path] = cached
+        return cached[1]
+
+    def retrain_async(self, name):
+        """Treina a versão atual do modelo numa thread em background"""
+        with self._lock:
+            if name in self._training:
+                return
+            self._training.add(name)
+
+        def _worker():
+            try:
+                spec = self.specs[name]
+                self._train_and_save(spec, self.data_version(spec.csv_path))
+            finally:
+                with self._lock:
+                    self._training.discard(name)
+
+        threading.Thread(target=_worker, name=f"retrain-{name}", daemon=True).start()
+
+    def is_training(self, name):
+        """Indica se o modelo está a ser re-treinado em background"""
+        return name in self._training
+
+    def _artifact_path(self, name, version):
+        return os.path.join(self.models_dir, f"{name}-v{ARTIFACT_FORMAT}-{version[:16]}.joblib")
+
+    def _load(self, spec, version):
+        import joblib
+
+        path = self._artifact_path(spec.name, version)
+        if not os.path.exists(path):
+            return None
+        return TrainedModel(**joblib.load(path))
+
+    def _load_latest(self, spec):
+        import joblib
+
+        paths = glob.glob(os.path.join(self.models_dir, f"{spec.name}-v{ARTIFACT_FORMAT}-*.joblib"))
+        if not paths:
+            return None
+        return TrainedModel(**joblib.load(max(paths, key=os.path.getmtime)))
+
+    def _train_lock(self, name):
+        with self._lock:
+            return self._train_locks.setdefault(name, threading.Lock())
+
+    def _train_and_save(self, spec, version):
+        import joblib
+
+        # Um treino de cada vez por modelo: sessões que chegam ao mesmo tempo
+        # esperam e reutilizam o artefacto guardado pela primeira
+        with self._train_lock(spec.name):
+            model = self._load(spec, version)
+            if model is not None:
+                self._loaded[spec.name] = model
+                return model
+
+            features, pipeline = train_model(spec)
+            model = TrainedModel(spec.name, version, features, pipeline)
+
+            # Escrita atómica (ficheiro temporário único) para que outros processos nunca
+            # leiam um ficheiro parcial. Guarda-se um dict simples para o artefacto não
+            # depender do módulo __main__.
+            os.makedirs(self.models_dir, exist_ok=True)
+            path = self._artifact_path(spec.name, version)
+            fd, tmp_path = tempfile.mkstemp(dir=self.models_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    joblib.dump(vars(model), f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            self._loaded[spec.name] = model
+            self._prune(spec, keep=path)
+            return model
+
+    def _prune(self, spec, keep):
+        """Remove versões antigas do modelo guardadas em disco"""
+        for path in glob.glob(os.path.join(self.models_dir, f"{spec.name}-*.joblib")):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    for model_name, model_spec in registry.specs.items():
+        if not os.path.exists(model_spec.csv_path):
+            print(f"⚠️ {model_name}: {model_spec.csv_path} não encontrado, a ignorar")
+            continue
+        trained = registry.get(model_name)
+        print(f"✅ {model_name}: versão {trained.version[:16]} ({len(trained.features)} features)")
@@ -0,0 +1,182 @@
+"""
+Instrumentação dos reruns do dashboard: tempo, CPU, memória e linhas por função
+
+Cada rerun tem um `Profiler`. As funções decoradas com `@profiled` e os blocos
+`with span(...)` executados enquanto o profiler está ativo ficam registados
+como intervalos aninhados: início relativo ao rerun, tempo de relógio, tempo
+de CPU, linhas processadas (DataFrames recebidos ou, se não houver, devolvidos)
+e, com `trace_memory=True`, o pico de memória alocada acima do início do
+intervalo (tracemalloc, que torna o código mais lento e por isso só é ligado a
+pedido). Fora de um rerun instrumentado os decoradores não fazem nada.
+Os reruns podem ser exportados em JSON lines para análise offline.
+"""
+import contextvars
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+_active = contextvars.ContextVar("profiler", default=None)
+
+
+@dataclass
+class Span:
+    """Intervalo medido dentro de um rerun"""
+    name: str
+    depth: int
+    start_s: float
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int = 0
+    mem_peak_mb: float = None
+    error: str = None
+
+
+@dataclass
+class _Frame:
+    span: Span
+    cpu_start: float
+    mem_start: int = 0
+    child_peak: int = 0
+
+
+def count_rows(*values):
+    """Nº de linhas dos DataFrames/Series entre os valores (incluindo dentro de tuplos e listas)"""
+    total = 0
+    for value in values:
+        if isinstance(value, (tuple, list)):
+            total += count_rows(*value)
+        elif hasattr(value, "shape") and hasattr(value, "index"):
+            total += len(value)
+    return total
+
+
+@dataclass
+class Profiler:
+    """Intervalos de um rerun, pela ordem em que começaram"""
+    label: str = ""
+    trace_memory: bool = False
+    started_at: float = field(default_factory=time.time)
+    spans: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self._origin = time.perf_counter()
+        self._stack = []
+        self._started_tracing = False
+
+    @contextmanager
+    def activate(self):
+        """Torna este o profiler ativo (o dos decoradores) durante o bloco"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    @contextmanager
+    def span(self, name, rows=0):
+        """Mede um bloco; `rows` pode ser atualizado pelo bloco através do Span devolvido"""
+        record = Span(name, len(self._stack), time.perf_counter() - self._origin, rows=rows)
+        frame = _Frame(record, time.process_time())
+        if self.trace_memory:
+            frame.mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.spans.append(record)
+        self._stack.append(frame)
+        try:
+            yield record
+        except BaseException as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            self._stack.pop()
+            record.wall_s = time.perf_counter() - self._origin - record.start_s
+            record.cpu_s = time.process_time() - frame.cpu_start
+            if self.trace_memory:
+                # reset_peak() de um intervalo filho apaga o pico do pai: propaga-se à mão
+                peak = max(tracemalloc.get_traced_memory()[1], frame.child_peak)
+                record.mem_peak_mb = max(peak - frame.mem_start, 0) / 1e6
+                if self._stack:
+                    self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+                tracemalloc.reset_peak()
+
+    @property
+    def total_s(self):
+        """Tempo total dos intervalos de topo"""
+        return sum(span.wall_s for span in self.spans if span.depth == 0)
+
+    def top_level(self):
+        return [span for span in self.spans if span.depth == 0]
+
+    def summary(self):
+        """Tempo próprio, CPU, linhas e pico de memória agregados por nome (mais lentos primeiro)"""
+        totals = {}
+        for i, span in enumerate(self.spans):
+            children_s = sum(child.wall_s for child in self._children(i))
+            row = totals.setdefault(span.name, {"funcao": span.name, "chamadas": 0, "total_s": 0.0,
+                                                "proprio_s": 0.0, "cpu_s": 0.0, "linhas": 0,
+                                                "pico_mem_mb": None})
+            row["chamadas"] += 1
+            row["total_s"] += span.wall_s
+            row["proprio_s"] += span.wall_s - children_s
+            row["cpu_s"] += span.cpu_s
+            row["linhas"] += span.rows
+            if span.mem_peak_mb is not None:
+                row["pico_mem_mb"] = max(row["pico_mem_mb"] or 0.0, span.mem_peak_mb)
+        return sorted(totals.values(), key=lambda row: row["proprio_s"], reverse=True)
+
+    def _children(self, index):
+        depth = self.spans[index].depth
+        for span in self.spans[index + 1:]:
+            if span.depth <= depth:
+                break
+            if span.depth == depth + 1:
+                yield span
+
+    def to_dict(self):
+        return {"label": self.label, "started_at": self.started_at, "total_s": self.total_s,
+                "trace_memory": self.trace_memory, "spans": [asdict(span) for span in self.spans]}
+
+
+def to_jsonl(profilers):
+    """Reruns em JSON lines (um rerun por linha, com todos os intervalos)"""
+    return "".join(json.dumps(profiler.to_dict(), ensure_ascii=False) + "\n" for profiler in profilers)
+
+
+@contextmanager
+def span(name, rows=0):
+    """Intervalo no profiler ativo (ou nada, se não houver)"""
+    profiler = _active.get()
+    if profiler is None:
+        yield None
+        return
+    with profiler.span(name, rows) as record:
+        yield record
+
+
+def profiled(func=None, *, name=None):
+    """Decorador: mede cada chamada da função no profiler ativo"""
+    if func is None:
+        return functools.partial(profiled, name=name)
+    label = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _active.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.span(label, count_rows(*args, *kwargs.values())) as record:
+            result = func(*args, **kwargs)
+            if not record.rows:
+                record.rows = count_rows(result)
+            return result
+
+    return wrapper
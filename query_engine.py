@@ -0,0 +1,393 @@
+"""
+Perguntas sobre os dados respondidas com consultas locais (LLM → plano → pandas)
+
+Em vez de enviar linhas ao modelo, o LLM recebe apenas o esquema dos datasets
+e devolve um plano de consulta em JSON (dataset, filtros, agrupamento e
+agregações). O plano é validado contra uma lista fechada de operações e
+colunas existentes e executado localmente em pandas (sem `eval`/`query`);
+só o resultado, com no máximo `MAX_ROWS` linhas, volta ao modelo para ser
+explicado. O tamanho dos prompts não depende do nº de linhas e planos
+repetidos sobre a mesma versão dos dados são servidos de memória.
+
+Formato do plano:
+    {"dataset": "hotel",
+     "filters": [{"column": "epoca", "op": "==", "value": "Alta"}],
+     "group_by": ["tipo_quarto"],
+     "metrics": [{"column": "gasto_total", "agg": "mean"}, {"column": "*", "agg": "count"}],
+     "sort_by": "gasto_total_mean", "descending": true, "limit": 10}
+"""
+import json
+import operator
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+from llm_cache import request_key
+
+DATASETS = ("restaurante", "hotel", "clientes")
+FILTER_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda series, values: series.isin(values),
+    "not in": lambda series, values: ~series.isin(values),
+    "between": lambda series, bounds: series.between(*bounds),
+}
+AGGREGATIONS = ("count", "sum", "mean", "median", "min", "max", "nunique")
+NUMERIC_AGGREGATIONS = ("sum", "mean", "median")
+# min/max precisam de uma ordem: categorias (texto ou Categorical sem ordem) não a têm
+ORDERED_AGGREGATIONS = ("min", "max")
+MAX_FILTERS = 5
+MAX_GROUP_BY = 3
+MAX_METRICS = 5
+MAX_ROWS = 50
+
+PLAN_PROMPT = (
+    "Converte a pergunta num plano de consulta JSON sobre os datasets abaixo. Responde APENAS com "
+    "o objeto JSON, sem texto adicional.\n"
+    "Campos: dataset (um de {datasets}); filters: lista de {{column, op, value}} com op em {ops} "
+    "(in/not in: lista de valores; between: [mín, máx]; datas em AAAA-MM-DD); group_by: até {max_group_by} "
+    "colunas (colunas de data são agrupadas por mês); metrics: até {max_metrics} {{column, agg}} com agg em "
+    "{aggs} (column \"*\" com agg \"count\" conta registos; min/max só em números, datas ou booleanos); "
+    "sort_by: nome de uma métrica "
+    "(coluna_agg, p.ex. gasto_total_mean; \"registos\" para a contagem) ou coluna de agrupamento; "
+    "descending: true/false; limit: até {max_rows}.\n\n"
+    "Datasets:\n{schema}\n\nPergunta: {question}"
+)
+NARRATION_PROMPT = (
+    "Responde à pergunta do gestor em português, de forma direta (no máximo 5 bullet points), "
+    "usando apenas o resultado da consulta abaixo, calculado sobre os dados completos.\n\n"
+    "Pergunta: {question}\nConsulta: {plan}\nResultado:\n{result}"
+)
+
+
+class QueryPlanError(ValueError):
+    """Plano de consulta inválido ou fora das operações permitidas"""
+
+
+@dataclass(frozen=True)
+class Filter:
+    column: str
+    op: str
+    value: object
+
+
+@dataclass(frozen=True)
+class Metric:
+    column: str
+    agg: str
+
+    @property
+    def name(self):
+        return "registos" if self.column == "*" else f"{self.column}_{self.agg}"
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Plano validado (imutável e hashable: serve de chave de memoização)"""
+    dataset: str
+    filters: tuple = ()
+    group_by: tuple = ()
+    metrics: tuple = ()
+    sort_by: str = None
+    descending: bool = True
+    limit: int = MAX_ROWS
+
+    def to_dict(self):
+        plan = asdict(self)
+        plan["filters"] = [asdict(f) for f in self.filters]
+        plan["metrics"] = [asdict(m) for m in self.metrics]
+        plan["group_by"] = list(self.group_by)
+        return plan
+
+
+# --- Esquema -------------------------------------------------------------------
+
+def column_kind(series):
+    """Tipo lógico de uma coluna: numero, booleano, data ou categoria"""
+    if pd.api.types.is_bool_dtype(series):
+        return "booleano"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "data"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numero"
+    return "categoria"
+
+
+def describe_schema(frames, max_values=8):
+    """Colunas de cada dataset com o tipo (e valores, para categorias pequenas) — sem linhas de dados"""
+    lines = []
+    for name, df in frames.items():
+        columns = []
+        for col in df.columns:
+            kind = column_kind(df[col])
+            if kind == "categoria":
+                values = df[col].dropna().unique()
+                if len(values) <= max_values:
+                    kind = "categoria: " + "|".join(sorted(map(str, values)))
+            columns.append(f"{col} ({kind})")
+        lines.append(f"- {name} ({len(df.columns)} colunas): " + ", ".join(columns))
+    return "\n".join(lines)
+
+
+# --- Validação -----------------------------------------------------------------
+
+def parse_plan(text):
+    """Extrai o objeto JSON da resposta do modelo (aceita blocos ```json)"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match is None:
+        raise QueryPlanError("A resposta do modelo não contém um plano JSON")
+    try:
+        return json.loads(match.group(0))
+    except ValueError as e:
+        raise QueryPlanError(f"Plano JSON inválido: {e}") from e
+
+
+def _filter_value(series, op, value):
+    """Valida e converte o valor de um filtro para o tipo da coluna"""
+    kind = column_kind(series)
+    if op in ("in", "not in"):
+        if not isinstance(value, list) or not value:
+            raise QueryPlanError(f"'{op}' precisa de uma lista de valores")
+        return tuple(_scalar(kind, v) for v in value)
+    if op == "between":
+        if not isinstance(value, list) or len(value) != 2:
+            raise QueryPlanError("'between' precisa de [mín, máx]")
+        return tuple(_scalar(kind, v) for v in value)
+    if kind in ("categoria", "booleano") and op not in ("==", "!="):
+        raise QueryPlanError(f"'{op}' não se aplica a colunas do tipo {kind}")
+    return _scalar(kind, value)
+
+
+def _scalar(kind, value):
+    if isinstance(value, (dict, list)):
+        raise QueryPlanError(f"Valor inválido: {value!r}")
+    if kind == "numero":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise QueryPlanError(f"Valor numérico esperado: {value!r}")
+        return value
+    if kind == "booleano":
+        if isinstance(value, bool):
+            return value
+        if str(value).strip().lower() in ("sim", "true", "1"):
+            return True
+        if str(value).strip().lower() in ("não", "nao", "false", "0"):
+            return False
+        raise QueryPlanError(f"Valor booleano esperado: {value!r}")
+    if kind == "data":
+        try:
+            return pd.Timestamp(str(value)).isoformat()
+        except ValueError as e:
+            raise QueryPlanError(f"Data inválida: {value!r}") from e
+    return str(value)
+
+
+def validate_plan(raw, frames):
+    """Valida um plano (dict) contra as operações permitidas e as colunas dos datasets"""
+    if not isinstance(raw, dict):
+        raise QueryPlanError("O plano tem de ser um objeto JSON")
+    unknown = set(raw) - {"dataset", "filters", "group_by", "metrics", "sort_by", "descending", "limit"}
+    if unknown:
+        raise QueryPlanError(f"Campos não permitidos: {', '.join(sorted(unknown))}")
+    dataset = raw.get("dataset")
+    if dataset not in DATASETS or dataset not in frames:
+        raise QueryPlanError(f"Dataset desconhecido: {dataset!r}")
+    df = frames[dataset]
+
+    def column(name):
+        if not isinstance(name, str) or name not in df.columns:
+            raise QueryPlanError(f"Coluna desconhecida em {dataset}: {name!r}")
+        return name
+
+    raw_filters = raw.get("filters") or []
+    raw_group_by = raw.get("group_by") or []
+    raw_metrics = raw.get("metrics") or [{"column": "*", "agg": "count"}]
+    if not isinstance(raw_filters, list) or len(raw_filters) > MAX_FILTERS:
+        raise QueryPlanError(f"filters: lista com no máximo {MAX_FILTERS} filtros")
+    if not isinstance(raw_group_by, list) or len(raw_group_by) > MAX_GROUP_BY:
+        raise QueryPlanError(f"group_by: lista com no máximo {MAX_GROUP_BY} colunas")
+    if not isinstance(raw_metrics, list) or len(raw_metrics) > MAX_METRICS:
+        raise QueryPlanError(f"metrics: lista com no máximo {MAX_METRICS} métricas")
+
+    filters = []
+    for f in raw_filters:
+        if not isinstance(f, dict) or f.get("op") not in FILTER_OPS:
+            raise QueryPlanError(f"Filtro inválido: {f!r} (operadores: {', '.join(FILTER_OPS)})")
+        col = column(f.get("column"))
+        filters.append(Filter(col, f["op"], _filter_value(df[col], f["op"], f.get("value"))))
+
+    group_by = tuple(column(col) for col in raw_group_by)
+    if len(set(group_by)) != len(group_by):
+        raise QueryPlanError("group_by: cada coluna só pode aparecer uma vez")
+
+    metrics = []
+    for m in raw_metrics:
+        if not isinstance(m, dict) or m.get("agg") not in AGGREGATIONS:
+            raise QueryPlanError(f"Métrica inválida: {m!r} (agregações: {', '.join(AGGREGATIONS)})")
+        if m.get("column") == "*":
+            if m["agg"] != "count":
+                raise QueryPlanError("A coluna '*' só admite 'count'")
+            metrics.append(Metric("*", "count"))
+            continue
+        col = column(m.get("column"))
+        if m["agg"] in NUMERIC_AGGREGATIONS and column_kind(df[col]) not in ("numero", "booleano"):
+            raise QueryPlanError(f"'{m['agg']}' precisa de uma coluna numérica: {col}")
+        if m["agg"] in ORDERED_AGGREGATIONS and column_kind(df[col]) == "categoria":
+            raise QueryPlanError(f"'{m['agg']}' precisa de uma coluna numérica, de data ou booleana: {col}")
+        metrics.append(Metric(col, m["agg"]))
+
+    names = [metric.name for metric in metrics] + list(group_by)
+    sort_by = raw.get("sort_by")
+    if sort_by is not None and sort_by not in names:
+        raise QueryPlanError(f"sort_by deve ser uma de: {', '.join(names)}")
+    limit = raw.get("limit", MAX_ROWS)
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_ROWS:
+        raise QueryPlanError(f"limit deve estar entre 1 e {MAX_ROWS}")
+
+    return QueryPlan(dataset, tuple(filters), group_by, tuple(metrics), sort_by,
+                     bool(raw.get("descending", True)), limit)
+
+
+# --- Execução ------------------------------------------------------------------
+
+def execute_plan(plan, frames):
+    """Executa um plano validado e devolve um DataFrame com no máximo `plan.limit` linhas"""
+    try:
+        return _execute(plan, frames)
+    except (KeyError, TypeError, ValueError) as e:
+        # Combinação que a validação não previu: mostrada como plano inválido, não como erro da página
+        raise QueryPlanError(f"Não foi possível executar o plano: {e}") from e
+
+
+def _execute(plan, frames):
+    df = frames[plan.dataset]
+    mask = pd.Series(True, index=df.index)
+    for f in plan.filters:
+        series = df[f.column]
+        kind = column_kind(series)
+        if kind == "categoria":
+            series = series.astype(str)
+        elif kind == "data":
+            value = (tuple(pd.Timestamp(v) for v in f.value) if isinstance(f.value, tuple)
+                     else pd.Timestamp(f.value))
+            mask &= FILTER_OPS[f.op](series, value)
+            continue
+        value = list(f.value) if f.op in ("in", "not in") else f.value
+        mask &= FILTER_OPS[f.op](series, value)
+    subset = df[mask]
+
+    def aggregate(frame_or_groups, metric):
+        if metric.column == "*":
+            return frame_or_groups.size()
+        return frame_or_groups[metric.column].agg(metric.agg)
+
+    if plan.group_by:
+        keys = [subset[col].dt.to_period("M").astype(str) if column_kind(subset[col]) == "data"
+                else subset[col] for col in plan.group_by]
+        groups = subset.groupby(keys, observed=True)
+        result = pd.DataFrame({metric.name: aggregate(groups, metric) for metric in plan.metrics})
+        result = result.reset_index()
+    else:
+        result = pd.DataFrame([{metric.name: (len(subset) if metric.column == "*"
+                                              else subset[metric.column].agg(metric.agg))
+                                for metric in plan.metrics}])
+
+    if plan.sort_by is not None:
+        result = result.sort_values(plan.sort_by, ascending=not plan.descending)
+    result = result.head(plan.limit).reset_index(drop=True)
+    return result.round({col: 2 for col in result.select_dtypes("number").columns})
+
+
+# --- Perguntas → plano → resultado → resposta ----------------------------------
+
+@dataclass
+class QueryAnswer:
+    """Resposta a uma pergunta, com o plano e o resultado que a sustentam"""
+    question: str
+    text: str
+    model: str
+    plan: QueryPlan = None
+    result: pd.DataFrame = None
+    cached: bool = False
+    memoized: bool = False
+    similarity: float = 1.0
+    matched_question: str = ""
+    prompt_tokens: int = 0
+    latency_s: float = 0.0
+
+
+class QueryEngine:
+    """
+    Responde a perguntas planeadas pelo LLM e executadas localmente.
+    `complete(messages, model)` faz o pedido ao modelo (model=None: escolha
+    do router) e devolve um `Completion`.
+    """
+
+    def __init__(self, complete, semantic_cache=None, max_memoized=128):
+        self.complete = complete
+        self.semantic_cache = semantic_cache
+        self.max_memoized = max_memoized
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self._memo = OrderedDict()  # (plano, versão dos dados) → resultado
+        self._lock = threading.Lock()
+
+    def plan(self, question, frames, schema=None, model=None):
+        """Pede o plano ao modelo e valida-o; devolve (plano, Completion)"""
+        prompt = PLAN_PROMPT.format(datasets=", ".join(frames), ops=", ".join(FILTER_OPS),
+                                    aggs=", ".join(AGGREGATIONS), max_group_by=MAX_GROUP_BY,
+                                    max_metrics=MAX_METRICS, max_rows=MAX_ROWS,
+                                    schema=schema or describe_schema(frames), question=question)
+        completion = self.complete([{"role": "user", "content": prompt}], model)
+        return validate_plan(parse_plan(completion.text), frames), completion
+
+    def run(self, plan, frames, version):
+        """Resultado do plano, memoizado por (plano, versão dos dados); devolve (resultado, memoizado)"""
+        key = (plan, version)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return self._memo[key], True
+            self.memo_misses += 1
+        result = execute_plan(plan, frames)
+        with self._lock:
+            self._memo[key] = result
+            while len(self._memo) > self.max_memoized:
+                self._memo.popitem(last=False)
+        return result, False
+
+    def answer(self, question, frames, version, schema=None, model=None):
+        """Pergunta → (cache semântica) → plano → execução local → resposta narrada"""
+        start = time.perf_counter()
+        context_key = request_key(engine="consulta", version=version)
+        if self.semantic_cache is not None:
+            hit = self.semantic_cache.lookup(question, context_key)
+            if hit is not None:
+                return QueryAnswer(question, hit.entry.answer, hit.entry.model, cached=True,
+                                   similarity=hit.similarity, matched_question=hit.entry.question,
+                                   latency_s=time.perf_counter() - start)
+
+        plan, plan_completion = self.plan(question, frames, schema, model)
+        result, memoized = self.run(plan, frames, version)
+        narration = self.complete([{"role": "user", "content": NARRATION_PROMPT.format(
+            question=question, plan=json.dumps(plan.to_dict(), ensure_ascii=False, default=str),
+            result=result.to_string(index=False))}], model)
+        latency_s = time.perf_counter() - start
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(question, context_key, narration.text, narration.model, latency_s)
+        return QueryAnswer(question, narration.text, narration.model, plan, result, memoized=memoized,
+                           prompt_tokens=plan_completion.prompt_tokens + narration.prompt_tokens,
+                           latency_s=latency_s)
+
+    def stats(self):
+        lookups = self.memo_hits + self.memo_misses
+        return {"planos_memorizados": len(self._memo), "hits": self.memo_hits,
+                "hit_rate": self.memo_hits / lookups if lookups else 0.0}
@@ -0,0 +1,183 @@
+"""
+Cache semântica das perguntas livres ao LLM ("pergunte aos dados")
+
+Perguntas quase iguais ("qual o gasto médio por época?", "Gasto medio por
+epoca?") devem reutilizar a mesma resposta. Cada pergunta é representada por um
+vetor TF-IDF de n-gramas de caracteres (scikit-learn, sem modelos externos) e
+comparada por similaridade do cosseno com as perguntas já respondidas para os
+mesmos dados; acima do limiar a resposta vem da cache. Perguntas que referem
+negócios ou números diferentes ("no hotel" vs. "no restaurante", "em 2023" vs.
+"em 2024") nunca são consideradas equivalentes, por muito parecido que seja o
+resto do texto. O nº de entradas é
+limitado (remoção das menos usadas recentemente) e as entradas persistem em
+disco, em JSON lines: cada resposta nova e cada acerto (hits e último uso) são
+acrescentados ao fim do ficheiro, que só é reescrito quando há entradas a remover
+ou registos de acertos a mais.
+"""
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from llm_cache import CACHE_DIR
+
+SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, "semantic", "perguntas.jsonl")
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_MAX_ENTRIES = 500
+# Termos que mudam o sentido da pergunta: só há acerto se ambas referem os mesmos
+# (os números, p.ex. anos ou limites, são sempre distintivos)
+DISTINGUISHING_TERMS = frozenset({"hotel", "restaurante"})
+
+
+def key_terms(question, terms=DISTINGUISHING_TERMS):
+    """Termos distintivos e números presentes numa pergunta (sem acentos nem maiúsculas)"""
+    text = unicodedata.normalize("NFKD", question.lower()).encode("ascii", "ignore").decode("ascii")
+    words = frozenset(re.findall(r"\w+", text))
+    return (words & terms) | frozenset(word for word in words if word.isdigit())
+
+
+@dataclass
+class CachedAnswer:
+    """Pergunta respondida, com o contexto (dados) a que a resposta se refere"""
+    question: str
+    context_key: str
+    answer: str
+    model: str
+    latency_s: float
+    created_at: float
+    last_used: float
+    hits: int = 0
+
+
+@dataclass
+class SemanticHit:
+    """Resposta encontrada na cache e a semelhança com a pergunta original"""
+    entry: CachedAnswer
+    similarity: float
+
+
+class SemanticCache:
+    """Respostas do LLM indexadas pela semelhança (TF-IDF + cosseno) das perguntas"""
+
+    def __init__(self, path=SEMANTIC_CACHE_PATH, threshold=DEFAULT_THRESHOLD,
+                 max_entries=DEFAULT_MAX_ENTRIES, distinguishing_terms=DISTINGUISHING_TERMS):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.distinguishing_terms = distinguishing_terms
+        self.lookups = 0
+        self.hits = 0
+        self.latency_saved_s = 0.0
+        self._lock = threading.Lock()
+        self._entries = []
+        self._index = None  # (vetorizador, matriz TF-IDF), refeito quando as entradas mudam
+        self._log_lines = 0  # linhas no ficheiro (respostas e registos de acertos)
+        self._load()
+
+    def _load(self):
+        """Repõe as entradas do ficheiro, com os acertos registados, e mantém as mais recentes"""
+        if not os.path.exists(self.path):
+            return
+        entries = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._log_lines += 1
+                try:
+                    record = json.loads(line)
+                    key = (record["question"], record["context_key"])
+                    if "answer" in record:
+                        entries[key] = CachedAnswer(**record)
+                    elif key in entries:
+                        entries[key].hits = record["hits"]
+                        entries[key].last_used = record["last_used"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+        self._entries = sorted(entries.values(), key=lambda entry: entry.last_used)[-self.max_entries:]
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log_lines += 1
+
+    def _save(self):
+        """Reescreve o ficheiro só com as entradas atuais (compactação)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._entries:
+                f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(self._entries)
+
+    def _compact_if_needed(self):
+        # Os registos de acertos acumulam-se: o ficheiro nunca passa de 2× o máximo de entradas
+        if self._log_lines > 2 * self.max_entries:
+            self._save()
+
+    def _build_index(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        # N-gramas de caracteres: robusto a flexões, acentos e pequenas gralhas
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), lowercase=True,
+                                     strip_accents="unicode", sublinear_tf=True)
+        matrix = vectorizer.fit_transform([entry.question for entry in self._entries])
+        self._index = (vectorizer, matrix)
+
+    def lookup(self, question, context_key):
+        """Resposta de uma pergunta semelhante sobre os mesmos dados (ou None)"""
+        with self._lock:
+            self.lookups += 1
+            terms = key_terms(question, self.distinguishing_terms)
+            candidates = [i for i, entry in enumerate(self._entries)
+                          if entry.context_key == context_key
+                          and key_terms(entry.question, self.distinguishing_terms) == terms]
+            if not candidates:
+                return None
+            if self._index is None:
+                self._build_index()
+            vectorizer, matrix = self._index
+            # Vetores normalizados (L2): o produto escalar é o cosseno
+            scores = (matrix[candidates] @ vectorizer.transform([question]).T).toarray().ravel()
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            entry = self._entries[candidates[best]]
+            entry.hits += 1
+            entry.last_used = time.time()
+            self._append({"question": entry.question, "context_key": entry.context_key,
+                          "hits": entry.hits, "last_used": entry.last_used})
+            self._compact_if_needed()
+            self.hits += 1
+            self.latency_saved_s += entry.latency_s
+            return SemanticHit(entry, float(scores[best]))
+
+    def put(self, question, context_key, answer, model, latency_s):
+        """Guarda uma resposta, removendo as entradas menos usadas recentemente se necessário"""
+        now = time.time()
+        entry = CachedAnswer(question, context_key, answer, model, latency_s, now, now)
+        with self._lock:
+            self._entries.append(entry)
+            self._index = None
+            if len(self._entries) > self.max_entries:
+                self._entries.sort(key=lambda entry: entry.last_used)
+                del self._entries[:len(self._entries) - self.max_entries]
+                self._save()
+            else:
+                self._append(asdict(entry))
+                self._compact_if_needed()
+
+    def stats(self):
+        """Entradas, taxa de acertos e tempo de resposta do LLM poupado desde o arranque"""
+        return {
+            "entradas": len(self._entries),
+            "consultas": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "latencia_poupada_s": self.latency_saved_s,
+        }
@@ -0,0 +1,30 @@
+"""
+Configuração comum dos testes: módulos do projeto e de `tools/` importáveis
+sem instalação, como nos benchmarks
+"""
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "tools"))
+
+
+@pytest.fixture
+def groq_stub():
+    """Inicia servidores `tools/groq_stub.py` em portas livres; devolve (state, base_url)"""
+    from groq_stub import start_stub_server
+
+    servers = []
+
+    def start(**options):
+        server, base_url = start_stub_server(**options)
+        servers.append(server)
+        return server.RequestHandlerClass.state, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
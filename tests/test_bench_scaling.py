@@ -0,0 +1,61 @@
+"""
+Escala do pipeline com pytest-benchmark, sobre as etapas de `benchmarks/bench_scaling.py`
+
+Cada tamanho corre `run_stages` num processo novo (como o script) e guarda no
+relatório do pytest-benchmark o tempo e o pico de memória de cada etapa. O
+último teste falha se alguma etapa escalar pior que linear entre tamanhos:
+    python -m pytest tests/test_bench_scaling.py --benchmark-only
+Sem o pytest-benchmark instalado (`requirements-dev.txt`) os testes são saltados.
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import bench_scaling  # noqa: E402
+
+SIZES = (10_000, 100_000)
+SEED = 42
+RESULTS = {}
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    """Datasets sintéticos e modelos partilhados por todos os tamanhos"""
+    path = str(tmp_path_factory.mktemp("bench_scaling"))
+    bench_scaling.model_registry(path, SEED)  # treino fora das medições
+    return path
+
+
+@pytest.mark.parametrize("rows", SIZES)
+def test_pipeline_stages(benchmark, cache_dir, rows):
+    data_dir = bench_scaling.dataset_dir(cache_dir, rows, rows // 2, 0.0, SEED)
+    options = {"rows": rows, "data_dir": data_dir, "cache_dir": cache_dir, "seed": SEED, "trace_memory": False}
+
+    result = benchmark.pedantic(bench_scaling.run_child, args=(options,), rounds=1, iterations=1)
+    traced = bench_scaling.run_child({**options, "trace_memory": True})
+
+    for stage in bench_scaling.STAGES:
+        result["stages"][stage]["mem_mb"] = traced["stages"][stage]["mem_mb"]
+    benchmark.extra_info.update({f"{stage}_s": values["s"] for stage, values in result["stages"].items()})
+    benchmark.extra_info.update({f"{stage}_mb": values["mem_mb"] for stage, values in result["stages"].items()})
+    benchmark.extra_info["max_rss_mb"] = result["max_rss_mb"]
+    RESULTS[rows] = result
+
+
+@pytest.mark.parametrize("key, minimum", [("s", bench_scaling.MIN_STAGE_S), ("mem_mb", bench_scaling.MIN_STAGE_MB)])
+def test_stages_scale_linearly(key, minimum):
+    if set(RESULTS) != set(SIZES):
+        pytest.skip("precisa das medições de todos os tamanhos (test_pipeline_stages)")
+
+    superlinear = {}
+    for stage in bench_scaling.STAGES:
+        points = [(rows, RESULTS[rows]["stages"][stage][key]) for rows in SIZES]
+        ks = [k for k in bench_scaling.exponents(points, minimum) if k is not None]
+        if ks and max(ks) > bench_scaling.DEFAULT_MAX_EXPONENT:
+            superlinear[stage] = round(max(ks), 2)
+
+    assert not superlinear, f"etapas com escala pior que linear: {superlinear}"
@@ -0,0 +1,46 @@
+"""
+Validação dos valores de entrada das reservas antes da codificação para os modelos
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_encoder import as_flag, month_number, positive_number
+
+
+@pytest.mark.parametrize("values", [[2, 0], [3, -1], [1, None], ["2", "inf"]])
+def test_positive_number_rejects_zero_negative_and_missing(values):
+    with pytest.raises(ValueError, match="'noites'"):
+        positive_number(pd.Series(values), "noites")
+
+
+def test_positive_number_accepts_counts():
+    assert positive_number(pd.Series(["2", 3]), "num_pessoas").tolist() == [2.0, 3.0]
+
+
+def test_month_number_accepts_numbers_and_names():
+    assert month_number(pd.Series(["3", "Março", "dezembro", 7.0])).tolist() == [3, 3, 12, 7]
+    assert np.array_equal(month_number(pd.Series([1, 12])), [1, 12])
+
+
+@pytest.mark.parametrize("value", ["inf", "-inf", "nan", "13", "Marzo", ""])
+def test_month_number_rejects_invalid_months(value):
+    with pytest.raises(ValueError, match="'mes'"):
+        month_number(pd.Series(["1", value]))
+
+
+def test_as_flag_accepts_known_values():
+    values = pd.Series(["Sim", " não ", "TRUE", "0", "x", "", None, 1.0, 0])
+
+    assert as_flag(values, "vinho").tolist() == [True, False, True, False, True, False, False, True, False]
+
+
+@pytest.mark.parametrize("value", ["yes ", "S"])
+def test_as_flag_ignores_case_and_spaces(value):
+    assert as_flag(pd.Series([value]), "feriado").tolist() == [True]
+
+
+@pytest.mark.parametrize("value", ["verdadeiro", "talvez", "2", 0.5])
+def test_as_flag_rejects_unknown_values(value):
+    with pytest.raises(ValueError, match="'feriado'"):
+        as_flag(pd.Series(["Sim", value]), "feriado")
@@ -0,0 +1,125 @@
+"""
+Fan-out das secções de insights e novas tentativas contra o servidor local que
+imita o Groq, com atrasos e respostas 429 injetados (`tools/groq_stub.py`)
+"""
+import time
+
+import pytest
+
+from llm_cache import ResponseCache
+from llm_client import AsyncGroqClient, GroqClient, LLMError, RateLimiter
+from llm_insights import INSIGHT_SECTIONS, InsightGenerator
+from llm_router import ModelRouter
+
+MODEL = "modelo-stub"
+SUMMARIES = {section: f"- secção {section}: 100 registos" for section in INSIGHT_SECTIONS}
+
+
+def make_generator(base_url, cache_dir, rate_limiter=None, max_retries=4, router=None):
+    client = GroqClient("chave-stub", base_url, rate_limiter=rate_limiter, max_retries=max_retries,
+                        backoff_base_s=0.01)
+    return InsightGenerator(ResponseCache(str(cache_dir)), client,
+                            async_client=AsyncGroqClient(client, max_concurrency=len(SUMMARIES)),
+                            router=router)
+
+
+def test_fanout_wall_time_is_slowest_section(groq_stub, tmp_path):
+    delay_s = 0.4
+    state, base_url = groq_stub(delay_s=delay_s)
+    gen = make_generator(base_url, tmp_path)
+
+    insights, elapsed = gen.generate_all(SUMMARIES, MODEL)
+
+    assert all(not isinstance(insight, BaseException) for insight in insights.values())
+    assert state.requests == len(SUMMARIES)
+    # Em série seriam len(SUMMARIES) × delay_s
+    assert delay_s <= elapsed < 2 * delay_s
+
+
+def test_fanout_retries_429_with_backoff(groq_stub, tmp_path):
+    state, base_url = groq_stub(fail_rate=0.5, retry_after_s=0, seed=3)
+    gen = make_generator(base_url, tmp_path, max_retries=10)
+
+    insights, _ = gen.generate_all(SUMMARIES, MODEL)
+
+    assert all(not isinstance(insight, BaseException) for insight in insights.values())
+    assert state.rejected > 0
+    assert gen.client.retries == state.rejected
+    assert state.requests == len(SUMMARIES) + state.rejected
+
+
+def test_persistent_429_gives_up_after_max_retries(groq_stub, tmp_path):
+    state, base_url = groq_stub(fail_rate=1.0, retry_after_s=0)
+    gen = make_generator(base_url, tmp_path, max_retries=2)
+
+    with pytest.raises(LLMError) as excinfo:
+        gen.generate("resumo", SUMMARIES["resumo"], MODEL)
+
+    assert excinfo.value.status == 429
+    assert state.requests == 3
+
+
+def test_stream_retries_429_before_first_byte(groq_stub, tmp_path):
+    # Com seed=1 o primeiro pedido é recusado e o segundo aceite
+    state, base_url = groq_stub(fail_rate=0.5, retry_after_s=0, seed=1)
+    gen = make_generator(base_url, tmp_path)
+
+    text = "".join(gen.stream("resumo", SUMMARIES["resumo"], MODEL))
+
+    assert text
+    assert state.rejected >= 1
+    assert gen.client.retries == state.rejected
+
+
+def test_429_does_not_take_model_out_of_route(groq_stub, tmp_path):
+    _, base_url = groq_stub(fail_rate=1.0, retry_after_s=0)
+    router = ModelRouter({"interativo": ["modelo-a", "modelo-b"]}, max_consecutive_failures=1)
+    gen = make_generator(base_url, tmp_path, max_retries=0, router=router)
+
+    with pytest.raises(LLMError):
+        gen.complete([{"role": "user", "content": "olá"}])
+
+    assert router.choose("interativo") == "modelo-a"
+    assert all(row["estado"] == "ativo" for row in router.summary())
+
+
+def test_rate_limiter_is_shared_by_all_requests(groq_stub, tmp_path):
+    state, base_url = groq_stub()
+    # 600 pedidos/min sem rajada: um pedido a cada 0,1 s
+    gen = make_generator(base_url, tmp_path, rate_limiter=RateLimiter(600, burst=1))
+
+    start = time.perf_counter()
+    gen.generate_all(SUMMARIES, MODEL)
+    gen.complete([{"role": "user", "content": "olá"}], MODEL)
+    elapsed = time.perf_counter() - start
+
+    assert state.requests == len(SUMMARIES) + 1
+    assert elapsed >= 0.1 * len(SUMMARIES) * 0.9
+
+
+def test_retry_after_beyond_deadline_fails_fast(groq_stub):
+    # O Retry-After do servidor (5 s) não cabe no prazo total do pedido
+    state, base_url = groq_stub(fail_rate=1.0, retry_after_s=5)
+    client = GroqClient("chave-stub", base_url, timeout=5, deadline_s=0.5, backoff_base_s=0.01)
+
+    start = time.perf_counter()
+    with pytest.raises(LLMError, match="prazo") as excinfo:
+        client.chat([{"role": "user", "content": "olá"}], MODEL, 0.1, 64)
+
+    assert time.perf_counter() - start < 0.5
+    assert excinfo.value.status == 429
+    assert state.requests == 1
+
+
+def test_rate_limiter_wait_beyond_deadline_is_refunded(groq_stub):
+    state, base_url = groq_stub()
+    # 6 pedidos/min sem rajada: o segundo pedido teria de esperar 10 s
+    limiter = RateLimiter(6, burst=1)
+    client = GroqClient("chave-stub", base_url, deadline_s=1, rate_limiter=limiter)
+    client.chat([{"role": "user", "content": "olá"}], MODEL, 0.1, 64)
+
+    with pytest.raises(LLMError, match="prazo"):
+        client.chat([{"role": "user", "content": "olá"}], MODEL, 0.1, 64)
+
+    assert state.requests == 1
+    assert limiter.reserve() == pytest.approx(10, abs=0.5)
@@ -0,0 +1,124 @@
+"""
+Gerador de insights contra o servidor local que imita o Groq (`tools/groq_stub.py`)
+
+Cobre a cache em disco endereçada pelo pedido (hits, misses e remoção LRU) e
+as respostas inválidas do servidor, que têm de chegar ao dashboard como LLMError.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_cache import ResponseCache
+from llm_client import GroqClient, LLMError
+from llm_insights import InsightGenerator
+
+MODEL = "modelo-stub"
+
+
+@pytest.fixture
+def generator(groq_stub, tmp_path):
+    state, base_url = groq_stub()
+    client = GroqClient("chave-stub", base_url)
+    return state, InsightGenerator(ResponseCache(str(tmp_path / "cache")), client)
+
+
+def test_identical_request_is_served_from_cache(generator):
+    state, gen = generator
+
+    first = gen.generate("resumo", "- receita total: 1000€", MODEL)
+    second = gen.generate("resumo", "- receita total: 1000€", MODEL)
+
+    assert (first.cached, second.cached) == (False, True)
+    assert second.text == first.text
+    assert state.requests == 1
+    assert gen.cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("section, summary, model", [
+    ("resumo", "- receita total: 1200€", MODEL),  # dados diferentes
+    ("negocio", "- receita total: 1000€", MODEL),  # template diferente
+    ("resumo", "- receita total: 1000€", "outro-modelo"),
+])
+def test_any_change_in_request_misses_cache(generator, section, summary, model):
+    state, gen = generator
+    gen.generate("resumo", "- receita total: 1000€", MODEL)
+
+    assert gen.generate(section, summary, model).cached is False
+    assert state.requests == 2
+
+
+def test_cache_survives_restart(generator, tmp_path):
+    state, gen = generator
+    gen.generate("resumo", "- receita total: 1000€", MODEL)
+
+    restarted = InsightGenerator(ResponseCache(str(tmp_path / "cache")), gen.client)
+
+    assert restarted.generate("resumo", "- receita total: 1000€", MODEL).cached is True
+    assert state.requests == 1
+
+
+def test_stream_is_cached_after_done(generator):
+    state, gen = generator
+
+    stream = gen.stream("resumo", "- receita total: 1000€", MODEL)
+    text = "".join(stream)
+
+    assert text == stream.text
+    assert gen.cached("resumo", "- receita total: 1000€", MODEL).text == text
+    assert state.requests == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=250)
+    value = {"text": "x" * 80}
+
+    cache.put("a" * 64, value)
+    cache.put("b" * 64, value)
+    cache.get("a" * 64)  # "a" passa a ser a mais recente
+    cache.put("c" * 64, value)
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == value
+    assert cache.get("c" * 64) == value
+    assert cache.stats()["entradas"] == 2
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_cache_index_rebuilt_from_disk(tmp_path):
+    ResponseCache(str(tmp_path)).put("a" * 64, {"text": "olá"})
+
+    cache = ResponseCache(str(tmp_path))
+
+    assert cache.stats()["entradas"] == 1
+    assert cache.get("a" * 64) == {"text": "olá"}
+
+
+class MalformedHandler(BaseHTTPRequestHandler):
+    """Responde 200 com um corpo que não é uma chat completion válida"""
+    body = b""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.parametrize("body", [b"not json", b"{}", b'{"choices": []}', b'{"choices": [{"message": {}}]}'])
+def test_malformed_body_raises_llm_error(body):
+    handler = type("Handler", (MalformedHandler,), {"body": body})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = GroqClient("chave-stub", f"http://127.0.0.1:{server.server_address[1]}")
+        with pytest.raises(LLMError, match="Resposta inválida"):
+            client.chat([{"role": "user", "content": "olá"}], MODEL, 0.1, 64)
+    finally:
+        server.shutdown()
+        server.server_close()
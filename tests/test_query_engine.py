@@ -0,0 +1,177 @@
+"""
+Motor de consultas com um LLM falso que devolve planos pré-definidos
+
+Cobre a execução de planos válidos, a rejeição de colunas, operadores e campos
+desconhecidos, os limites de `limit` e a memoização por (plano, versão dos dados).
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from llm_client import Completion
+from query_engine import MAX_ROWS, QueryEngine, QueryPlanError, execute_plan, validate_plan
+
+
+class FakeLLM:
+    """`complete(messages, model)` que devolve as respostas dadas, pela ordem, e regista os pedidos"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, messages, model=None):
+        self.calls.append(messages[-1]["content"])
+        text = self.responses.pop(0) if self.responses else "- resposta narrada"
+        if isinstance(text, dict):
+            text = json.dumps(text)
+        return Completion(text, model or "falso", prompt_tokens=10, completion_tokens=5, latency_s=0.0)
+
+
+@pytest.fixture
+def frames():
+    hotel = pd.DataFrame({
+        "tipo_quarto": pd.Categorical(["Suite", "Standard", "Suite", "Standard", "Superior"]),
+        "epoca": pd.Categorical(["Alta", "Baixa", "Alta", "Alta", "Media"]),
+        "noites": [3, 1, 2, 4, 2],
+        "gasto_total": [600.0, 90.0, 400.0, 360.0, 250.0],
+        "fez_reclamacao": [False, True, False, False, True],
+        "data_checkin": pd.to_datetime(["2024-01-05", "2024-01-20", "2024-02-10", "2024-03-01", "2024-03-15"]),
+    })
+    clientes = pd.DataFrame({"idade": [30, 45, 52], "nacionalidade": ["PT", "ES", "PT"]})
+    return {"hotel": hotel, "clientes": clientes}
+
+
+def test_answer_executes_valid_plan(frames):
+    plan = {"dataset": "hotel", "filters": [{"column": "epoca", "op": "==", "value": "Alta"}],
+            "group_by": ["tipo_quarto"],
+            "metrics": [{"column": "gasto_total", "agg": "sum"}, {"column": "*", "agg": "count"}],
+            "sort_by": "gasto_total_sum", "descending": True}
+    llm = FakeLLM(f"```json\n{json.dumps(plan)}\n```", "- Suites lideram a receita")
+    engine = QueryEngine(llm)
+
+    answer = engine.answer("receita por tipo de quarto na época alta", frames, version="v1")
+
+    assert answer.text == "- Suites lideram a receita"
+    assert answer.result.to_dict("records") == [
+        {"tipo_quarto": "Suite", "gasto_total_sum": 1000.0, "registos": 2},
+        {"tipo_quarto": "Standard", "gasto_total_sum": 360.0, "registos": 1},
+    ]
+    assert answer.prompt_tokens == 20
+    # O modelo recebe o esquema e o resultado, nunca as linhas dos dados
+    assert "600.0" not in llm.calls[0]
+    assert "1000.0" in llm.calls[1]
+
+
+def test_filters_on_dates_and_booleans(frames):
+    plan = validate_plan({"dataset": "hotel",
+                          "filters": [{"column": "data_checkin", "op": "between",
+                                       "value": ["2024-01-01", "2024-02-28"]},
+                                      {"column": "fez_reclamacao", "op": "==", "value": "não"}],
+                          "metrics": [{"column": "noites", "agg": "mean"}]}, frames)
+
+    result = execute_plan(plan, frames)
+
+    assert result.to_dict("records") == [{"noites_mean": 2.5}]
+
+
+def test_min_max_on_dates_and_counts_on_categories(frames):
+    plan = validate_plan({"dataset": "hotel",
+                          "metrics": [{"column": "data_checkin", "agg": "min"},
+                                      {"column": "noites", "agg": "max"},
+                                      {"column": "epoca", "agg": "nunique"}]}, frames)
+
+    result = execute_plan(plan, frames)
+
+    assert result.to_dict("records") == [{"data_checkin_min": pd.Timestamp("2024-01-05"),
+                                          "noites_max": 4, "epoca_nunique": 3}]
+
+
+def test_execution_failure_is_a_plan_error(frames):
+    # Uma métrica com o mesmo nome de uma coluna de agrupamento não cabe no resultado
+    frames["hotel"]["noites_max"] = frames["hotel"]["noites"]
+    plan = validate_plan({"dataset": "hotel", "group_by": ["noites_max"],
+                          "metrics": [{"column": "noites", "agg": "max"}]}, frames)
+
+    with pytest.raises(QueryPlanError, match="Não foi possível executar"):
+        execute_plan(plan, frames)
+
+
+def test_group_by_date_uses_month(frames):
+    plan = validate_plan({"dataset": "hotel", "group_by": ["data_checkin"]}, frames)
+
+    result = execute_plan(plan, frames)
+
+    assert result["data_checkin"].tolist() == ["2024-01", "2024-02", "2024-03"]
+    assert result["registos"].tolist() == [2, 1, 2]
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"dataset": "reservas"}, "Dataset desconhecido"),
+    ({"dataset": "hotel", "metrics": [{"column": "preco", "agg": "sum"}]}, "Coluna desconhecida"),
+    ({"dataset": "hotel", "group_by": ["quarto"]}, "Coluna desconhecida"),
+    ({"dataset": "hotel", "filters": [{"column": "noites", "op": "like", "value": 1}]}, "Filtro inválido"),
+    ({"dataset": "hotel", "filters": [{"column": "epoca", "op": ">", "value": "Alta"}]}, "não se aplica"),
+    ({"dataset": "hotel", "filters": [{"column": "noites", "op": ">", "value": "3"}]}, "numérico"),
+    ({"dataset": "hotel", "metrics": [{"column": "noites", "agg": "std"}]}, "Métrica inválida"),
+    ({"dataset": "hotel", "metrics": [{"column": "epoca", "agg": "mean"}]}, "coluna numérica"),
+    ({"dataset": "hotel", "metrics": [{"column": "*", "agg": "sum"}]}, "só admite 'count'"),
+    ({"dataset": "hotel", "metrics": [{"column": "epoca", "agg": "min"}]}, "coluna numérica, de data"),
+    ({"dataset": "hotel", "metrics": [{"column": "tipo_quarto", "agg": "max"}]}, "coluna numérica, de data"),
+    ({"dataset": "hotel", "group_by": ["epoca", "epoca"]}, "só pode aparecer uma vez"),
+    ({"dataset": "hotel", "sort_by": "gasto_total"}, "sort_by"),
+    ({"dataset": "hotel", "query": "DROP TABLE"}, "Campos não permitidos"),
+    (["hotel"], "objeto JSON"),
+])
+def test_rejects_unknown_columns_operators_and_fields(frames, raw, message):
+    with pytest.raises(QueryPlanError, match=message):
+        validate_plan(raw, frames)
+
+
+def test_rejects_plan_that_is_not_json(frames):
+    engine = QueryEngine(FakeLLM("Não sei responder a isso."))
+
+    with pytest.raises(QueryPlanError, match="não contém um plano JSON"):
+        engine.answer("quantas estadias?", frames, version="v1")
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_ROWS + 1, 2.5, "10", True])
+def test_rejects_limit_out_of_bounds(frames, limit):
+    with pytest.raises(QueryPlanError, match="limit"):
+        validate_plan({"dataset": "hotel", "limit": limit}, frames)
+
+
+@pytest.mark.parametrize("limit", [1, MAX_ROWS])
+def test_accepts_limit_bounds(frames, limit):
+    plan = validate_plan({"dataset": "hotel", "group_by": ["tipo_quarto"], "limit": limit}, frames)
+
+    assert len(execute_plan(plan, frames)) == min(limit, 3)
+
+
+def test_memoizes_plan_per_data_version(frames):
+    plan = {"dataset": "hotel", "metrics": [{"column": "gasto_total", "agg": "max"}]}
+    llm = FakeLLM(plan, "r1", plan, "r2", plan, "r3")
+    engine = QueryEngine(llm)
+
+    first = engine.answer("gasto máximo?", frames, version="v1")
+    second = engine.answer("qual o maior gasto?", frames, version="v1")
+    other_version = engine.answer("gasto máximo?", frames, version="v2")
+
+    assert (first.memoized, second.memoized, other_version.memoized) == (False, True, False)
+    assert second.result.equals(first.result)
+    assert engine.stats()["hits"] == 1
+    assert engine.stats()["planos_memorizados"] == 2
+
+
+def test_memo_evicts_least_recently_used(frames):
+    engine = QueryEngine(FakeLLM(), max_memoized=2)
+    plans = [validate_plan({"dataset": "hotel", "metrics": [{"column": "noites", "agg": agg}]}, frames)
+             for agg in ("min", "max", "sum")]
+
+    engine.run(plans[0], frames, "v1")
+    engine.run(plans[1], frames, "v1")
+    engine.run(plans[0], frames, "v1")  # plans[0] passa a ser o mais recente
+    engine.run(plans[2], frames, "v1")  # remove plans[1]
+
+    assert engine.run(plans[0], frames, "v1")[1] is True
+    assert engine.run(plans[1], frames, "v1")[1] is False
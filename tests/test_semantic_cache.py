@@ -0,0 +1,95 @@
+"""
+Cache semântica persistida em JSON lines: respostas e acertos acrescentados ao
+ficheiro, remoção LRU que sobrevive a um reinício
+"""
+import itertools
+
+import pytest
+
+import semantic_cache
+from semantic_cache import SemanticCache
+
+CONTEXT = "dados-v1"
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Relógio que avança 1 s por leitura: a ordem de uso é determinística"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: float(next(ticks)))
+
+
+def put(cache, question):
+    cache.put(question, CONTEXT, f"resposta: {question}", "modelo", 1.5)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.readlines()
+
+
+def test_put_appends_without_rewriting(tmp_path):
+    path = str(tmp_path / "perguntas.jsonl")
+    cache = SemanticCache(path)
+    put(cache, "receita total do hotel")
+    before = read_lines(path)
+
+    put(cache, "idade média dos clientes")
+
+    after = read_lines(path)
+    assert len(after) == 2
+    assert after[:1] == before
+
+
+def test_hits_and_last_used_survive_restart(tmp_path):
+    path = str(tmp_path / "perguntas.jsonl")
+    cache = SemanticCache(path)
+    put(cache, "receita total do hotel")
+    hit = cache.lookup("Receita total do hotel?", CONTEXT)
+
+    restarted = SemanticCache(path)
+
+    entry = restarted.lookup("receita total do hotel", CONTEXT).entry
+    assert entry.hits == 2
+    assert hit.entry.last_used < entry.last_used
+
+
+def test_eviction_after_restart_follows_recency(tmp_path):
+    path = str(tmp_path / "perguntas.jsonl")
+    cache = SemanticCache(path, max_entries=2)
+    put(cache, "receita total do hotel")
+    put(cache, "idade média dos clientes")
+    cache.lookup("receita total do hotel", CONTEXT)  # passa a ser a mais recente
+
+    restarted = SemanticCache(path, max_entries=2)
+    put(restarted, "noites por tipo de quarto")
+
+    assert restarted.lookup("idade média dos clientes", CONTEXT) is None
+    assert restarted.lookup("receita total do hotel", CONTEXT) is not None
+    assert len(read_lines(path)) == 2 + 1  # compactado na remoção, mais o acerto acima
+
+
+def test_load_keeps_most_recently_used_entries(tmp_path):
+    path = str(tmp_path / "perguntas.jsonl")
+    cache = SemanticCache(path)
+    for question in ("receita total do hotel", "idade média dos clientes", "noites por tipo de quarto"):
+        put(cache, question)
+    cache.lookup("receita total do hotel", CONTEXT)
+
+    restarted = SemanticCache(path, max_entries=2)
+
+    assert restarted.stats()["entradas"] == 2
+    assert restarted.lookup("idade média dos clientes", CONTEXT) is None
+    assert restarted.lookup("receita total do hotel", CONTEXT) is not None
+
+
+def test_hit_records_are_compacted(tmp_path):
+    path = str(tmp_path / "perguntas.jsonl")
+    cache = SemanticCache(path, max_entries=2)
+    put(cache, "receita total do hotel")
+
+    for _ in range(10):
+        cache.lookup("receita total do hotel", CONTEXT)
+
+    assert len(read_lines(path)) <= 2 * 2
+    assert SemanticCache(path).lookup("receita total do hotel", CONTEXT).entry.hits == 11
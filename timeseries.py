@@ -0,0 +1,127 @@
+"""
+Rollups temporais de receita
+
+A receita de cada negócio é agregada por dia, semana e mês quando os dados
+são carregados. Cada rollup guarda a versão dos dados de que veio (ver
+`data_store.DataVersion`): quando a nova versão só acrescentou linhas, apenas
+essas são agregadas (as somas são aditivas); qualquer outra alteração refaz o
+rollup. O gráfico recebe no máximo um número fixo de pontos,
+reduzidos com LTTB (Largest-Triangle-Three-Buckets) quando necessário.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Granularidades disponíveis (rótulo → frequência pandas)
+GRANULARITIES = {
+    "Diária": "D",
+    "Semanal": "W-MON",
+    "Mensal": "MS",
+}
+
+# Pontos máximos enviados para o gráfico (≈ largura útil em píxeis)
+DEFAULT_POINT_BUDGET = 800
+
+
+def lttb(x, y, threshold):
+    """Reduz uma série a `threshold` pontos preservando a forma visual (LTTB)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype="float64")
+    xf = np.asarray(x, dtype="float64")
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    # Buckets intermédios (o primeiro e o último ponto são sempre mantidos)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Média do bucket seguinte (para o último bucket, o último ponto)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((xf[a] - avg_x) * (y[start:end] - y[a])
+                       - (xf[a] - xf[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+class RevenueRollup:
+    """Receita agregada por dia, semana e mês de um negócio"""
+
+    def __init__(self, date_col, value_col="gasto_total", version=None):
+        self.date_col = date_col
+        self.value_col = value_col
+        self.version = version
+        self.rows = 0
+        self._series = {freq: pd.Series(dtype="float64") for freq in GRANULARITIES.values()}
+
+    @classmethod
+    def from_frame(cls, df, date_col, value_col="gasto_total", version=None):
+        """Materializa os rollups a partir de um DataFrame completo (na versão `version` dos dados)"""
+        rollup = cls(date_col, value_col, version)
+        rollup.update(df)
+        return rollup
+
+    def update(self, new_rows):
+        """Acrescenta novas linhas aos rollups (custo proporcional às linhas novas)"""
+        if len(new_rows) == 0:
+            return
+        dates = pd.to_datetime(new_rows[self.date_col], errors="coerce")
+        values = new_rows[self.value_col].to_numpy()
+        frame = pd.DataFrame({"value": values}, index=dates)
+        frame = frame[frame.index.notna()]
+        for freq in GRANULARITIES.values():
+            delta = frame["value"].resample(freq).sum()
+            delta = delta[delta != 0]
+            current = self._series[freq]
+            self._series[freq] = current.add(delta, fill_value=0).sort_index() if len(current) else delta
+        self.rows += len(new_rows)
+
+    def series(self, granularity="Diária", max_points=DEFAULT_POINT_BUDGET):
+        """Série de receita na granularidade pedida, reduzida a `max_points` pontos"""
+        series = self._series[GRANULARITIES[granularity]]
+        if max_points and len(series) > max_points:
+            x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+            series = series.iloc[lttb(x, series.to_numpy(), max_points)]
+        return series
+
+
+class RevenueRollupStore:
+    """Rollups de receita por negócio, sincronizados com os dados carregados"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rollups = {}
+
+    def sync(self, business, df, date_col, value_col="gasto_total", version=None):
+        """
+        Garante que o rollup do negócio reflete `df`, na versão `version` dos dados.
+        Na mesma versão o rollup é reutilizado; se a versão só acrescentou linhas
+        à anterior apenas essas são agregadas; caso contrário (ou sem versão) o
+        rollup é refeito.
+        """
+        with self._lock:
+            rollup = self._rollups.get(business)
+            same_shape = (rollup is not None and rollup.date_col == date_col
+                          and rollup.value_col == value_col)
+            if same_shape and version is not None and rollup.version == version and len(df) == rollup.rows:
+                return rollup
+            if (same_shape and version is not None and len(df) >= rollup.rows
+                    and version.extends(rollup.version)):
+                rollup.update(df.iloc[rollup.rows:])
+                rollup.version = version
+                return rollup
+            rollup = RevenueRollup.from_frame(df, date_col, value_col, version)
+            self._rollups[business] = rollup
+            return rollup
+
+    def get(self, business):
+        """Devolve o rollup materializado de um negócio (ou None)"""
+        return self._rollups.get(business)
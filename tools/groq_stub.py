@@ -0,0 +1,178 @@
+"""
+Servidor local que imita a API de chat do Groq (para desenvolvimento e testes)
+
+Responde a `POST /chat/completions` com um texto determinístico derivado do
+pedido, sem custos nem chave real, de uma vez ou em streaming (SSE, com
+`"stream": true`). `GET /stats` devolve o nº de pedidos recebidos (útil para
+confirmar que a cache evita chamadas repetidas) e quantos foram recusados.
+
+Para testar concorrência e novas tentativas, o atraso por pedido pode variar
+aleatoriamente (`--jitter`) e uma fração dos pedidos pode ser recusada com
+429 e `Retry-After` (`--fail-rate`, `--retry-after`). Para testar o failover
+entre modelos, os pedidos a `--down-models` respondem sempre 503.
+
+Uso:
+    python tools/groq_stub.py --port 8765 --token-delay 0.02
+    python tools/groq_stub.py --delay 1 --jitter 2 --fail-rate 0.3
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run dashboard_streamlit.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Configuração e contadores partilhados pelos pedidos"""
+
+    def __init__(self, delay_s=0.0, token_delay_s=0.0, jitter_s=0.0, fail_rate=0.0,
+                 retry_after_s=1.0, seed=None, down_models=()):
+        self.delay_s = delay_s
+        self.token_delay_s = token_delay_s
+        self.jitter_s = jitter_s
+        self.fail_rate = fail_rate
+        self.retry_after_s = retry_after_s
+        self.down_models = set(down_models)
+        self.requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+
+    def admit(self):
+        """Conta o pedido e decide se é recusado (429); devolve (aceite, atraso)"""
+        with self.lock:
+            self.requests += 1
+            rejected = self.random.random() < self.fail_rate
+            self.rejected += rejected
+            delay = self.delay_s + self.random.uniform(0, self.jitter_s)
+        return not rejected, delay
+
+
+def fake_answer(payload):
+    """Resposta determinística (o mesmo pedido gera sempre o mesmo texto)"""
+    prompt = payload["messages"][-1]["content"]
+    if "plano de consulta JSON" in prompt:
+        # Pedido do motor de consultas: um plano mínimo válido (nº de estadias no hotel)
+        return json.dumps({"dataset": "hotel", "metrics": [{"column": "*", "agg": "count"}]})
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    lines = [line for line in prompt.splitlines() if line.strip()][-3:]
+    bullets = "\n".join(f"- {line.strip('- ')}" for line in lines)
+    return (f"**Resposta simulada** ({payload['model']}, pedido `{digest}`)\n\n"
+            f"Últimas linhas do resumo recebido:\n{bullets}")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = StubState()
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, {"requests": self.state.requests, "rejected": self.state.rejected})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if payload.get("model") in self.state.down_models:
+            self._send_json(503, {"error": {"message": f"Model {payload['model']} unavailable (stub)"}})
+            return
+        accepted, delay = self.state.admit()
+        if not accepted:
+            self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_exceeded"}},
+                            headers={"Retry-After": f"{self.state.retry_after_s:g}"})
+            return
+        if delay:
+            time.sleep(delay)
+
+        text = fake_answer(payload)
+        prompt_chars = sum(len(m["content"]) for m in payload["messages"])
+        usage = {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(text) // 4,
+                 "total_tokens": (prompt_chars + len(text)) // 4}
+        if payload.get("stream"):
+            self._send_stream(payload["model"], text, usage)
+            return
+        self._send_json(200, {
+            "id": f"stub-{self.state.requests}",
+            "object": "chat.completion",
+            "model": payload["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            # Aproximação: ~4 caracteres por token
+            "usage": usage,
+        })
+
+    def _send_stream(self, model, text, usage):
+        """Server-sent events no formato do Groq (usage em `x_groq` no último evento)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def event(body):
+            self.wfile.write(f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        # Fragmentos de ~4 caracteres, como tokens
+        for i in range(0, len(text), 4):
+            if self.state.token_delay_s:
+                time.sleep(self.state.token_delay_s)
+            event({"object": "chat.completion.chunk", "model": model,
+                   "choices": [{"index": 0, "delta": {"content": text[i:i + 4]}}]})
+        event({"object": "chat.completion.chunk", "model": model,
+               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+               "x_groq": {"usage": usage}})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay_s=0.0, token_delay_s=0.0, **options):
+    """
+    Inicia o servidor numa thread em background e devolve (servidor, base_url).
+    `options` são passadas ao StubState (jitter_s, fail_rate, retry_after_s, seed, down_models).
+    """
+    handler = type("Handler", (StubHandler,), {"state": StubState(delay_s, token_delay_s, **options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API de chat do Groq")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="atraso por pedido (segundos)")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="atraso entre fragmentos no streaming (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="atraso aleatório extra até N segundos")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de pedidos recusados com 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429 (segundos)")
+    parser.add_argument("--down-models", nargs="*", default=[], help="modelos que respondem sempre 503")
+    args = parser.parse_args()
+
+    state = StubState(args.delay, args.token_delay, args.jitter, args.fail_rate, args.retry_after,
+                      down_models=args.down_models)
+    handler = type("Handler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"🧪 Groq stub em http://127.0.0.1:{args.port} (Ctrl+C para terminar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,96 @@
+"""
+Auditoria do tempo de import de um módulo (com `python -X importtime`)
+
+Executa num processo novo apenas os imports de nível de módulo do ficheiro
+indicado (sem correr o resto do script, p.ex. o dashboard) e agrega o tempo
+por pacote de topo (streamlit, pandas, sklearn...), com os módulos do projeto
+em separado. Serve para encontrar imports pesados que não são precisos no
+arranque e podem passar para dentro das funções que os usam:
+    python tools/import_audit.py
+    python tools/import_audit.py evaluate_models.py --top 30
+    python tools/import_audit.py --budget-ms 1500   # código de saída 1 se ultrapassar
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def module_imports(path):
+    """Código com os imports de nível de módulo de um ficheiro (incluindo os de blocos try/if)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    statements = []
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+        elif isinstance(node, (ast.Try, ast.If)):
+            pending[:0] = node.body
+    return "\n".join(statements)
+
+
+def run_importtime(code, cwd=PROJECT_ROOT):
+    """[(módulo, tempo próprio em µs, tempo acumulado em µs, profundidade)] de um processo novo"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def project_modules(root=PROJECT_ROOT):
+    return {name[:-3] for name in os.listdir(root) if name.endswith(".py")}
+
+
+def aggregate(rows, local_modules):
+    """Tempo próprio somado por pacote de topo, com os módulos do projeto sob 'projeto: <nome>'"""
+    totals = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        totals[f"projeto: {package}" if package in local_modules else package] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", default="dashboard_streamlit.py",
+                        help="ficheiro a auditar (relativo à raiz do projeto)")
+    parser.add_argument("--top", type=int, default=20, help="nº de pacotes a mostrar")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="tempo total de import máximo; acima dele o código de saída é 1")
+    args = parser.parse_args()
+
+    rows = run_importtime(module_imports(os.path.join(PROJECT_ROOT, args.path)))
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    local_modules = project_modules()
+
+    print(f"Imports de nível de módulo de {args.path}: {len(rows)} módulos, {total_us / 1000:.0f} ms\n")
+    print(f"{'pacote':<32}{'ms':>9}{'%':>7}")
+    for package, self_us in aggregate(rows, local_modules)[:args.top]:
+        print(f"{package:<32}{self_us / 1000:>9.1f}{self_us / total_us:>7.1%}")
+
+    print("\nImports diretos mais lentos (tempo acumulado):")
+    direct = [(name, cumulative_us) for name, _, cumulative_us, depth in rows if depth == 0]
+    for name, cumulative_us in sorted(direct, key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {name:<30}{cumulative_us / 1000:>9.1f} ms")
+
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        print(f"\n❌ {total_us / 1000:.0f} ms acima do orçamento de {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()